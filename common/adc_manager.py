@@ -0,0 +1,275 @@
+"""
+ADC Manager - Singleton owner of the I2C bus and ADS1115 drivers.
+
+Analog sensors on the same ADS1115 share one driver, keyed by (bus, address),
+and every chip on a bus shares one lock, so conversions never interleave.
+Reads are sequenced per chip: the first read in a cycle converts every channel
+in use on that chip in one pass, and the other sensors on the chip get the raw
+codes from that pass while they are fresher than adc_scan_max_age_seconds.
+Each channel takes a code from a pass at most once, so a sensor read again
+(its next tick) always triggers a new pass. Bursts and captures return raw
+16-bit codes; voltages are derived from the chip's gain. Drivers are reference
+counted and the bus is released when the last sensor using it is cleaned up.
+"""
+import logging
+import threading
+import time
+
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# The Raspberry Pi I2C bus on the board.SCL/board.SDA pins
+DEFAULT_I2C_BUS = 1
+
+# Full-scale voltage of the ADS1115 for each programmable gain
+PGA_FULL_SCALE = {2 / 3: 6.144, 1: 4.096, 2: 2.048, 4: 1.024, 8: 0.512, 16: 0.256}
+# Largest positive 16-bit conversion code (the code at full scale)
+MAX_CODE = 32767
+
+
+class _Bus:
+    def __init__(self, i2c):
+        self.i2c = i2c
+        self.lock = threading.Lock()
+        self.refs = 0
+
+
+class _Chip:
+    def __init__(self, ads, bus: _Bus):
+        self.ads = ads
+        self.bus = bus
+        self.channel_refs: dict[int, int] = {}  # Guarded by the manager lock; the rest by the bus lock
+        self.channels: dict[int, object] = {}  # channel -> AnalogIn
+        self.codes: dict[int, int] = {}
+        self.scanned_at: float | None = None
+        # Channels whose code from the current pass has already been read
+        self.consumed: set[int] = set()
+
+
+class ADCChannel:
+    """A sensor's handle on one channel of a shared ADS1115."""
+
+    def __init__(self, manager: "ADCManager", key: tuple[int, int], channel: int):
+        self._manager = manager
+        self.key = key
+        self.channel = channel
+
+    @property
+    def voltage(self) -> float:
+        """The channel voltage from the current scan pass of its chip."""
+        return self._manager.read_raw(self.key, self.channel) * self.volts_per_code
+
+    @property
+    def value(self) -> int:
+        """The raw ADC code (signed 16-bit) from the current scan pass of its chip."""
+        return self._manager.read_raw(self.key, self.channel)
+
+    @property
+    def volts_per_code(self) -> float:
+        """Voltage of one ADC code at the chip's current gain."""
+        return self._manager.volts_per_code(self.key)
+
+    def raw_samples(self, count: int, data_rate: int | None = None) -> list[int]:
+        """Take `count` back-to-back conversions of the channel as raw codes."""
+        return self._manager.read_samples(self.key, self.channel, count, data_rate)
+
+    def capture_raw(self, buffer, data_rate: int) -> float:
+        """Fill `buffer` with raw codes from a continuous-mode burst and return the achieved sample rate."""
+        return self._manager.capture(self.key, self.channel, buffer, data_rate)
+
+
+class ADCManager:
+    """Singleton, thread-safe registry of shared I2C buses and ADS1115 drivers."""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._init_manager()
+        return cls._instance
+
+    def _init_manager(self) -> None:
+        self.settings = Settings()
+        self._lock = threading.Lock()
+        self._buses: dict[int, _Bus] = {}
+        self._chips: dict[tuple[int, int], _Chip] = {}
+        self._counters = {"scans": 0, "conversions": 0, "cached_reads": 0, "captures": 0}
+
+    def _open_bus(self, bus: int) -> _Bus:
+        if bus not in self._buses:
+            if bus != DEFAULT_I2C_BUS:
+                raise ValueError(f"Invalid I2C bus {bus}. Only bus {DEFAULT_I2C_BUS} (board SCL/SDA) is supported.")
+            # Import hardware libraries here to avoid loading on dev machines
+            import board
+            import busio
+
+            self._buses[bus] = _Bus(busio.I2C(board.SCL, board.SDA))
+            logger.info(f"I2C bus {bus} opened")
+        return self._buses[bus]
+
+    def acquire(self, channel: int, address: int = 0x48, bus: int = DEFAULT_I2C_BUS) -> ADCChannel:
+        """
+        Get a handle on a channel of the ADS1115 at (bus, address), creating the shared driver if needed.
+
+        Raises:
+            ValueError: If the channel is not 0-3 or the bus is not supported
+        """
+        if channel not in (0, 1, 2, 3):
+            raise ValueError(f"Invalid channel {channel}. Must be 0-3.")
+        import adafruit_ads1x15.ads1115 as ADS
+        from adafruit_ads1x15.analog_in import AnalogIn
+
+        key = (bus, address)
+        with self._lock:
+            chip = self._chips.get(key)
+            if chip is None:
+                shared_bus = self._open_bus(bus)
+                chip = _Chip(ADS.ADS1115(shared_bus.i2c, address=address), shared_bus)
+                shared_bus.refs += 1
+                self._chips[key] = chip
+                logger.info(f"ADS1115 initialized on bus {bus} at address 0x{address:02x}")
+            if channel not in chip.channels:
+                # Channel mapping: channel number to ADS1115 pin constant (A0-A3)
+                pins = (ADS.P0, ADS.P1, ADS.P2, ADS.P3)
+                analog_in = AnalogIn(chip.ads, pins[channel])
+                # A scan of the chip may be iterating its channels
+                with chip.bus.lock:
+                    chip.channels[channel] = analog_in
+            chip.channel_refs[channel] = chip.channel_refs.get(channel, 0) + 1
+        return ADCChannel(self, key, channel)
+
+    def release(self, handle: ADCChannel) -> None:
+        """Drop a channel handle; the driver and bus are released with their last user."""
+        with self._lock:
+            chip = self._chips.get(handle.key)
+            if chip is None or handle.channel not in chip.channel_refs:
+                return
+            chip.channel_refs[handle.channel] -= 1
+            if chip.channel_refs[handle.channel] > 0:
+                return
+            del chip.channel_refs[handle.channel]
+            with chip.bus.lock:
+                chip.channels.pop(handle.channel, None)
+                chip.codes.pop(handle.channel, None)
+                chip.consumed.discard(handle.channel)
+            if chip.channel_refs:
+                return
+            del self._chips[handle.key]
+            chip.bus.refs -= 1
+            bus_id = handle.key[0]
+            if chip.bus.refs == 0:
+                del self._buses[bus_id]
+                try:
+                    chip.bus.i2c.deinit()
+                except Exception:
+                    pass  # Ignore errors during cleanup
+                logger.info(f"I2C bus {bus_id} released")
+
+    def _chip(self, key: tuple[int, int]) -> _Chip:
+        """
+        The chip at (bus, address). Looked up under the manager lock, as release() may
+        remove it concurrently; its channels are then guarded by the bus lock.
+        """
+        with self._lock:
+            return self._chips[key]
+
+    def _scan(self, chip: _Chip) -> None:
+        """Convert every channel in use on a chip in one pass; called with the bus lock held."""
+        for channel, analog_in in chip.channels.items():
+            chip.codes[channel] = analog_in.value
+        chip.scanned_at = time.monotonic()
+        chip.consumed.clear()
+        self._counters["scans"] += 1
+        self._counters["conversions"] += len(chip.channels)
+
+    def read_raw(self, key: tuple[int, int], channel: int) -> int:
+        """
+        Raw code of a channel, scanning its chip unless the last pass is younger than
+        adc_scan_max_age_seconds and the channel hasn't read its code from it yet.
+        """
+        chip = self._chip(key)
+        with chip.bus.lock:
+            fresh = (
+                chip.scanned_at is not None
+                and time.monotonic() - chip.scanned_at < self.settings.adc_scan_max_age_seconds
+                and channel in chip.codes
+                and channel not in chip.consumed
+            )
+            if fresh:
+                self._counters["cached_reads"] += 1
+            else:
+                self._scan(chip)
+            chip.consumed.add(channel)
+            return chip.codes[channel]
+
+    def volts_per_code(self, key: tuple[int, int]) -> float:
+        """Voltage of one code of the chip at (bus, address) at its current gain."""
+        return PGA_FULL_SCALE[self._chip(key).ads.gain] / MAX_CODE
+
+    def read_samples(self, key: tuple[int, int], channel: int, count: int, data_rate: int | None = None) -> list[int]:
+        """
+        Take `count` conversions of a channel as raw codes in one burst under the bus lock.
+
+        The chip runs at `data_rate` during the burst and is put back to its previous
+        rate afterwards, so other sensors on the chip keep their own timing.
+        """
+        chip = self._chip(key)
+        with chip.bus.lock:
+            previous_rate = chip.ads.data_rate
+            if data_rate is not None and data_rate != previous_rate:
+                chip.ads.data_rate = data_rate
+            try:
+                analog_in = chip.channels[channel]
+                samples = [analog_in.value for _ in range(count)]
+            finally:
+                if chip.ads.data_rate != previous_rate:
+                    chip.ads.data_rate = previous_rate
+            self._counters["conversions"] += count
+            return samples
+
+    def capture(self, key: tuple[int, int], channel: int, buffer, data_rate: int) -> float:
+        """
+        Record a burst of a channel's raw codes into `buffer` with the chip in continuous mode.
+
+        Reads are paced to `data_rate` so every sample is a new conversion. The bus is
+        held for the whole burst and the chip's mode and rate are restored afterwards.
+
+        Returns:
+            The sample rate achieved, which is below `data_rate` if the bus can't keep up
+        """
+        from adafruit_ads1x15.ads1x15 import Mode
+
+        chip = self._chip(key)
+        count = len(buffer)
+        period = 1.0 / data_rate
+        with chip.bus.lock:
+            previous_rate, previous_mode = chip.ads.data_rate, chip.ads.mode
+            chip.ads.data_rate = data_rate
+            chip.ads.mode = Mode.CONTINUOUS
+            try:
+                analog_in = chip.channels[channel]
+                # The first read selects the channel and starts the conversions
+                analog_in.value
+                started = last = time.perf_counter()
+                for i in range(count):
+                    delay = started + i * period - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    last = time.perf_counter()
+                    buffer[i] = analog_in.value
+            finally:
+                chip.ads.mode = previous_mode
+                chip.ads.data_rate = previous_rate
+            self._counters["captures"] += 1
+            self._counters["conversions"] += count
+        if count < 2 or last <= started:
+            return float(data_rate)
+        return min(float(data_rate), (count - 1) / (last - started))
+
+    def stats(self) -> dict:
+        """Return open buses and chips, and conversion counters."""
+        with self._lock:
+            chips = {f"{bus}:0x{address:02x}": sorted(chip.channels) for (bus, address), chip in self._chips.items()}
+        return {"buses": len(self._buses), "chips": chips, **self._counters}
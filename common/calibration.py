@@ -0,0 +1,137 @@
+"""
+Calibration - Sensor voltage to measurement curves, precomputed per ADC code.
+
+The ADS1115 returns signed 16-bit codes, so every reading a channel can
+produce is one of 65,536 values. A CalibrationTable evaluates the sensor's
+curve once for each code (through the chip's volts per code and the voltage
+divider) and conversion becomes a single array index. Curves are configured
+per sensor in sensor_config.yaml, against the sensor's own output voltage
+(before the divider):
+
+    calibration:
+      type: piecewise
+      points: [[0.5, 0.0], [1.5, 7.2], [3.0, 18.5], [4.5, 30.0]]
+
+    calibration:
+      type: polynomial
+      coefficients: [-3.75, 7.5]   # c0 + c1 * v + c2 * v ** 2 + ...
+      min: 0.0
+      max: 30.0
+"""
+import bisect
+from array import array
+
+CODE_COUNT = 1 << 16
+
+CALIBRATION_TYPES = ("piecewise", "polynomial")
+
+
+class PiecewiseLinearCurve:
+    """Linear interpolation between calibration points, clamped to the first and last point."""
+
+    def __init__(self, points: list[tuple[float, float]]):
+        """
+        Initialize the curve.
+
+        Args:
+            points: (voltage, value) calibration points
+
+        Raises:
+            ValueError: If there are fewer than two points or two points share a voltage
+        """
+        points = sorted((float(voltage), float(value)) for voltage, value in points)
+        if len(points) < 2:
+            raise ValueError("A piecewise calibration needs at least two points.")
+        if any(a[0] == b[0] for a, b in zip(points, points[1:])):
+            raise ValueError(f"Invalid calibration points {points}. Voltages must be distinct.")
+        self._voltages = [voltage for voltage, _ in points]
+        self._values = [value for _, value in points]
+
+    def __call__(self, voltage: float) -> float:
+        if voltage <= self._voltages[0]:
+            return self._values[0]
+        if voltage >= self._voltages[-1]:
+            return self._values[-1]
+        i = bisect.bisect_right(self._voltages, voltage)
+        v0, v1 = self._voltages[i - 1], self._voltages[i]
+        y0, y1 = self._values[i - 1], self._values[i]
+        return y0 + (voltage - v0) * (y1 - y0) / (v1 - v0)
+
+
+class PolynomialCurve:
+    """Polynomial in the voltage, optionally clamped to [minimum, maximum]."""
+
+    def __init__(self, coefficients: list[float], minimum: float | None = None, maximum: float | None = None):
+        """
+        Initialize the curve.
+
+        Args:
+            coefficients: c0, c1, ... of c0 + c1 * v + c2 * v ** 2 + ...
+            minimum: Lowest value the curve returns
+            maximum: Highest value the curve returns
+
+        Raises:
+            ValueError: If there are no coefficients or minimum is above maximum
+        """
+        if not coefficients:
+            raise ValueError("A polynomial calibration needs at least one coefficient.")
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise ValueError(f"Invalid calibration range {minimum}-{maximum}.")
+        self._coefficients = [float(c) for c in coefficients]
+        self._minimum = minimum
+        self._maximum = maximum
+
+    def __call__(self, voltage: float) -> float:
+        # Horner's method
+        value = 0.0
+        for coefficient in reversed(self._coefficients):
+            value = value * voltage + coefficient
+        if self._minimum is not None:
+            value = max(self._minimum, value)
+        if self._maximum is not None:
+            value = min(self._maximum, value)
+        return value
+
+
+def curve_from_dict(config: dict):
+    """
+    Build a curve from a sensor_config.yaml 'calibration' block.
+
+    Raises:
+        ValueError: If the calibration type is unknown or its parameters are invalid
+    """
+    calibration_type = config.get('type', 'piecewise')
+    if calibration_type == "piecewise":
+        return PiecewiseLinearCurve(config.get('points') or [])
+    if calibration_type == "polynomial":
+        return PolynomialCurve(config.get('coefficients') or [], config.get('min'), config.get('max'))
+    raise ValueError(f"Invalid calibration type '{calibration_type}'. Must be one of {CALIBRATION_TYPES}.")
+
+
+class CalibrationTable:
+    """The value of a calibration curve for every signed 16-bit ADC code."""
+
+    def __init__(self, curve, volts_per_code: float, divider_ratio: float = 1.0):
+        """
+        Evaluate the curve for every code.
+
+        Args:
+            curve: Callable from the sensor's output voltage to its value
+            volts_per_code: ADC voltage of one code at the chip's gain
+            divider_ratio: Ratio of the voltage divider in front of the ADC (V_out / V_in)
+        """
+        self.volts_per_code = volts_per_code
+        self.divider_ratio = divider_ratio
+        scale = volts_per_code / divider_ratio
+        # Indexed by the code's two's-complement bit pattern, so negative codes sit in the upper half
+        self._table = array('d', (
+            curve((code - CODE_COUNT if code >= CODE_COUNT // 2 else code) * scale) for code in range(CODE_COUNT)
+        ))
+
+    def __getitem__(self, code: int) -> float:
+        return self._table[code & 0xFFFF]
+
+    def convert(self, codes) -> list[float]:
+        """Convert a sequence of raw codes."""
+        table = self._table
+        return [table[code & 0xFFFF] for code in codes]
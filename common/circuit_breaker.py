@@ -0,0 +1,124 @@
+"""
+Circuit Breaker - Singleton guarding calls to the collector API.
+
+After enough consecutive failures the breaker opens and requests are refused
+locally (payloads go straight to LMDB) until an exponential backoff with
+jitter expires. The breaker then lets a single probe request through
+(half-open): success closes it, failure re-opens it with a longer backoff.
+"""
+import logging
+import random
+import threading
+import time
+from enum import Enum
+
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff for the given attempt (1-based) with equal jitter, capped at `cap` seconds."""
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Singleton circuit breaker shared by every collector API caller."""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._init_breaker()
+        return cls._instance
+
+    def _init_breaker(self) -> None:
+        self.settings = Settings()
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opens = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._rejected = 0
+        self._transitions: dict[str, int] = {}
+
+    @property
+    def state(self) -> BreakerState:
+        return self._state
+
+    def is_open(self) -> bool:
+        """True while the breaker is open and its backoff has not expired yet."""
+        return self._state == BreakerState.OPEN and time.monotonic() < self._open_until
+
+    def _transition(self, state: BreakerState) -> None:
+        name = f"{self._state.value}->{state.value}"
+        self._transitions[name] = self._transitions.get(name, 0) + 1
+        logger.info(f"Circuit breaker {name}")
+        self._state = state
+
+    def _open(self) -> None:
+        self._opens += 1
+        backoff = backoff_delay(
+            self._opens,
+            self.settings.circuit_breaker_base_backoff_seconds,
+            self.settings.circuit_breaker_max_backoff_seconds,
+        )
+        self._open_until = time.monotonic() + backoff
+        self._probe_in_flight = False
+        self._transition(BreakerState.OPEN)
+        logger.warning(f"Circuit breaker open for {backoff:.1f}s after {self._failures} consecutive failure(s)")
+
+    def allow_request(self) -> bool:
+        """Return True if a request may go out now. In half-open state only one probe is allowed."""
+        with self._lock:
+            if self._state == BreakerState.CLOSED:
+                return True
+            if self._state == BreakerState.OPEN and time.monotonic() >= self._open_until:
+                self._transition(BreakerState.HALF_OPEN)
+            if self._state == BreakerState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Record a request that reached a healthy collector."""
+        with self._lock:
+            self._failures = 0
+            self._opens = 0
+            self._probe_in_flight = False
+            if self._state != BreakerState.CLOSED:
+                self._transition(BreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a request that failed because the collector is unreachable or unhealthy."""
+        with self._lock:
+            self._failures += 1
+            if self._state == BreakerState.HALF_OPEN:
+                self._open()
+            elif self._state == BreakerState.CLOSED and self._failures >= self.settings.circuit_breaker_failure_threshold:
+                self._open()
+
+    def release_probe(self) -> None:
+        """Give up a half-open probe that ended without an outcome, so the next request can probe again."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        """Return the current state and transition counters."""
+        with self._lock:
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._failures,
+                "rejected_requests": self._rejected,
+                "transitions": dict(self._transitions),
+            }
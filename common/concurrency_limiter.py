@@ -0,0 +1,99 @@
+"""
+Concurrency Limiter - Bounds in-flight work against the collector API.
+
+A fixed limiter allows up to `max_limit` concurrent tasks. An adaptive limiter
+starts at one and follows AIMD: the limit grows by one after a full window of
+healthy responses (below the latency target) and is halved when the collector
+answers 429/5xx or responds slower than the target.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _is_overload(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class ConcurrencyLimiter:
+    """Thread-safe limit on concurrent tasks, optionally adapted to collector health."""
+
+    def __init__(self, name: str, max_limit: int, adaptive: bool = False, latency_target: float = 2.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Name used in log messages
+            max_limit: Upper bound on concurrent tasks
+            adaptive: Adapt the limit (between 1 and max_limit) to response latency and status
+            latency_target: Responses slower than this many seconds count as congestion
+
+        Raises:
+            ValueError: If max_limit is below 1 or latency_target is not positive
+        """
+        if max_limit < 1:
+            raise ValueError(f"Invalid concurrency limit {max_limit}. Must be at least 1.")
+        if latency_target <= 0:
+            raise ValueError(f"Invalid latency target {latency_target}. Must be positive.")
+        self.name = name
+        self.max_limit = max_limit
+        self.adaptive = adaptive
+        self.latency_target = latency_target
+        self._lock = threading.Lock()
+        self._limit = 1 if adaptive else max_limit
+        self._in_flight = 0
+        self._healthy = 0
+        self._last_decrease = 0.0
+        self._increases = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free."""
+        with self._lock:
+            if self._in_flight >= self._limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Return a slot taken with try_acquire."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def record(self, latency: float, status_code: int) -> None:
+        """Feed back the latency and status of one request (no-op for a fixed limiter)."""
+        if not self.adaptive:
+            return
+        with self._lock:
+            if _is_overload(status_code) or latency > self.latency_target:
+                self._healthy = 0
+                now = time.monotonic()
+                # One decrease per latency window, so a burst of slow in-flight responses halves the limit once
+                if self._limit > 1 and now - self._last_decrease >= self.latency_target:
+                    self._limit = max(1, self._limit // 2)
+                    self._last_decrease = now
+                    self._decreases += 1
+                    logger.info(f"{self.name}: concurrency reduced to {self._limit} (status {status_code}, {latency:.2f}s)")
+                return
+            self._healthy += 1
+            if self._healthy >= self._limit and self._limit < self.max_limit:
+                self._limit += 1
+                self._healthy = 0
+                self._increases += 1
+                logger.debug(f"{self.name}: concurrency raised to {self._limit}")
+
+    def stats(self) -> dict:
+        """Return the current limit and adjustment counters."""
+        with self._lock:
+            return {
+                "limit": self._limit,
+                "in_flight": self._in_flight,
+                "increases": self._increases,
+                "decreases": self._decreases,
+            }
@@ -0,0 +1,121 @@
+"""
+Deadband Filter - Report-by-exception filtering between sampling and export.
+
+A reading is exported when its value moved outside the sensor's deadband since
+the last exported value, or when the sensor has been silent for its heartbeat
+interval. Suppressed readings are counted, and the next exported reading
+carries a "suppressed" count so the collector can check completeness.
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_SECONDS = 300.0
+
+# Fields that summarize the window since the previous reading (transitions, waveform
+# captures); a reading carrying any of them is always exported, or the window would be lost
+WINDOW_FIELDS = ("rises", "falls", "waveform")
+
+
+class DeadbandConfig:
+    """Per-sensor deadband thresholds and heartbeat."""
+
+    def __init__(self, absolute: float | None = None, percent: float | None = None, heartbeat: float = DEFAULT_HEARTBEAT_SECONDS):
+        """
+        Initialize the deadband configuration.
+
+        Args:
+            absolute: Report when the value moves more than this amount
+            percent: Report when the value moves more than this percent of the last reported value
+            heartbeat: Maximum seconds between reported readings
+
+        With neither threshold set, any change in value is reported.
+
+        Raises:
+            ValueError: If a threshold is negative or the heartbeat is not positive
+        """
+        if (absolute is not None and absolute < 0) or (percent is not None and percent < 0):
+            raise ValueError("Deadband thresholds must not be negative.")
+        if heartbeat <= 0:
+            raise ValueError(f"Invalid heartbeat {heartbeat}. Must be positive.")
+        self.absolute = absolute
+        self.percent = percent
+        self.heartbeat = heartbeat
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "DeadbandConfig":
+        """Build a configuration from a sensor_config.yaml 'deadband' block."""
+        return cls(
+            absolute=config.get('absolute'),
+            percent=config.get('percent'),
+            heartbeat=config.get('heartbeat', DEFAULT_HEARTBEAT_SECONDS),
+        )
+
+    def exceeded(self, last_value, value) -> bool:
+        """True if `value` is outside the deadband around `last_value`."""
+        if not isinstance(value, (int, float)) or not isinstance(last_value, (int, float)):
+            return value != last_value
+        delta = abs(value - last_value)
+        if self.absolute is None and self.percent is None:
+            return delta != 0
+        if self.absolute is not None and delta > self.absolute:
+            return True
+        return self.percent is not None and delta > abs(last_value) * self.percent / 100.0
+
+
+class _DeadbandState:
+    __slots__ = ("last_value", "last_sent_at", "suppressed", "suppressed_total")
+
+    def __init__(self):
+        self.last_value = None
+        self.last_sent_at = None
+        self.suppressed = 0
+        self.suppressed_total = 0
+
+
+class DeadbandFilter:
+    """Filters readings of sensors that define a `deadband` configuration."""
+
+    def __init__(self, sensors: list):
+        self._configs = {
+            sensor.id: sensor.deadband for sensor in sensors if getattr(sensor, "deadband", None) is not None
+        }
+        self._states = {sensor_id: _DeadbandState() for sensor_id in self._configs}
+        self._passed = 0
+
+    def filter(self, metrics: list[dict]) -> list[dict]:
+        """Return the readings that should be exported, suppressing those inside the deadband."""
+        now = time.monotonic()
+        exported = []
+        for metric in metrics:
+            config = self._configs.get(metric["id"])
+            if config is None:
+                exported.append(metric)
+                continue
+
+            state = self._states[metric["id"]]
+            value = metric["value"]
+            due = state.last_sent_at is None or now - state.last_sent_at >= config.heartbeat
+            carries_window = any(metric.get(field) for field in WINDOW_FIELDS)
+            if not due and not carries_window and not config.exceeded(state.last_value, value):
+                state.suppressed += 1
+                state.suppressed_total += 1
+                continue
+
+            if state.suppressed:
+                metric = {**metric, "suppressed": state.suppressed}
+            state.last_value = value
+            state.last_sent_at = now
+            state.suppressed = 0
+            self._passed += 1
+            exported.append(metric)
+        return exported
+
+    def stats(self) -> dict:
+        """Return exported and suppressed reading counters."""
+        return {
+            "exported": self._passed,
+            "suppressed_total": sum(state.suppressed_total for state in self._states.values()),
+            "suppressed_by_sensor": {sensor_id: state.suppressed_total for sensor_id, state in self._states.items()},
+        }
@@ -1,16 +1,28 @@
 import logging
 import signal
+import threading
 import time as time_module
-from time import sleep
 
 import psutil
 
 from sensors import FloatSensor, EnergyConsumptionSensor
-from metrics_exporter import APIExporter, LMDBExporter, LogExporter
-from common.device_registerer import DeviceRegisterer
+from metrics_exporter import APIExporter, BufferedExporter, LogExporter
+from common.adc_manager import ADCManager
+from common.circuit_breaker import CircuitBreaker
+from common.deadband_filter import DeadbandFilter
+from common.http_session import HTTPSession
+from common.lmdb_clients import storage_manager
+from common.lmdb_codec import RecordCodec
 from common.metric_type import MetricType
 from common.retry_worker import RetryWorker
+from common.runtime_stats import RuntimeStats
+from common.sampling_engine import SamplingEngine
+from common.scheduler import Scheduler
+from common.settings import Settings
+from common.token_manager import TokenManager
 from common.sensor_config_loader import load_sensors_from_config
+from common.sensor_metadata import SensorMetadataPublisher
+from common.waveform_publisher import WaveformPublisher
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +30,21 @@ logger = logging.getLogger(__name__)
 class Device:
     def __init__(self):
         self._shutdown_requested = False
+        self._stop_event = threading.Event()
+        self._waveform_requested = threading.Event()
         signal.signal(signal.SIGTERM, self._handle_shutdown)
         signal.signal(signal.SIGINT, self._handle_shutdown)
+        signal.signal(signal.SIGUSR1, self._handle_waveform_request)
 
     def _handle_shutdown(self, signum, frame):
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         self._shutdown_requested = True
+        self._stop_event.set()
+
+    def _handle_waveform_request(self, signum, frame):
+        # Only flag the request: the handler runs on the scheduler's thread, which may hold sensor locks
+        logger.info(f"Received signal {signum}, requesting waveforms")
+        self._waveform_requested.set()
 
     def _read_temperature(self) -> float | None:
         # Raspberry Pi: read from thermal zone (returns millidegrees Celsius)
@@ -58,10 +79,35 @@ class Device:
             }
         }
 
+    def _export_sensor_metrics(self, sensors: list) -> None:
+        if self._waveform_requested.is_set():
+            self._waveform_requested.clear()
+            self._waveform_publisher.request(self._sensors)
+        sensor_metrics = self._deadband_filter.filter(self._sampling_engine.sample(sensors))
+        self._waveform_publisher.publish(sensors)
+        if not sensor_metrics:
+            return
+        self._log_exporter(sensor_metrics)
+        self._exporter(sensor_metrics, MetricType.SENSOR)
+
+    def _export_device_status(self) -> None:
+        self._exporter(self.current_metrics(), MetricType.DEVICE_STATUS)
+        if self._metadata_publisher is not None:
+            self._metadata_publisher.publish_if_changed(self._sensors)
+
+    def _schedule_sensors(self, scheduler: Scheduler, sensors: list) -> None:
+        """Group sensors by interval so each distinct rate is one scheduled task."""
+        groups: dict[float, list] = {}
+        for sensor in sensors:
+            interval = sensor.interval or self._settings.sensor_interval_seconds
+            groups.setdefault(interval, []).append(sensor)
+        for interval, group in sorted(groups.items()):
+            scheduler.add(f"sensors@{interval}s", interval, lambda group=group: self._export_sensor_metrics(group))
+
     def run(self):
         logger.info("Starting device...")
         
-        DeviceRegisterer().register(shutdown_check=lambda: self._shutdown_requested)
+        TokenManager().refresh(shutdown_check=lambda: self._shutdown_requested, persistent=True)
         
         # Prime psutil CPU measurement (first call establishes baseline)
         psutil.cpu_percent(interval=None)
@@ -77,32 +123,52 @@ class Device:
         sensors.extend(live_sensors)
         
         # Initialize worker and exporters
+        self._settings = Settings()
         worker = RetryWorker()
-        api_exporter = APIExporter()
-        log_exporter = LogExporter()
-        lmdb_exporter = LMDBExporter()
+        self._exporter = BufferedExporter()
+        self._log_exporter = LogExporter()
+        self._sampling_engine = SamplingEngine()
+        self._deadband_filter = DeadbandFilter(sensors)
+        self._sensors = sensors
+        self._waveform_publisher = WaveformPublisher(self._exporter)
         
-        logger.info("Device running, collecting metrics...")
+        # Compact readings rely on the collector knowing the sensor descriptors
+        self._metadata_publisher = None
+        if self._settings.metric_format == "compact":
+            self._metadata_publisher = SensorMetadataPublisher(self._exporter)
+            self._metadata_publisher.publish_if_changed(sensors)
+        
+        runtime_stats = RuntimeStats()
+        scheduler = Scheduler(self._stop_event)
+        self._schedule_sensors(scheduler, sensors)
+        scheduler.add("device-status", self._settings.device_status_interval_seconds, self._export_device_status)
+        scheduler.add(
+            "runtime-stats",
+            self._settings.stats_report_interval_seconds,
+            runtime_stats.log_snapshot,
+            start_delay=self._settings.stats_report_interval_seconds,
+        )
+        runtime_stats.register("sampling", self._sampling_engine.stats)
+        runtime_stats.register("scheduler", scheduler.stats)
+        runtime_stats.register("deadband", self._deadband_filter.stats)
+        runtime_stats.register("export_buffer", self._exporter.stats)
+        runtime_stats.register("http", HTTPSession().stats)
+        runtime_stats.register("circuit_breaker", CircuitBreaker().stats)
+        runtime_stats.register("token", TokenManager().stats)
+        runtime_stats.register("compression", APIExporter().compressor.stats)
+        runtime_stats.register("retry_worker", worker.stats)
+        runtime_stats.register("adc", ADCManager().stats)
+        runtime_stats.register("waveforms", self._waveform_publisher.stats)
+        runtime_stats.register("lmdb_codec", RecordCodec().stats)
+        runtime_stats.register("lmdb_storage", storage_manager.stats)
         
-        while not self._shutdown_requested:
-            # Collect and export sensor metrics
-            sensor_metrics = [sensor.current_metric() for sensor in sensors]
-            log_exporter(sensor_metrics)
-            sensor_status_code = api_exporter(sensor_metrics, MetricType.SENSOR)
-            if sensor_status_code == 201:
-                logger.info("Sent sensor metrics to API successfully")
-            else:
-                lmdb_exporter(sensor_metrics, sensor_status_code, MetricType.SENSOR)
-            
-            # Collect and export device status metrics
-            device_status = self.current_metrics()
-            device_status_code = api_exporter(device_status, MetricType.DEVICE_STATUS)
-            if device_status_code == 201:
-                logger.info("Sent device status to API successfully")
-            else:
-                lmdb_exporter(device_status, device_status_code, MetricType.DEVICE_STATUS)
-            
-            sleep(5)
+        logger.info("Device running, collecting metrics...")
+        scheduler.run()
         
+        self._sampling_engine.shutdown()
+        self._exporter.stop()
+        worker.stop()
+        storage_manager.close()
+        HTTPSession().close()
         logger.info("Device shutdown complete")
         return 0
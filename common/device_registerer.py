@@ -1,6 +1,7 @@
 import os, requests, logging
 
 from time import sleep
+from common.http_session import HTTPSession
 from common.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -16,24 +17,34 @@ class DeviceRegisterer:
             cls._shutdown_check = None
         return cls._instance
 
-    def register(self, shutdown_check=None):
+    def register(self, shutdown_check=None, max_attempts: int | None = None) -> tuple[str, float | None] | None:
         """
         Register the device with the collector API.
         
         Args:
             shutdown_check: Optional callable that returns True if shutdown was requested.
+            max_attempts: Give up after this many attempts (None retries until registered).
+            
+        Returns:
+            The new token and its TTL in seconds (None if the server didn't send one),
+            or None if registration did not complete.
         """
         self._shutdown_check = shutdown_check or (lambda: False)
         
         response_status = 000
+        attempts = 0
         while response_status not in [200, 201] and not self._shutdown_check():
+            if max_attempts is not None and attempts >= max_attempts:
+                logger.error(f"Registration failed after {attempts} attempt(s)")
+                return None
+            attempts += 1
             try:
                 self.settings = Settings()
                 headers = {}
                 if self.settings.token:
                     headers["X-API-KEY"] = self.settings.token
                     
-                response = requests.post(
+                response = HTTPSession().post(
                     f"{self.settings.collector_host}/devices",
                     headers=headers,
                     json={
@@ -49,18 +60,23 @@ class DeviceRegisterer:
                     if token:
                         os.environ["SENSOR_READER_TOKEN"] = token
                         logger.info("Device registered successfully with token")
+                        ttl = data.get("expires_in") or data.get("ttl")
+                        return token, float(ttl) if ttl else None
                     else:
                         logger.error("No token received from server")
                         response_status = 000
             except requests.RequestException as e:
                 logger.error(f"Could not register device: {e}. Trying again in 10 seconds...")
                 response_status = 000
+                if max_attempts is not None and attempts >= max_attempts:
+                    continue
                 for _ in range(10):
                     if self._shutdown_check():
                         logger.info("Registration stopped due to shutdown signal")
-                        return
+                        return None
                     sleep(1)
                 continue
         
         if self._shutdown_check():
             logger.info("Registration incomplete due to shutdown")
+        return None
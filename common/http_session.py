@@ -0,0 +1,76 @@
+"""
+HTTP Session - Singleton keep-alive connection pool for collector requests.
+
+All collector traffic (metrics export, retries and device registration) goes
+through one requests.Session so TCP connections and TLS sessions are reused
+across cycles instead of being re-established on every POST.
+"""
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPSession:
+    """Singleton, thread-safe pooled HTTP session with connection-reuse counters."""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._init_session()
+        return cls._instance
+
+    def _init_session(self) -> None:
+        self.settings = Settings()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._adapter = HTTPAdapter(
+            pool_connections=self.settings.http_pool_connections,
+            pool_maxsize=self.settings.http_pool_maxsize,
+            pool_block=self.settings.http_pool_block,
+        )
+        self._session = requests.Session()
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
+        logger.info(
+            f"HTTPSession initialized: pool_connections={self.settings.http_pool_connections}, "
+            f"pool_maxsize={self.settings.http_pool_maxsize}"
+        )
+
+    @property
+    def default_timeout(self) -> tuple[float, float]:
+        """The (connect, read) timeout applied when the caller doesn't pass one."""
+        return (self.settings.api_connect_timeout_seconds, self.settings.api_read_timeout_seconds)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request over a pooled keep-alive connection."""
+        kwargs.setdefault("timeout", self.default_timeout)
+        with self._lock:
+            self._requests += 1
+        return self._session.post(url, **kwargs)
+
+    def stats(self) -> dict:
+        """Return request and connection counters across all host pools."""
+        pools = self._adapter.poolmanager.pools
+        connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        return {
+            "requests": self._requests,
+            "connections_opened": connections,
+            "connections_reused": max(0, self._requests - connections),
+            "host_pools": len(pools),
+        }
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self._session.close()
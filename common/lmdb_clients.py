@@ -1,4 +1,482 @@
+import json
+import logging
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
 import lmdb
 
-lmdb_write_client = lmdb.open("data.lmdb", map_size=256 * 1024 * 1024, max_dbs=1, subdir=True, lock=True)
-lmdb_read_client = lmdb.open("data.lmdb", readonly=True)
+from common.metric_type import MetricType
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Named sub-databases: one keyspace per metric type, "meta" for sequence counters and
+# dictionaries, and the (sensor id, timestamp) index of sensor batches with its reverse map
+META_DB_NAME = b"meta"
+SENSOR_INDEX_DB_NAME = b"sensor-index"
+SENSOR_INDEX_BATCHES_DB_NAME = b"sensor-index-batches"
+MAX_DBS = len(MetricType) + 3
+
+# sync: fsync data and metadata on every commit. metasync: skip the metadata fsync (a crash
+# may lose the last commit, never corrupt the database). periodic: no fsync on commit; the
+# group-commit writer flushes every lmdb_sync_interval_seconds.
+DURABILITY_MODES = ("sync", "metasync", "periodic")
+
+_settings = Settings()
+if _settings.lmdb_durability not in DURABILITY_MODES:
+    raise ValueError(f"Invalid LMDB durability '{_settings.lmdb_durability}'. Must be one of {DURABILITY_MODES}.")
+
+# One environment per process: LMDB must not be opened twice by the same process
+lmdb_env = lmdb.open(
+    _settings.lmdb_path,
+    map_size=_settings.lmdb_map_size,
+    max_dbs=MAX_DBS,
+    max_readers=_settings.lmdb_max_readers,
+    subdir=True,
+    lock=True,
+    sync=_settings.lmdb_durability != "periodic",
+    metasync=_settings.lmdb_durability == "sync",
+)
+metric_dbs = {metric_type: lmdb_env.open_db(metric_type.value.encode()) for metric_type in MetricType}
+meta_db = lmdb_env.open_db(META_DB_NAME)
+sensor_index_db = lmdb_env.open_db(SENSOR_INDEX_DB_NAME)
+sensor_index_batches_db = lmdb_env.open_db(SENSOR_INDEX_BATCHES_DB_NAME)
+
+# Only one write transaction may be open per environment; serialize writers across threads.
+# Also held while the map is resized, which must not happen with a transaction open.
+lmdb_write_lock = threading.RLock()
+
+RETENTION_POLICIES = ("drop_oldest", "device_status_first", "downsample_sensor")
+# Metric types evicted by drop_oldest, largest backlog first. Sensor metadata is kept:
+# compact readings can't be interpreted without it.
+EVICTABLE_METRIC_TYPES = (MetricType.SENSOR, MetricType.DEVICE_STATUS, MetricType.WAVEFORM)
+# used_bytes() takes a stat of every database, so the high-water mark is only checked
+# every this many commits; a MapFullError still makes room at once
+HIGH_WATER_CHECK_COMMITS = 16
+# Reader slots kept out of the pool: one for the short reads taken under lmdb_write_lock
+# and one for the finished read transaction py-lmdb keeps for renewal
+RESERVED_READERS = 2
+
+
+class ReaderLimiter:
+    """
+    Bounds concurrent read transactions to the environment's reader slots.
+
+    This only limits concurrency: each read begins its own transaction. py-lmdb
+    keeps one finished read transaction and renews it (mdb_txn_reset and
+    mdb_txn_renew) on the next begin; it exposes no reset/renew of its own, so
+    transactions can't be pooled per slot. Resizing the map needs every
+    transaction closed; exclusive() waits for the open reads and holds off new
+    ones meanwhile. Don't write through storage_manager while holding a read: a
+    resize would wait for the read, and the read for the write.
+    """
+
+    def __init__(self, env: lmdb.Environment, slots: int):
+        self._env = env
+        self._slots = max(1, slots)
+        self._condition = threading.Condition()
+        self._active = 0
+        self._exclusive = False
+        self._reads = 0
+        self._waits = 0
+
+    @contextmanager
+    def read(self, db=None):
+        """Open a read transaction, waiting for a free reader slot."""
+        with self._condition:
+            if self._exclusive or self._active >= self._slots:
+                self._waits += 1
+            self._condition.wait_for(lambda: not self._exclusive and self._active < self._slots)
+            self._active += 1
+            self._reads += 1
+        try:
+            with self._env.begin(db=db) as txn:
+                yield txn
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        """Wait until no read transaction is open and keep new ones from starting."""
+        with self._condition:
+            self._exclusive = True
+            self._condition.wait_for(lambda: self._active == 0)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {"slots": self._slots, "active": self._active, "reads": self._reads, "waited": self._waits}
+
+
+reader_limiter = ReaderLimiter(lmdb_env, _settings.lmdb_max_readers - RESERVED_READERS)
+
+
+def begin_read(db=None):
+    """Open a read transaction once a reader slot is free, for use as a context manager."""
+    return reader_limiter.read(db=db)
+
+
+class _PendingWrite:
+    __slots__ = ("operation", "db", "done", "result", "error")
+
+    def __init__(self, operation, db):
+        self.operation = operation
+        self.db = db
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class StorageManager:
+    """
+    Runs LMDB write transactions and keeps the map from filling up.
+
+    With group commit enabled, writes from all threads are queued to one writer
+    thread, which commits the writes that queued up meanwhile (up to
+    lmdb_group_commit_max_ops) in a single transaction, so a burst of writes
+    costs one fsync. It waits up to lmdb_group_commit_window_seconds for writers
+    already in write() to enqueue, and commits a lone write at once. Each write
+    runs in its own nested transaction, so a failing write doesn't abort the
+    rest of its group.
+
+    Once the map is lmdb_high_water_ratio full (checked every
+    HIGH_WATER_CHECK_COMMITS commits) or a write hits MapFullError, it grows by
+    lmdb_map_growth_bytes, up to lmdb_map_max_bytes and never past what the disk
+    can hold: the data file's current size plus the free disk space minus
+    lmdb_disk_reserve_bytes (the file is sparse, so the map size says nothing
+    about the disk in use). At that cap the retention policy frees space
+    instead:
+        drop_oldest: delete the oldest records of the largest backlog
+        device_status_first: delete the oldest device statuses, then fall back to drop_oldest
+        downsample_sensor: merge the oldest sensor batches keeping every other reading
+            per sensor, then fall back to drop_oldest once no reading can be dropped
+    """
+
+    def __init__(self, env: lmdb.Environment):
+        self.settings = _settings
+        policy = self.settings.lmdb_retention_policy
+        if policy not in RETENTION_POLICIES:
+            raise ValueError(f"Invalid LMDB retention policy '{policy}'. Must be one of {RETENTION_POLICIES}.")
+        self._env = env
+        self._policy = policy
+        self._counters = {
+            "grows": 0,
+            "map_full_errors": 0,
+            "downsampled_readings": 0,
+            "commits": 0,
+            "writes": 0,
+            "largest_group": 0,
+            "syncs": 0,
+        }
+        self._evicted = {metric_type.value: 0 for metric_type in MetricType}
+        self._queue: queue.Queue = queue.Queue()
+        self._writer_thread: threading.Thread | None = None
+        self._writer_start_lock = threading.Lock()
+        self._waiting = 0
+        self._commits_since_check = HIGH_WATER_CHECK_COMMITS
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    @property
+    def map_size(self) -> int:
+        return self._env.info()["map_size"]
+
+    def used_bytes(self) -> int:
+        """Bytes in use by every database (pages on the freelist are not counted)."""
+        with lmdb_write_lock, self._env.begin() as txn:
+            page_size = self._env.stat()["psize"]
+            dbs = (*metric_dbs.values(), meta_db, sensor_index_db, sensor_index_batches_db)
+            stats = [txn.stat(db) for db in dbs] + [self._env.stat()]
+        return page_size * sum(s["branch_pages"] + s["leaf_pages"] + s["overflow_pages"] for s in stats)
+
+    def file_bytes(self) -> int:
+        """Bytes the data file actually occupies (up to its last used page)."""
+        return (self._env.info()["last_pgno"] + 1) * self._env.stat()["psize"]
+
+    def _map_cap(self) -> int:
+        free = shutil.disk_usage(self._env.path()).free
+        disk_cap = self.file_bytes() + free - self.settings.lmdb_disk_reserve_bytes
+        return max(self.map_size, min(self.settings.lmdb_map_max_bytes, disk_cap))
+
+    def _above_high_water(self) -> bool:
+        return self.used_bytes() >= self.map_size * self.settings.lmdb_high_water_ratio
+
+    def _grow(self) -> bool:
+        new_size = min(self.map_size + self.settings.lmdb_map_growth_bytes, self._map_cap())
+        if new_size <= self.map_size:
+            return False
+        old_size = self.map_size
+        with reader_limiter.exclusive():
+            self._env.set_mapsize(new_size)
+        self._counters["grows"] += 1
+        logger.info(f"Grew LMDB map from {old_size // (1024 * 1024)} MiB to {new_size // (1024 * 1024)} MiB")
+        return True
+
+    def _oldest_keys(self, txn, metric_type: MetricType, count: int) -> list[bytes]:
+        with txn.cursor(db=metric_dbs[metric_type]) as cursor:
+            keys = []
+            for key in cursor.iternext(keys=True, values=False):
+                keys.append(key)
+                if len(keys) >= count:
+                    break
+        return keys
+
+    def _drop_oldest(self, txn, metric_types=EVICTABLE_METRIC_TYPES) -> int:
+        """Delete the oldest records of the metric type with the most entries."""
+        metric_type = max(metric_types, key=lambda mt: txn.stat(metric_dbs[mt])["entries"])
+        from common.lmdb_index import unindex_batch
+
+        keys = self._oldest_keys(txn, metric_type, self.settings.lmdb_eviction_batch)
+        for key in keys:
+            txn.delete(key, db=metric_dbs[metric_type])
+            if metric_type == MetricType.SENSOR:
+                unindex_batch(txn, key)
+        self._evicted[metric_type.value] += len(keys)
+        if keys:
+            logger.warning(f"LMDB full: evicted the {len(keys)} oldest {metric_type.value} record(s)")
+        return len(keys)
+
+    def _downsample_sensor(self, txn) -> int:
+        """
+        Halve the oldest sensor batches: each pair of batches is merged into the first
+        record, keeping every other reading of each sensor, and the second is deleted.
+        Merged records stay about the size of the originals, so no large pages are needed.
+        """
+        from common.lmdb_codec import RecordCodec
+        from common.lmdb_index import index_batch, unindex_batch
+
+        codec = RecordCodec()
+        db = metric_dbs[MetricType.SENSOR]
+        batches = []
+        for key in self._oldest_keys(txn, MetricType.SENSOR, self.settings.lmdb_eviction_batch):
+            try:
+                batch = json.loads(codec.decode(txn.get(key, db=db)))
+            except (ValueError, LookupError):
+                continue
+            if batch.get("status_code") != 422:
+                batches.append((key, batch.get("payload") or batch.get("metrics") or []))
+
+        dropped = 0
+        for (first_key, first), (second_key, second) in zip(batches[::2], batches[1::2]):
+            seen: dict[str, int] = {}
+            kept = []
+            for reading in first + second:
+                index = seen.get(reading.get("id"), 0)
+                seen[reading.get("id")] = index + 1
+                if index % 2 == 0:
+                    kept.append(reading)
+            merged = {"payload": kept, "status_code": None, "metric_type": MetricType.SENSOR.value}
+            txn.delete(second_key, db=db)
+            txn.put(first_key, codec.encode(json.dumps(merged, separators=(",", ":")).encode("utf-8"), train=False), db=db)
+            unindex_batch(txn, first_key)
+            unindex_batch(txn, second_key)
+            index_batch(txn, first_key, kept)
+            dropped += len(first) + len(second) - len(kept)
+        if dropped:
+            self._counters["downsampled_readings"] += dropped
+            logger.warning(f"LMDB full: downsampled {len(batches)} old sensor batches, dropping {dropped} reading(s)")
+        return dropped
+
+    def _evict(self) -> bool:
+        """Free space with the retention policy. Returns False if nothing could be evicted."""
+        with self._env.begin(write=True) as txn:
+            if self._policy == "device_status_first" and self._drop_oldest(txn, (MetricType.DEVICE_STATUS,)):
+                return True
+            if self._policy == "downsample_sensor" and self._downsample_sensor(txn):
+                return True
+            return self._drop_oldest(txn) > 0
+
+    def _make_room(self) -> bool:
+        """Grow the map, or evict once it can't grow any more. Returns False if neither was possible."""
+        return self._grow() or self._evict()
+
+    def write(self, operation, db=None):
+        """
+        Run `operation(txn)` in a write transaction and return its result once committed.
+
+        Space is made ahead of the write once the map is above its high-water mark,
+        and the write is retried after a MapFullError until nothing more can be freed.
+
+        Raises:
+            lmdb.MapFullError: If the map is full and neither growing nor eviction freed space
+            OSError: If making room failed, e.g. the free disk space could not be read
+        """
+        pending = _PendingWrite(operation, db)
+        if not self.settings.lmdb_group_commit_enabled or threading.current_thread() is self._writer_thread:
+            self._commit([pending])
+        else:
+            self._start_writer()
+            with self._writer_start_lock:
+                self._waiting += 1
+            self._queue.put(pending)
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _start_writer(self) -> None:
+        with self._writer_start_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(target=self._writer_loop, name="lmdb-writer", daemon=True)
+                self._writer_thread.start()
+
+    def _writer_loop(self) -> None:
+        periodic = self.settings.lmdb_durability == "periodic"
+        while True:
+            try:
+                if not self._write_next(periodic):
+                    return
+            except Exception:
+                # _commit has already released the writers of the group; keep serving the queue
+                logger.exception("LMDB writer thread error")
+
+    def _write_next(self, periodic: bool) -> bool:
+        """Commit the next group of queued writes. Returns False once stop() was requested."""
+        try:
+            first = self._queue.get(timeout=self.settings.lmdb_sync_interval_seconds if periodic else None)
+        except queue.Empty:
+            self.sync()
+            return True
+        group = []
+        if first is not None:
+            self._dequeued(first, group)
+        deadline = time.monotonic() + self.settings.lmdb_group_commit_window_seconds
+        # Only wait for writers that are in write() but not dequeued yet; a lone writer commits at once
+        while first is not None and self._waiting and len(group) < self.settings.lmdb_group_commit_max_ops:
+            try:
+                pending = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if pending is None:
+                first = None
+                break
+            self._dequeued(pending, group)
+        if group:
+            self._commit(group)
+        if periodic and time.monotonic() - self._last_sync >= self.settings.lmdb_sync_interval_seconds:
+            self.sync()
+        return first is not None
+
+    def _dequeued(self, pending: _PendingWrite, group: list[_PendingWrite]) -> None:
+        """Add a write taken off the queue to the group; its writer no longer counts as waiting."""
+        with self._writer_start_lock:
+            self._waiting -= 1
+        group.append(pending)
+
+    def _commit(self, group: list[_PendingWrite]) -> None:
+        """
+        Run a group of writes in one transaction, each in its own nested transaction.
+
+        Every writer of the group is released, whatever is raised: an error that
+        aborts the whole transaction is handed to each of them.
+        """
+        try:
+            with lmdb_write_lock:
+                self._check_high_water()
+                while True:
+                    try:
+                        with self._env.begin(write=True) as txn:
+                            for pending in group:
+                                pending.result, pending.error = None, None
+                                try:
+                                    with self._env.begin(write=True, parent=txn, db=pending.db) as nested:
+                                        pending.result = pending.operation(nested)
+                                except lmdb.MapFullError:
+                                    raise
+                                except Exception as e:
+                                    pending.error = e
+                        break
+                    except lmdb.MapFullError as e:
+                        self._counters["map_full_errors"] += 1
+                        if not self._make_room():
+                            for pending in group:
+                                pending.error = e
+                            break
+                    except lmdb.Error as e:
+                        for pending in group:
+                            pending.error = e
+                        break
+                self._counters["commits"] += 1
+                self._counters["writes"] += len(group)
+                self._counters["largest_group"] = max(self._counters["largest_group"], len(group))
+                self._unsynced = True
+        except Exception as e:
+            logger.error(f"LMDB write group of {len(group)} failed: {e}")
+            for pending in group:
+                pending.result, pending.error = None, e
+        finally:
+            for pending in group:
+                pending.done.set()
+
+    def _check_high_water(self) -> None:
+        """Make room ahead of the writes every HIGH_WATER_CHECK_COMMITS commits if the map is above its high-water mark."""
+        self._commits_since_check += 1
+        if self._commits_since_check < HIGH_WATER_CHECK_COMMITS:
+            return
+        self._commits_since_check = 0
+        try:
+            for _ in range(self.settings.lmdb_max_evictions_per_write):
+                if not self._above_high_water() or not self._make_room():
+                    break
+        except (OSError, lmdb.Error) as e:
+            # Only a precaution: the writes may still fit, and a MapFullError makes room again
+            logger.warning(f"Could not make room in LMDB ahead of a write: {e}")
+
+    def sync(self) -> None:
+        """Flush committed writes to disk (only needed with periodic durability)."""
+        with lmdb_write_lock:
+            self._last_sync = time.monotonic()
+            if self.settings.lmdb_durability == "periodic" and self._unsynced:
+                self._unsynced = False
+                self._env.sync(True)
+                self._counters["syncs"] += 1
+
+    def stop(self) -> None:
+        """Commit queued writes, stop the writer thread and flush to disk."""
+        with self._writer_start_lock:
+            writer, self._writer_thread = self._writer_thread, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        self.sync()
+
+    def close(self) -> None:
+        """Commit queued writes, flush and close the environment. LMDB can't be used afterwards."""
+        self.stop()
+        with lmdb_write_lock, reader_limiter.exclusive():
+            self._env.close()
+        logger.info("LMDB environment closed")
+
+    def record_counts(self) -> dict[str, int]:
+        """Stored records per metric type, read from the database stats rather than a scan."""
+        with lmdb_write_lock, self._env.begin() as txn:
+            return {metric_type.value: txn.stat(db)["entries"] for metric_type, db in metric_dbs.items()}
+
+    def stats(self) -> dict:
+        """Return map occupancy, record counts, growth and eviction counters."""
+        used = self.used_bytes()
+        map_size = self.map_size
+        return {
+            "map_size": map_size,
+            "used_bytes": used,
+            "file_bytes": self.file_bytes(),
+            "occupancy": round(used / map_size, 3),
+            "records": self.record_counts(),
+            "readers": reader_limiter.stats(),
+            "policy": self._policy,
+            **self._counters,
+            "evicted": dict(self._evicted),
+        }
+
+
+storage_manager = StorageManager(lmdb_env)
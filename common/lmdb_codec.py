@@ -0,0 +1,223 @@
+"""
+LMDB Record Codec - Transparent compression of stored batches.
+
+Every record starts with a codec header byte. Records written before the codec
+existed are plain JSON and start with '{', so they still decode as-is.
+
+    0x01 | json                      uncompressed
+    0x02 | dict id (2 bytes) | data  zlib, with a preset dictionary unless the id is 0
+    0x03 | dict id (2 bytes) | data  zstd, with a dictionary unless the id is 0
+
+Stored batches are small and repetitive, so after enough records have been
+seen a dictionary is trained from them (zstd) or built from their content
+(zlib). Dictionaries are kept in the meta database and never change once
+written, so every record stays decodable after restarts and retraining.
+zstd needs the optional `zstandard` package; without it zlib is used.
+"""
+import logging
+import threading
+import time
+import zlib
+
+from common.lmdb_clients import lmdb_env, lmdb_write_lock, meta_db, storage_manager
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_CODECS = ("none", "zlib", "zstd")
+
+LEGACY_JSON = ord("{")
+RAW = 0x01
+ZLIB = 0x02
+ZSTD = 0x03
+CODEC_NAMES = {LEGACY_JSON: "legacy", RAW: "none", ZLIB: "zlib", ZSTD: "zstd"}
+
+DICT_ID_BYTES = 2
+DICT_KEY_PREFIX = b"dict:"
+CURRENT_DICT_KEY = b"dict-current:"
+# zlib only looks back 32 KiB, so a longer preset dictionary is wasted
+ZLIB_MAX_DICT_BYTES = 32 * 1024
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class RecordCodec:
+    """Singleton encoder/decoder for LMDB record values, with ratio and CPU time counters."""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._init_codec()
+        return cls._instance
+
+    def _init_codec(self) -> None:
+        self.settings = Settings()
+        codec = self.settings.lmdb_compression
+        if codec not in SUPPORTED_CODECS:
+            raise ValueError(f"Invalid LMDB compression codec '{codec}'. Must be one of {SUPPORTED_CODECS}.")
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, falling back to zlib for LMDB records")
+            codec = "zlib"
+        self._codec = codec
+        self._lock = threading.Lock()
+        self._dictionaries: dict[int, bytes] = {}
+        self._zstd_dicts: dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._dict_id = 0
+        self._samples: list[bytes] = []
+        self._counters = {
+            "records_encoded": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "encode_ms": 0.0,
+            "records_decoded": 0,
+            "decode_ms": 0.0,
+        }
+        self._load_dictionaries()
+
+    def _load_dictionaries(self) -> None:
+        with lmdb_write_lock, lmdb_env.begin(db=meta_db) as txn, txn.cursor() as cursor:
+            if cursor.set_range(DICT_KEY_PREFIX):
+                for key, value in cursor:
+                    if not key.startswith(DICT_KEY_PREFIX):
+                        break
+                    self._dictionaries[int(key[len(DICT_KEY_PREFIX):])] = bytes(value)
+            current = txn.get(CURRENT_DICT_KEY + self._codec.encode())
+        if current is not None:
+            self._dict_id = int(current)
+        if self._dictionaries:
+            logger.info(f"Loaded {len(self._dictionaries)} LMDB compression dictionaries, using #{self._dict_id}")
+
+    def _zstd_dict(self, dict_id: int):
+        if dict_id not in self._zstd_dicts:
+            self._zstd_dicts[dict_id] = zstandard.ZstdCompressionDict(self._dictionaries[dict_id])
+        return self._zstd_dicts[dict_id]
+
+    def _train_dictionary(self, samples: list[bytes]) -> None:
+        """Build a dictionary from sample records and persist it; called without the lock held."""
+        size = self.settings.lmdb_dictionary_size
+        if self._codec == "zstd":
+            try:
+                dictionary = zstandard.train_dictionary(size, samples).as_bytes()
+            except zstandard.ZstdError as e:
+                logger.warning(f"Could not train a zstd dictionary: {e}")
+                return
+        else:
+            # The end of a zlib dictionary is matched most cheaply, so keep the newest samples
+            dictionary = b"".join(samples)[-min(size, ZLIB_MAX_DICT_BYTES):]
+
+        dict_id = max(self._dictionaries, default=0) + 1
+        if dict_id >= 1 << (8 * DICT_ID_BYTES):
+            return
+
+        def store(txn):
+            txn.put(DICT_KEY_PREFIX + str(dict_id).encode(), dictionary)
+            txn.put(CURRENT_DICT_KEY + self._codec.encode(), str(dict_id).encode())
+
+        storage_manager.write(store, db=meta_db)
+        with self._lock:
+            self._dictionaries[dict_id] = dictionary
+            self._dict_id = dict_id
+        logger.info(f"Trained {self._codec} dictionary #{dict_id} ({len(dictionary)} bytes) from {len(samples)} records")
+
+    def encode(self, data: bytes, train: bool = True) -> bytes:
+        """
+        Compress a record value and prepend its codec header.
+
+        Args:
+            data: The record value
+            train: Use the record as a dictionary training sample. Training writes to LMDB,
+                so pass False from inside a write transaction.
+        """
+        if self._codec == "none":
+            return bytes([RAW]) + data
+
+        samples = None
+        if train and self.settings.lmdb_compression_dictionary and not self._dict_id:
+            with self._lock:
+                self._samples.append(data)
+                if len(self._samples) >= self.settings.lmdb_dictionary_samples:
+                    samples, self._samples = self._samples, []
+        if samples:
+            # Outside the lock: storing the dictionary takes lmdb_write_lock
+            self._train_dictionary(samples)
+
+        started = time.perf_counter()
+        with self._lock:
+            header = self._dict_id.to_bytes(DICT_ID_BYTES, "big")
+            if self._codec == "zstd":
+                dict_data = self._zstd_dict(self._dict_id) if self._dict_id else None
+                compressed = bytes([ZSTD]) + header + zstandard.ZstdCompressor(level=3, dict_data=dict_data).compress(data)
+            else:
+                if self._dict_id:
+                    compressor = zlib.compressobj(6, zdict=self._dictionaries[self._dict_id])
+                else:
+                    compressor = zlib.compressobj(6)
+                compressed = bytes([ZLIB]) + header + compressor.compress(data) + compressor.flush()
+
+            self._counters["records_encoded"] += 1
+            self._counters["bytes_in"] += len(data)
+            self._counters["bytes_out"] += len(compressed)
+            self._counters["encode_ms"] += (time.perf_counter() - started) * 1000
+        return compressed
+
+    def decode(self, data: bytes) -> bytes:
+        """
+        Strip the codec header and decompress a record value.
+
+        Raises:
+            ValueError: If the record is corrupt or has an unknown header
+            LookupError: If the record needs zstandard or a dictionary that is not available
+        """
+        codec = data[0] if data else None
+        if codec == LEGACY_JSON:
+            return bytes(data)
+        if codec == RAW:
+            return bytes(data[1:])
+        if codec not in (ZLIB, ZSTD):
+            raise ValueError(f"Unknown record codec header {codec!r}")
+
+        started = time.perf_counter()
+        dict_id = int.from_bytes(data[1:1 + DICT_ID_BYTES], "big")
+        body = data[1 + DICT_ID_BYTES:]
+        if dict_id and dict_id not in self._dictionaries:
+            raise LookupError(f"Compression dictionary #{dict_id} is missing")
+        if codec == ZSTD:
+            if zstandard is None:
+                raise LookupError("Record is zstd-compressed but zstandard is not installed")
+            dict_data = self._zstd_dict(dict_id) if dict_id else None
+            try:
+                decoded = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(body)
+            except zstandard.ZstdError as e:
+                raise ValueError(f"Corrupt zstd record: {e}") from e
+        else:
+            try:
+                if dict_id:
+                    decompressor = zlib.decompressobj(zdict=self._dictionaries[dict_id])
+                else:
+                    decompressor = zlib.decompressobj()
+                decoded = decompressor.decompress(body) + decompressor.flush()
+            except zlib.error as e:
+                raise ValueError(f"Corrupt zlib record: {e}") from e
+
+        with self._lock:
+            self._counters["records_decoded"] += 1
+            self._counters["decode_ms"] += (time.perf_counter() - started) * 1000
+        return decoded
+
+    def stats(self) -> dict:
+        """Return the codec, dictionary in use, compression ratio and codec CPU time."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "codec": self._codec,
+            "dictionary": self._dict_id,
+            **counters,
+            "encode_ms": round(counters["encode_ms"], 1),
+            "decode_ms": round(counters["decode_ms"], 1),
+            "ratio": round(counters["bytes_in"] / counters["bytes_out"], 2) if counters["bytes_out"] else None,
+        }
@@ -0,0 +1,218 @@
+"""
+LMDB Sensor Index - Secondary index of stored sensor batches by (sensor id, timestamp).
+
+Each reading of a stored sensor batch gets an index entry
+
+    <sensor id> 0x00 <timestamp, 8 bytes big-endian> <batch sequence key>
+
+so the batches holding a sensor's readings in a time range are found with one
+range scan. A reverse map lists the entries of each batch, so a batch is
+unindexed on delete without decoding it. Index updates happen in the same
+write transaction as the batch itself. Batches stored before the index
+existed are indexed once by backfill_index(). The retry worker uses the index
+to purge readings older than lmdb_sensor_retention_seconds.
+"""
+import json
+import logging
+
+from common.lmdb_clients import (
+    begin_read,
+    meta_db,
+    metric_dbs,
+    sensor_index_batches_db,
+    sensor_index_db,
+    storage_manager,
+)
+from common.lmdb_codec import RecordCodec
+from common.lmdb_sequence import SEQUENCE_KEY_BYTES, encode_key
+from common.metric_type import MetricType
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_BYTES = 8
+
+# Meta key recording that batches stored before the index existed have been indexed
+BACKFILL_DONE_KEY = b"sensor-index-backfilled"
+# Stored batches examined per write transaction while backfilling
+BACKFILL_CHUNK = 500
+
+
+def _index_prefix(sensor_id: str) -> bytes:
+    return sensor_id.encode() + b"\x00"
+
+
+def _index_key(sensor_id: str, timestamp: int, batch_key: bytes) -> bytes:
+    return _index_prefix(sensor_id) + int(timestamp).to_bytes(TIMESTAMP_BYTES, "big") + batch_key
+
+
+def index_batch(txn, batch_key: bytes, payload: list[dict]) -> int:
+    """
+    Index the readings of a sensor batch inside an open write transaction.
+
+    Returns:
+        The number of index entries written (readings without an id or timestamp are skipped)
+    """
+    entries = sorted({
+        (reading["id"], int(reading["timestamp"]))
+        for reading in payload
+        if isinstance(reading, dict) and "id" in reading and isinstance(reading.get("timestamp"), (int, float))
+    })
+    if not entries:
+        return 0
+    for sensor_id, timestamp in entries:
+        txn.put(_index_key(sensor_id, timestamp, batch_key), b"", db=sensor_index_db)
+    txn.put(batch_key, json.dumps(entries, separators=(",", ":")).encode(), db=sensor_index_batches_db)
+    return len(entries)
+
+
+def unindex_batch(txn, batch_key: bytes) -> None:
+    """Remove the index entries of a sensor batch inside an open write transaction."""
+    entries = txn.get(batch_key, db=sensor_index_batches_db)
+    if entries is None:
+        return
+    for sensor_id, timestamp in json.loads(entries):
+        txn.delete(_index_key(sensor_id, timestamp, batch_key), db=sensor_index_db)
+    txn.delete(batch_key, db=sensor_index_batches_db)
+
+
+def _scan(txn, sensor_id: str, start: int, end: int) -> list[bytes]:
+    """Return the keys of the batches holding readings of `sensor_id` with start <= timestamp < end."""
+    prefix = _index_prefix(sensor_id)
+    batch_keys = []
+    seen = set()
+    with txn.cursor(db=sensor_index_db) as cursor:
+        if not cursor.set_range(prefix + int(start).to_bytes(TIMESTAMP_BYTES, "big")):
+            return batch_keys
+        for key in cursor.iternext(keys=True, values=False):
+            if not key.startswith(prefix):
+                break
+            if int.from_bytes(key[len(prefix):len(prefix) + TIMESTAMP_BYTES], "big") >= end:
+                break
+            batch_key = key[-SEQUENCE_KEY_BYTES:]
+            if batch_key not in seen:
+                seen.add(batch_key)
+                batch_keys.append(batch_key)
+    return batch_keys
+
+
+def _in_range(reading: dict, sensor_id: str, start: int, end: int) -> bool:
+    return reading.get("id") == sensor_id and start <= reading.get("timestamp", -1) < end
+
+
+def _decode(codec: RecordCodec, data: bytes) -> dict:
+    return json.loads(codec.decode(data))
+
+
+def _indexed_sensors(txn) -> list[str]:
+    """Return the ids of the sensors with index entries, skipping from one sensor's entries to the next."""
+    sensor_ids = []
+    with txn.cursor(db=sensor_index_db) as cursor:
+        found = cursor.first()
+        while found:
+            key = cursor.key()
+            sensor_id = key[:key.index(b"\x00")]
+            sensor_ids.append(sensor_id.decode())
+            # Sensor ids contain no NUL, so the next sensor's entries sort at or after id + 0x01
+            found = cursor.set_range(sensor_id + b"\x01")
+    return sensor_ids
+
+
+def _purge_range(txn, codec: RecordCodec, sensor_id: str, start: int, end: int) -> int:
+    """
+    Delete the stored readings of `sensor_id` with start <= timestamp < end inside an open
+    write transaction. Batches left empty are deleted; others are rewritten without them.
+
+    Returns:
+        The number of readings deleted
+    """
+    db = metric_dbs[MetricType.SENSOR]
+    purged = 0
+    for batch_key in _scan(txn, sensor_id, start, end):
+        unindex_batch(txn, batch_key)
+        data = txn.get(batch_key, db=db)
+        if data is None:
+            continue
+        try:
+            batch = _decode(codec, data)
+        except (ValueError, LookupError):
+            continue
+        payload = batch.get("payload") or batch.get("metrics") or []
+        kept = [reading for reading in payload if not _in_range(reading, sensor_id, start, end)]
+        purged += len(payload) - len(kept)
+        if not kept:
+            txn.delete(batch_key, db=db)
+            continue
+        batch["payload"] = kept
+        batch.pop("metrics", None)
+        txn.put(batch_key, codec.encode(json.dumps(batch, separators=(",", ":")).encode("utf-8"), train=False), db=db)
+        index_batch(txn, batch_key, kept)
+    return purged
+
+
+def purge_before(cutoff: int) -> int:
+    """
+    Delete every stored sensor reading with a timestamp before `cutoff`, found through the index.
+
+    Returns:
+        The number of readings deleted
+    """
+    codec = RecordCodec()
+
+    def purge(txn) -> int:
+        return sum(_purge_range(txn, codec, sensor_id, 0, cutoff) for sensor_id in _indexed_sensors(txn))
+
+    purged = storage_manager.write(purge)
+    if purged:
+        logger.info(f"Purged {purged} stored sensor reading(s) older than {cutoff}")
+    return purged
+
+
+def backfill_index() -> int:
+    """
+    Index the sensor batches stored before the index existed.
+
+    Runs once: completion is recorded in the meta database. Work is split into
+    write transactions of BACKFILL_CHUNK batches, and batches that already have
+    index entries are skipped, so an interrupted backfill resumes cheaply.
+
+    Returns:
+        The number of batches indexed
+    """
+    with begin_read(db=meta_db) as txn:
+        if txn.get(BACKFILL_DONE_KEY) is not None:
+            return 0
+
+    codec = RecordCodec()
+    db = metric_dbs[MetricType.SENSOR]
+
+    def backfill(txn, start_key: bytes) -> tuple[bytes | None, int]:
+        """Index one chunk from start_key; returns the key to resume from (None when done) and the count."""
+        indexed = 0
+        examined = 0
+        with txn.cursor(db=db) as cursor:
+            if not cursor.set_range(start_key):
+                txn.put(BACKFILL_DONE_KEY, b"1", db=meta_db)
+                return None, indexed
+            for key, value in cursor:
+                if examined >= BACKFILL_CHUNK:
+                    return bytes(key), indexed
+                examined += 1
+                if txn.get(key, db=sensor_index_batches_db) is not None:
+                    continue
+                try:
+                    batch = _decode(codec, value)
+                except (ValueError, LookupError):
+                    continue
+                if index_batch(txn, bytes(key), batch.get("payload") or batch.get("metrics") or []):
+                    indexed += 1
+        txn.put(BACKFILL_DONE_KEY, b"1", db=meta_db)
+        return None, indexed
+
+    total = 0
+    start_key = encode_key(0)
+    while start_key is not None:
+        start_key, indexed = storage_manager.write(lambda txn, start_key=start_key: backfill(txn, start_key))
+        total += indexed
+    if total:
+        logger.info(f"Indexed {total} sensor batch(es) stored before the sensor index existed")
+    return total
@@ -0,0 +1,55 @@
+"""
+LMDB Sequence Keys - Durable, monotonic record keys per metric type.
+
+Keys are fixed-width big-endian sequence numbers, so LMDB's byte ordering is
+numeric ordering and every new record can be written with append=True (an O(1)
+append to the last page). The last allocated number for each metric type is
+stored in the meta database inside the same write transaction as the record.
+"""
+from common.lmdb_clients import meta_db, metric_dbs
+from common.metric_type import MetricType
+
+SEQUENCE_KEY_BYTES = 8
+
+
+def encode_key(sequence: int) -> bytes:
+    """Encode a sequence number as a fixed-width big-endian key."""
+    return sequence.to_bytes(SEQUENCE_KEY_BYTES, "big")
+
+
+def decode_key(key: bytes) -> int:
+    """Decode a fixed-width big-endian key back into its sequence number."""
+    return int.from_bytes(key, "big")
+
+
+def next_sequence_key(txn, metric_type: MetricType) -> bytes:
+    """
+    Allocate the next key for a metric type inside an open write transaction.
+
+    The counter never falls behind the newest stored key, so appends stay valid
+    even if the meta database was lost or records were written before it existed.
+    """
+    counter_key = f"seq:{metric_type.value}".encode()
+    stored = txn.get(counter_key, db=meta_db)
+    sequence = decode_key(stored) + 1 if stored else 1
+
+    with txn.cursor(db=metric_dbs[metric_type]) as cursor:
+        if cursor.last():
+            sequence = max(sequence, decode_key(cursor.key()) + 1)
+
+    key = encode_key(sequence)
+    txn.put(counter_key, key, db=meta_db)
+    return key
+
+
+def append_record(txn, metric_type: MetricType, data: bytes) -> bytes:
+    """
+    Append a record under the next sequence key for its metric type.
+
+    Returns:
+        The key the record was stored under
+    """
+    key = next_sequence_key(txn, metric_type)
+    if not txn.put(key, data, db=metric_dbs[metric_type], append=True):
+        raise RuntimeError(f"Failed to append {metric_type.value} record with sequence {decode_key(key)}")
+    return key
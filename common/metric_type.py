@@ -5,3 +5,5 @@ class MetricType(Enum):
     """Enum to distinguish between different metric types for routing and storage."""
     SENSOR = "sensor-batch"
     DEVICE_STATUS = "device-status"
+    SENSOR_METADATA = "sensor-metadata"
+    WAVEFORM = "waveform"
@@ -0,0 +1,180 @@
+"""
+Oversampling - Burst acquisition settings and the filter chain run on each burst.
+
+An oversampled sensor takes `samples` ADC conversions per reading at the
+configured ADS1115 data rate. The window goes through the filters in order,
+each returning a new window, and the reading's value is the mean of what is
+left. Filters are configured per sensor in sensor_config.yaml:
+
+    oversampling:
+      samples: 32
+      data_rate: 860
+      filters:
+        - type: outlier
+          threshold: 3.5
+        - type: trimmed_mean
+          proportion: 0.1
+        - type: ema
+          alpha: 0.3
+"""
+import math
+
+# Conversion rates (samples per second) supported by the ADS1115
+ADS1115_DATA_RATES = (8, 16, 32, 64, 128, 250, 475, 860)
+
+# Scales the median absolute deviation to a standard deviation for normally distributed noise
+MAD_TO_STDDEV = 1.4826
+
+
+def _median(window: list[float]) -> float:
+    ordered = sorted(window)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class MedianFilter:
+    """Reduces the window to its median."""
+
+    def apply(self, window: list[float]) -> list[float]:
+        return [_median(window)]
+
+
+class TrimmedMeanFilter:
+    """Reduces the window to its mean after dropping `proportion` of the samples at each end."""
+
+    def __init__(self, proportion: float = 0.1):
+        if not 0 <= proportion < 0.5:
+            raise ValueError(f"Invalid trim proportion {proportion}. Must be at least 0 and below 0.5.")
+        self.proportion = proportion
+
+    def apply(self, window: list[float]) -> list[float]:
+        trim = int(len(window) * self.proportion)
+        kept = sorted(window)[trim:len(window) - trim]
+        return [math.fsum(kept) / len(kept)]
+
+
+class OutlierFilter:
+    """Drops samples further than `threshold` robust standard deviations (from the MAD) from the median."""
+
+    def __init__(self, threshold: float = 3.5):
+        if threshold <= 0:
+            raise ValueError(f"Invalid outlier threshold {threshold}. Must be positive.")
+        self.threshold = threshold
+
+    def apply(self, window: list[float]) -> list[float]:
+        median = _median(window)
+        deviations = [abs(sample - median) for sample in window]
+        spread = MAD_TO_STDDEV * _median(deviations)
+        if spread == 0:
+            # Most samples are identical (a quiet, quantized signal); nothing stands out reliably
+            return window
+        limit = self.threshold * spread
+        kept = [sample for sample, deviation in zip(window, deviations) if deviation <= limit]
+        # With a tight threshold nothing may survive; keep the window rather than drop the reading
+        return kept or window
+
+
+class EMAFilter:
+    """Exponential moving average run through the window, carried over from one reading to the next."""
+
+    def __init__(self, alpha: float = 0.3):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"Invalid EMA alpha {alpha}. Must be above 0 and at most 1.")
+        self.alpha = alpha
+        self._average: float | None = None
+
+    def apply(self, window: list[float]) -> list[float]:
+        average = self._average
+        for sample in window:
+            average = sample if average is None else average + self.alpha * (sample - average)
+        self._average = average
+        return [average]
+
+
+FILTERS = {
+    "median": MedianFilter,
+    "trimmed_mean": TrimmedMeanFilter,
+    "outlier": OutlierFilter,
+    "ema": EMAFilter,
+}
+
+
+def summarize(window: list[float]) -> dict:
+    """
+    Return the mean, min, max, population standard deviation and size of a sample window.
+
+    Raises:
+        ValueError: If the window is empty
+    """
+    if not window:
+        raise ValueError("Cannot summarize an empty sample window.")
+    mean = math.fsum(window) / len(window)
+    variance = math.fsum((sample - mean) ** 2 for sample in window) / len(window)
+    return {
+        "mean": mean,
+        "min": min(window),
+        "max": max(window),
+        "stddev": math.sqrt(variance),
+        "samples": len(window),
+    }
+
+
+class OversamplingConfig:
+    """Per-sensor burst size, ADS1115 data rate and filter chain."""
+
+    def __init__(self, samples: int = 16, data_rate: int | None = None, filters: list | None = None):
+        """
+        Initialize the oversampling configuration.
+
+        Args:
+            samples: ADC conversions per reading
+            data_rate: ADS1115 conversion rate during the burst (None keeps the chip's current rate)
+            filters: Filters applied in order to each window
+
+        Raises:
+            ValueError: If samples is below 1 or the data rate is not supported by the ADS1115
+        """
+        if samples < 1:
+            raise ValueError(f"Invalid sample count {samples}. Must be at least 1.")
+        if data_rate is not None and data_rate not in ADS1115_DATA_RATES:
+            raise ValueError(f"Invalid ADS1115 data rate {data_rate}. Must be one of {ADS1115_DATA_RATES}.")
+        self.samples = samples
+        self.data_rate = data_rate
+        self.filters = filters or []
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "OversamplingConfig":
+        """
+        Build a configuration from a sensor_config.yaml 'oversampling' block.
+
+        Raises:
+            ValueError: If a filter type is unknown or a filter option is invalid
+        """
+        filters = []
+        for filter_def in config.get('filters') or []:
+            options = dict(filter_def)
+            filter_type = options.pop('type', None)
+            if filter_type not in FILTERS:
+                raise ValueError(f"Invalid filter type '{filter_type}'. Must be one of {tuple(FILTERS)}.")
+            filters.append(FILTERS[filter_type](**options))
+        return cls(
+            samples=int(config.get('samples', 16)),
+            data_rate=config.get('data_rate'),
+            filters=filters,
+        )
+
+    def apply(self, window: list[float]) -> float:
+        """
+        Run the filter chain over a window and return the mean of the result.
+
+        Raises:
+            ValueError: If the window is empty
+        """
+        if not window:
+            raise ValueError("Cannot filter an empty sample window.")
+        for sample_filter in self.filters:
+            filtered = sample_filter.apply(window)
+            window = filtered or window
+        return math.fsum(window) / len(window)
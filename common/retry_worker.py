@@ -1,92 +1,422 @@
 import json
 import logging
 import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from time import sleep
-
-from common.lmdb_clients import lmdb_write_client, lmdb_read_client
+from common.circuit_breaker import BreakerState, CircuitBreaker, backoff_delay
+from common.concurrency_limiter import ConcurrencyLimiter
+from common.lmdb_codec import RecordCodec
+from common.lmdb_clients import (
+    META_DB_NAME,
+    SENSOR_INDEX_BATCHES_DB_NAME,
+    SENSOR_INDEX_DB_NAME,
+    begin_read,
+    metric_dbs,
+    storage_manager,
+)
+from common.lmdb_index import backfill_index, index_batch, purge_before, unindex_batch
+from common.lmdb_sequence import append_record, decode_key, encode_key
 from common.metric_type import MetricType
+from common.settings import Settings
 from metrics_exporter import APIExporter
 
+# Keys in the main database that are sub-database names rather than legacy records
+SUB_DB_NAMES = {metric_type.value.encode() for metric_type in MetricType} | {
+    META_DB_NAME,
+    SENSOR_INDEX_DB_NAME,
+    SENSOR_INDEX_BATCHES_DB_NAME,
+}
+
+# Order in which the backlog is leased out:
+#   fifo: oldest records of each type first
+#   newest_first: newest records of each type first, so dashboards get fresh data before history
+#   interleaved: one chunk per metric type in turn
+#   weighted: retry_drain_weights chunks per metric type in turn
+DRAIN_POLICIES = ("fifo", "newest_first", "interleaved", "weighted")
+
 
 class RetryWorker:
 
     def __init__(self, max_retries: int = 3):
         self.max_retries = max_retries
+        self.settings = Settings()
         self._api_exporter = APIExporter()
+        self._circuit_breaker = CircuitBreaker()
+        self._codec = RecordCodec()
         self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=self.settings.retry_drain_workers, thread_name_prefix="retry-drain")
+        concurrency = {
+            MetricType.SENSOR: self.settings.retry_sensor_concurrency,
+            MetricType.DEVICE_STATUS: self.settings.retry_device_status_concurrency,
+            MetricType.SENSOR_METADATA: self.settings.retry_sensor_metadata_concurrency,
+            MetricType.WAVEFORM: self.settings.retry_waveform_concurrency,
+        }
+        self._limiters = {
+            metric_type: ConcurrencyLimiter(
+                f"retry {metric_type.value}",
+                max(1, min(limit, self.settings.retry_drain_workers)),
+                adaptive=self.settings.retry_adaptive_concurrency,
+                latency_target=self.settings.retry_latency_target_seconds,
+            )
+            for metric_type, limit in concurrency.items()
+        }
+        priority = self.settings.retry_priority_metric_type
+        self._priority = MetricType(priority) if priority else None
+        policy = self.settings.retry_drain_policy
+        if policy not in DRAIN_POLICIES:
+            raise ValueError(f"Invalid drain policy '{policy}'. Must be one of {DRAIN_POLICIES}.")
+        self._policy = policy
+        self._weights = {metric_type: 1 for metric_type in MetricType}
+        if policy == "weighted":
+            self._weights.update({
+                MetricType(name): max(0, int(weight)) for name, weight in self.settings.retry_drain_weights.items()
+            })
+        self._leases = 0
+        self._acknowledged = 0
+        self._collapsed = 0
+        self._purged = 0
+        self._migrate_legacy_batches()
+        backfill_index()
         self._retry_thread = threading.Thread(target=self._retry_loop, daemon=True)
         self._retry_thread.start()
 
-    def _get_lmdb_keys(self):
-        with lmdb_read_client.begin() as txn:
+    def _migrate_legacy_batches(self):
+        """Move batches stored under the old '<metric-type>-<unix-time>' keys into the per-type sub-databases."""
+        def migrate(txn) -> list:
             with txn.cursor() as cursor:
-                keys = [key.decode() for key, _ in cursor]
-        logging.info(f"LMDB keys: {keys}")
-        return keys
-
-    def _get_stored_batch(self, key: str):
-        with lmdb_read_client.begin() as txn:
-            data = txn.get(key.encode())
-            if data:
-                return json.loads(data.decode())
-        return None
-
-    def _delete_stored_batch(self, key: str):
-        with lmdb_write_client.begin(write=True) as txn:
-            if txn.delete(key.encode()):
-                logging.info(f"Deleted batch from LMDB with key: {key}")
-                return True
-            logging.warning(f"Failed to delete batch from LMDB with key: {key}")
-            return False
+                legacy = [(key, value) for key, value in cursor if key not in SUB_DB_NAMES]
+            for key, value in legacy:
+                batch = self._decode_stored_batch(value) or {}
+                stored_type = batch.get("metric_type")
+                metric_type = MetricType(stored_type) if stored_type else self._parse_metric_type_from_key(key.decode())
+                new_key = append_record(txn, metric_type, value)
+                if metric_type == MetricType.SENSOR:
+                    index_batch(txn, new_key, batch.get("payload") or batch.get("metrics") or [])
+                txn.delete(key)
+            return legacy
+
+        legacy = storage_manager.write(migrate)
+        if legacy:
+            logging.info(f"Migrated {len(legacy)} legacy batch(es) to sequence keys")
+
+    def _read_chunk(self, metric_type: MetricType, after_key: bytes | None) -> list[tuple[bytes, bytes]]:
+        """
+        Read up to retry_chunk_size records past `after_key` in one read transaction.
+
+        Records are read in key order, or in reverse key order (before `after_key`)
+        with the newest_first drain policy. Sensor metadata is always read oldest first,
+        so the newest descriptors reach the collector last.
+        """
+        chunk = []
+        with begin_read(db=metric_dbs[metric_type]) as txn, txn.cursor() as cursor:
+            if self._policy == "newest_first" and metric_type != MetricType.SENSOR_METADATA:
+                if after_key is None:
+                    positioned = cursor.last()
+                else:
+                    # The newest record before after_key
+                    positioned = cursor.prev() if cursor.set_range(after_key) else cursor.last()
+                records = cursor.iterprev() if positioned else iter(())
+            else:
+                start_key = encode_key(decode_key(after_key) + 1) if after_key is not None else encode_key(0)
+                records = cursor.iternext() if cursor.set_range(start_key) else iter(())
+            for key, value in records:
+                chunk.append((key, value))
+                if len(chunk) >= self.settings.retry_chunk_size:
+                    break
+        return chunk
+
+    def _collapse_device_status(self) -> int:
+        """Delete every stored device status but the newest; older statuses are superseded."""
+        db = metric_dbs[MetricType.DEVICE_STATUS]
+
+        def collapse(txn) -> int:
+            with txn.cursor(db=db) as cursor:
+                if not cursor.last():
+                    return 0
+                newest = cursor.key()
+                cursor.first()
+                superseded = [key for key in cursor.iternext(keys=True, values=False) if key != newest]
+            for key in superseded:
+                txn.delete(key, db=db)
+            return len(superseded)
+
+        collapsed = storage_manager.write(collapse)
+        if collapsed:
+            self._collapsed += collapsed
+            logging.info(f"Dropped {collapsed} superseded device status batch(es), keeping the newest")
+        return collapsed
+
+    def _decode_record(self, data: bytes) -> bytes | None:
+        """
+        Decode a stored record value into its JSON bytes, or None if it is corrupt.
+
+        Raises:
+            LookupError: If the record's codec or dictionary is unavailable; the record is kept
+        """
+        try:
+            return self._codec.decode(data)
+        except ValueError as e:
+            logging.error(f"Could not decode stored batch: {e}")
+            return None
+
+    def _parse_batch(self, raw: bytes | None) -> dict | None:
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            logging.error(f"Could not decode stored batch: {e}")
+            return None
+
+    def _decode_stored_batch(self, data: bytes) -> dict | None:
+        return self._parse_batch(self._decode_record(data))
+
+    def _delete_stored_batches(self, metric_type: MetricType, keys: list[bytes]) -> int:
+        """Delete acknowledged batches in a single write transaction."""
+        if not keys:
+            return 0
+        db = metric_dbs[metric_type]
+
+        def delete(txn) -> int:
+            deleted = 0
+            for key in keys:
+                if txn.delete(key, db=db):
+                    deleted += 1
+                if metric_type == MetricType.SENSOR:
+                    unindex_batch(txn, key)
+            return deleted
+
+        deleted = storage_manager.write(delete)
+        logging.info(
+            f"Deleted {deleted} {metric_type.value} batch(es) from LMDB "
+            f"({self._key_label(metric_type, keys[0])}..{self._key_label(metric_type, keys[-1])})"
+        )
+        return deleted
+
+    def _key_label(self, metric_type: MetricType, key: bytes) -> str:
+        return f"{metric_type.value}#{decode_key(key)}"
 
     def _parse_metric_type_from_key(self, key: str) -> MetricType:
-        """Parse the metric type from the LMDB key prefix."""
+        """Parse the metric type from a legacy LMDB key prefix."""
         if key.startswith(MetricType.DEVICE_STATUS.value):
             return MetricType.DEVICE_STATUS
+        elif key.startswith(MetricType.SENSOR_METADATA.value):
+            return MetricType.SENSOR_METADATA
         elif key.startswith(MetricType.SENSOR.value):
             return MetricType.SENSOR
         # Legacy support for old 'batch-' keys (treat as sensor metrics)
         return MetricType.SENSOR
 
-    def _retry_batch(self, key: str):
-        batch = self._get_stored_batch(key)
-        if not batch:
-            logging.info(f"No batch found for key: {key}")
+    def _send(self, payload, metric_type: MetricType) -> int:
+        """Send a payload and feed its latency and status back to the metric type's concurrency limiter."""
+        started = time.monotonic()
+        response = self._api_exporter(payload, metric_type)
+        self._limiters[metric_type].record(time.monotonic() - started, response)
+        return response
+
+    def _retry_batch(self, metric_type: MetricType, key: bytes, data: bytes) -> bool:
+        """
+        Resend a stored batch.
+
+        Returns:
+            True if the batch is acknowledged and can be deleted (sent, or not retryable)
+        """
+        label = self._key_label(metric_type, key)
+        try:
+            batch = self._decode_stored_batch(data)
+        except LookupError as e:
+            logging.error(f"Keeping batch {label}: {e}")
             return False
+        if not batch:
+            logging.warning(f"Dropping undecodable batch: {label}")
+            return True
 
-        # Get payload and metric type from stored data
+        # Get payload from stored data
         # Support both old 'metrics' key and new 'payload' key for backwards compatibility
         payload = batch.get("payload") or batch.get("metrics")
         status_code = batch.get("status_code")
-        
-        # Determine metric type from stored data or key prefix
-        stored_type = batch.get("metric_type")
-        if stored_type:
-            metric_type = MetricType(stored_type)
-        else:
-            metric_type = self._parse_metric_type_from_key(key)
 
         if status_code == 422:
-            logging.warning(f"Batch {key} has validation error (422), skipping retry")
-            self._delete_stored_batch(key)
-            return False
+            logging.warning(f"Batch {label} has validation error (422), skipping retry")
+            return True
 
         for attempt in range(1, self.max_retries + 1):
-            response = self._api_exporter(payload, metric_type)
+            response = self._send(payload, metric_type)
             if response == 201:
-                logging.info(f"Successfully sent {metric_type.value} batch for key: {key} on attempt {attempt}")
-                self._delete_stored_batch(key)
+                logging.info(f"Successfully sent {metric_type.value} batch for key: {label} on attempt {attempt}")
                 return True
-            logging.error(f"Attempt {attempt} failed for key: {key}, status code: {response}")
-            sleep(1)
+            logging.error(f"Attempt {attempt} failed for key: {label}, status code: {response}")
+            if self._circuit_breaker.state != BreakerState.CLOSED:
+                break  # Collector is down; leave the batch stored until the breaker lets probes through
+            if attempt < self.max_retries:
+                self._stop.wait(backoff_delay(attempt, base=1.0, cap=10.0))
         return False
 
+    def _send_merged(self, records: list[tuple[bytes, bytes, list]]) -> list[bytes]:
+        """
+        Send several stored sensor batches as one upload.
+
+        Returns:
+            The keys acknowledged by the collector. When the merged upload is rejected
+            with 422, each batch is replayed on its own so one bad record doesn't
+            block the others.
+        """
+        if len(records) == 1:
+            key, data, _ = records[0]
+            return [key] if self._retry_batch(MetricType.SENSOR, key, data) else []
+
+        merged = [reading for _, _, payload in records for reading in payload]
+        first = self._key_label(MetricType.SENSOR, records[0][0])
+        last = self._key_label(MetricType.SENSOR, records[-1][0])
+        response = self._send(merged, MetricType.SENSOR)
+        if response == 201:
+            logging.info(f"Replayed {len(records)} sensor batches ({len(merged)} metrics) in one upload: {first}..{last}")
+            return [key for key, _, _ in records]
+        if response == 422:
+            logging.warning(f"Merged upload {first}..{last} rejected (422), replaying batches individually")
+            return [key for key, data, _ in records if not self._should_pause() and self._retry_batch(MetricType.SENSOR, key, data)]
+        logging.error(f"Merged upload {first}..{last} failed, status code: {response}")
+        return []
+
+    def _replay_bulk(self, chunk: list[tuple[bytes, bytes]]) -> list[bytes]:
+        """Replay a chunk of sensor batches, merging consecutive records up to retry_bulk_max_bytes per upload."""
+        acknowledged = []
+        group: list[tuple[bytes, bytes, list]] = []
+        group_bytes = 0
+        for key, data in chunk:
+            try:
+                raw = self._decode_record(data)
+            except LookupError as e:
+                logging.error(f"Keeping batch {self._key_label(MetricType.SENSOR, key)}: {e}")
+                continue
+            batch = self._parse_batch(raw)
+            if not batch or batch.get("status_code") == 422:
+                # Not retryable; let _retry_batch log why and acknowledge it
+                self._retry_batch(MetricType.SENSOR, key, data)
+                acknowledged.append(key)
+                continue
+            # Budget on the decoded size; stored records may be compressed
+            if group and group_bytes + len(raw) > self.settings.retry_bulk_max_bytes:
+                acknowledged.extend(self._send_merged(group))
+                group, group_bytes = [], 0
+                if self._should_pause():
+                    return acknowledged
+            group.append((key, data, batch.get("payload") or batch.get("metrics")))
+            group_bytes += len(raw)
+        if group and not self._should_pause():
+            acknowledged.extend(self._send_merged(group))
+        return acknowledged
+
+    def _should_pause(self) -> bool:
+        return self._stop.is_set() or self._circuit_breaker.is_open()
+
+    def _drain_lease(self, metric_type: MetricType, chunk: list[tuple[bytes, bytes]]) -> int:
+        """Replay one leased key range and delete what the collector acknowledged."""
+        acknowledged = []
+        if metric_type == MetricType.SENSOR and self.settings.retry_bulk_enabled:
+            acknowledged = self._replay_bulk(chunk)
+        else:
+            for key, data in chunk:
+                if self._should_pause():
+                    break
+                if self._retry_batch(metric_type, key, data):
+                    acknowledged.append(key)
+        return self._delete_stored_batches(metric_type, acknowledged)
+
+    def _drain(self) -> int:
+        """
+        Drain the backlog of every metric type on the drain pool.
+
+        The backlog is streamed chunk by chunk, and each chunk is leased to one pool
+        worker. Leases cover consecutive, non-overlapping key ranges (the next lease
+        starts after the last leased key), so no record is sent twice in a cycle.
+        Each metric type holds at most its concurrency limit of leases at a time.
+        With retry_priority_metric_type set, other types are only leased once that
+        type's backlog has been handed out. Each pass over the metric types leases
+        as many chunks as the limits allow (fifo, newest_first), one chunk per type
+        (interleaved) or the type's weight in chunks (weighted).
+        Records that were not acknowledged stay stored for the next cycle.
+
+        Returns:
+            The number of batches sent and deleted
+        """
+        if self.settings.retry_latest_device_status_only:
+            self._collapse_device_status()
+
+        last_leased = {metric_type: None for metric_type in MetricType}
+        exhausted = {metric_type for metric_type, weight in self._weights.items() if weight == 0}
+        in_flight = {}
+        sent = 0
+        while True:
+            for metric_type in MetricType:
+                if self._priority not in (None, metric_type) and self._priority not in exhausted:
+                    continue
+                limiter = self._limiters[metric_type]
+                quota = self._weights[metric_type] if self._policy in ("interleaved", "weighted") else None
+                while metric_type not in exhausted and quota != 0 and not self._should_pause() and limiter.try_acquire():
+                    if quota is not None:
+                        quota -= 1
+                    chunk = self._read_chunk(metric_type, last_leased[metric_type])
+                    if not chunk:
+                        limiter.release()
+                        exhausted.add(metric_type)
+                        break
+                    last_leased[metric_type] = chunk[-1][0]
+                    self._leases += 1
+                    in_flight[self._pool.submit(self._drain_lease, metric_type, chunk)] = metric_type
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                metric_type = in_flight.pop(future)
+                self._limiters[metric_type].release()
+                try:
+                    sent += future.result()
+                except Exception as e:
+                    logging.error(f"Draining {metric_type.value} backlog failed: {e}")
+        self._acknowledged += sent
+        return sent
+
+    def stats(self) -> dict:
+        """Return lease counters and the concurrency limit of each metric type."""
+        return {
+            "policy": self._policy,
+            "leases": self._leases,
+            "acknowledged": self._acknowledged,
+            "collapsed_device_statuses": self._collapsed,
+            "purged_sensor_readings": self._purged,
+            "concurrency": {metric_type.value: limiter.stats() for metric_type, limiter in self._limiters.items()},
+        }
+
+    def stop(self) -> None:
+        """Stop draining and wait for leases in flight to finish."""
+        self._stop.set()
+        self._retry_thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _apply_retention(self) -> int:
+        """Purge stored sensor readings older than lmdb_sensor_retention_seconds, if set."""
+        retention = self.settings.lmdb_sensor_retention_seconds
+        if retention <= 0:
+            return 0
+        try:
+            purged = purge_before(int(time.time() - retention))
+        except Exception as e:
+            logging.error(f"Purging expired sensor readings failed: {e}")
+            return 0
+        self._purged += purged
+        return purged
+
     def _retry_loop(self):
         logging.info("Starting RetryWorker thread")
         while not self._stop.is_set():
-            keys = self._get_lmdb_keys()
-            for key in keys:
-                self._retry_batch(key)
+            # Expired readings are purged even while the collector is down, when the backlog grows
+            self._apply_retention()
+            if self._circuit_breaker.is_open():
+                logging.info("Circuit breaker open, skipping retry cycle")
+                self._stop.wait(10)
+                continue
+            self._drain()
             logging.info("Retry cycle complete, sleeping for 10 seconds")
             self._stop.wait(10)
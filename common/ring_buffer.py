@@ -0,0 +1,105 @@
+"""
+Ring Buffer - Bounded, preallocated FIFO shared between threads.
+
+Producers never block: when the buffer is full, push() either evicts the oldest
+item or rejects the new one and hands the dropped item back to the caller.
+"""
+import threading
+from typing import Any
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO ring buffer with a high-water mark."""
+
+    def __init__(self, capacity: int, high_water_mark: int | None = None, drop_oldest: bool = True):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Maximum number of items held (slots are preallocated)
+            high_water_mark: Occupancy at which the buffer reports pressure, defaults to capacity
+            drop_oldest: On overflow evict the oldest item (True) or reject the new one (False)
+
+        Raises:
+            ValueError: If capacity is not positive or the high-water mark is out of range
+        """
+        if capacity <= 0:
+            raise ValueError(f"Invalid capacity {capacity}. Must be positive.")
+        high_water_mark = capacity if high_water_mark is None else high_water_mark
+        if not 0 < high_water_mark <= capacity:
+            raise ValueError(f"Invalid high-water mark {high_water_mark}. Must be 1-{capacity}.")
+
+        self._slots: list[Any] = [None] * capacity
+        self._capacity = capacity
+        self._high_water_mark = high_water_mark
+        self._drop_oldest = drop_oldest
+        self._head = 0
+        self._size = 0
+        self._not_empty = threading.Condition(threading.Lock())
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def high_water_mark(self) -> int:
+        return self._high_water_mark
+
+    def above_high_water(self) -> bool:
+        """True when occupancy is above the high-water mark."""
+        return self._size > self._high_water_mark
+
+    def push(self, item: Any) -> Any | None:
+        """
+        Append an item without blocking.
+
+        Returns:
+            The item dropped to make room (the oldest item or the rejected new one),
+            or None if nothing was dropped
+        """
+        with self._not_empty:
+            dropped = None
+            if self._size == self._capacity:
+                if not self._drop_oldest:
+                    return item
+                dropped = self._slots[self._head]
+                self._head = (self._head + 1) % self._capacity
+                self._size -= 1
+            self._slots[(self._head + self._size) % self._capacity] = item
+            self._size += 1
+            self._not_empty.notify()
+            return dropped
+
+    def pop(self, timeout: float | None = None) -> Any | None:
+        """Remove and return the oldest item, waiting up to `timeout` seconds. Returns None if empty."""
+        with self._not_empty:
+            if self._size == 0 and not self._not_empty.wait_for(lambda: self._size > 0, timeout):
+                return None
+            item = self._slots[self._head]
+            self._slots[self._head] = None
+            self._head = (self._head + 1) % self._capacity
+            self._size -= 1
+            return item
+
+    def pop_excess(self) -> list[Any]:
+        """Remove and return the oldest items above the high-water mark."""
+        with self._not_empty:
+            excess = []
+            while self._size > self._high_water_mark:
+                excess.append(self._slots[self._head])
+                self._slots[self._head] = None
+                self._head = (self._head + 1) % self._capacity
+                self._size -= 1
+            return excess
+
+    def drain(self) -> list[Any]:
+        """Remove and return every buffered item, oldest first."""
+        with self._not_empty:
+            items = [self._slots[(self._head + i) % self._capacity] for i in range(self._size)]
+            self._slots[:] = [None] * self._capacity
+            self._head = 0
+            self._size = 0
+            return items
@@ -0,0 +1,45 @@
+"""
+Runtime Stats - Singleton registry of runtime counters.
+
+Components register a provider callable returning a dict of counters. The
+device periodically logs a snapshot of every registered provider.
+"""
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class RuntimeStats:
+    """Singleton registry collecting counters from running components."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._providers = {}
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def register(self, name: str, provider: Callable[[], dict]) -> None:
+        """Register (or replace) the stats provider for a component."""
+        with self._lock:
+            self._providers[name] = provider
+
+    def snapshot(self) -> dict:
+        """Collect the current counters from every registered provider."""
+        with self._lock:
+            providers = dict(self._providers)
+        snapshot = {}
+        for name, provider in providers.items():
+            try:
+                snapshot[name] = provider()
+            except Exception as e:
+                logger.debug(f"Stats provider '{name}' failed: {e}")
+        return snapshot
+
+    def log_snapshot(self) -> None:
+        """Log the current counters at INFO level."""
+        logger.info(f"Runtime stats: {self.snapshot()}")
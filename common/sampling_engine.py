@@ -0,0 +1,143 @@
+"""
+Sampling Engine - Reads sensors concurrently on a bounded thread pool.
+
+Each sensor gets its own deadline. A sensor that misses its deadline (or raises)
+reports its last good reading marked as stale, and a sensor that keeps failing
+is quarantined with exponential backoff so it stops occupying pool workers.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class _SensorState:
+    """Per-sensor bookkeeping kept between sampling cycles."""
+
+    __slots__ = ("future", "last_metric", "failures", "quarantined_until")
+
+    def __init__(self):
+        self.future: Future | None = None
+        self.last_metric: dict | None = None
+        self.failures = 0
+        self.quarantined_until = 0.0
+
+
+class SamplingEngine:
+    """
+    Concurrent sensor sampler with per-sensor deadlines and quarantine.
+
+    Sensors may define a `deadline` attribute (seconds) to override the
+    default deadline from Settings.
+    """
+
+    def __init__(self):
+        self.settings = Settings()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.sampling_max_workers,
+            thread_name_prefix="sensor-sampler",
+        )
+        self._compact = self.settings.metric_format == "compact"
+        self._states: dict[str, _SensorState] = {}
+        self._lock = threading.Lock()
+        self._stale_readings = 0
+        self._missed_deadlines = 0
+
+    def _state_for(self, sensor) -> _SensorState:
+        with self._lock:
+            state = self._states.get(sensor.id)
+            if state is None:
+                state = self._states[sensor.id] = _SensorState()
+            return state
+
+    def _deadline_for(self, sensor) -> float:
+        deadline = getattr(sensor, "deadline", None)
+        return deadline if deadline is not None else self.settings.sampling_deadline_seconds
+
+    def _stale_metric(self, state: _SensorState) -> dict | None:
+        """Return the last good reading marked as stale, or None if there is none."""
+        if state.last_metric is None:
+            return None
+        self._stale_readings += 1
+        return {**state.last_metric, "stale": True}
+
+    def _record_failure(self, sensor, state: _SensorState, reason: str) -> None:
+        state.failures += 1
+        threshold = self.settings.sampling_quarantine_threshold
+        if state.failures < threshold:
+            logger.warning(f"Sensor '{sensor.id}' {reason} ({state.failures}/{threshold} failures)")
+            return
+
+        backoff = min(
+            self.settings.sampling_quarantine_max_backoff_seconds,
+            self.settings.sampling_quarantine_backoff_seconds * (2 ** (state.failures - threshold)),
+        )
+        state.quarantined_until = time.monotonic() + backoff
+        logger.error(f"Sensor '{sensor.id}' {reason}, quarantined for {backoff:.1f}s after {state.failures} failures")
+
+    def _record_success(self, sensor, state: _SensorState, metric: dict) -> None:
+        if state.failures >= self.settings.sampling_quarantine_threshold:
+            logger.info(f"Sensor '{sensor.id}' recovered, leaving quarantine")
+        state.failures = 0
+        state.quarantined_until = 0.0
+        state.last_metric = metric
+
+    def sample(self, sensors: list) -> list[dict]:
+        """
+        Read all sensors concurrently and return their metrics in sensor order.
+
+        Sensors that miss their deadline, raise, or are quarantined contribute
+        their last good reading with "stale": True, or nothing if they never
+        produced a reading.
+        """
+        started = time.monotonic()
+        results: list[dict | None] = [None] * len(sensors)
+        pending = []
+
+        for index, sensor in enumerate(sensors):
+            state = self._state_for(sensor)
+            if state.quarantined_until > started:
+                results[index] = self._stale_metric(state)
+                continue
+            if state.future is not None and not state.future.done():
+                # Previous read is still hung on the bus; don't pile another one on top
+                self._record_failure(sensor, state, "is still busy with a previous read")
+                results[index] = self._stale_metric(state)
+                continue
+            state.future = self._executor.submit(sensor.current_metric, self._compact)
+            pending.append((index, sensor, state, started + self._deadline_for(sensor)))
+
+        for index, sensor, state, deadline in pending:
+            try:
+                metric = state.future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                self._missed_deadlines += 1
+                self._record_failure(sensor, state, f"missed its {self._deadline_for(sensor)}s deadline")
+                results[index] = self._stale_metric(state)
+            except Exception as e:
+                self._record_failure(sensor, state, f"failed to read: {e}")
+                results[index] = self._stale_metric(state)
+            else:
+                self._record_success(sensor, state, metric)
+                results[index] = metric
+
+        return [metric for metric in results if metric is not None]
+
+    def stats(self) -> dict:
+        """Return counters describing sampling health."""
+        now = time.monotonic()
+        with self._lock:
+            quarantined = [sensor_id for sensor_id, state in self._states.items() if state.quarantined_until > now]
+        return {
+            "stale_readings": self._stale_readings,
+            "missed_deadlines": self._missed_deadlines,
+            "quarantined_sensors": quarantined,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the sampling pool without waiting for hung sensor reads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
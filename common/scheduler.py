@@ -0,0 +1,109 @@
+"""
+Scheduler - Runs periodic tasks on absolute monotonic deadlines.
+
+Deadlines advance by exactly one interval from the previous deadline (not from
+when the task finished), so periods don't drift with task run time. A task that
+runs past its next deadline is counted as an overrun and the missed periods are
+skipped instead of being fired back-to-back.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class _ScheduledTask:
+    """A periodic task together with its timing statistics."""
+
+    def __init__(self, name: str, interval: float, callback: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter_avg_ms": round(self.jitter_total / self.runs * 1000, 3) if self.runs else 0.0,
+            "jitter_max_ms": round(self.jitter_max * 1000, 3),
+        }
+
+
+class Scheduler:
+    """Heap-based scheduler firing tasks on absolute monotonic deadlines."""
+
+    def __init__(self, stop_event: threading.Event | None = None):
+        self._stop = stop_event or threading.Event()
+        self._heap: list[tuple[float, int, _ScheduledTask]] = []
+        self._tasks: list[_ScheduledTask] = []
+        self._sequence = itertools.count()
+
+    def add(self, name: str, interval: float, callback: Callable[[], None], start_delay: float = 0.0) -> None:
+        """
+        Schedule a callback to run every `interval` seconds.
+
+        Args:
+            name: Task name used in logs and statistics
+            interval: Period in seconds (must be positive)
+            callback: Callable invoked with no arguments
+            start_delay: Seconds to wait before the first run
+        """
+        if interval <= 0:
+            raise ValueError(f"Invalid interval {interval} for task '{name}'. Must be positive.")
+        task = _ScheduledTask(name, interval, callback)
+        self._tasks.append(task)
+        heapq.heappush(self._heap, (time.monotonic() + start_delay, next(self._sequence), task))
+        logger.info(f"Scheduled task '{name}' every {interval}s")
+
+    def _run_task(self, deadline: float, task: _ScheduledTask) -> float:
+        """Run a due task and return its next deadline."""
+        jitter = time.monotonic() - deadline
+        task.runs += 1
+        task.jitter_total += jitter
+        task.jitter_max = max(task.jitter_max, jitter)
+
+        try:
+            task.callback()
+        except Exception as e:
+            logger.error(f"Scheduled task '{task.name}' failed: {e}")
+
+        next_deadline = deadline + task.interval
+        finished = time.monotonic()
+        if finished > next_deadline:
+            missed = int((finished - deadline) // task.interval)
+            task.overruns += 1
+            task.skipped += missed
+            next_deadline = deadline + (missed + 1) * task.interval
+            logger.warning(f"Scheduled task '{task.name}' fell behind its {task.interval}s interval, skipped {missed} run(s)")
+        return next_deadline
+
+    def run(self) -> None:
+        """Run scheduled tasks until the stop event is set."""
+        while self._heap and not self._stop.is_set():
+            deadline, _, task = self._heap[0]
+            wait = deadline - time.monotonic()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            heapq.heappop(self._heap)
+            next_deadline = self._run_task(deadline, task)
+            heapq.heappush(self._heap, (next_deadline, next(self._sequence), task))
+
+    def stop(self) -> None:
+        """Ask the run loop to exit."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """Return timing statistics for every scheduled task."""
+        return {task.name: task.stats() for task in self._tasks}
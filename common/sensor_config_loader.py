@@ -8,6 +8,10 @@ from pathlib import Path
 
 import yaml
 
+from common.calibration import curve_from_dict
+from common.deadband_filter import DeadbandConfig
+from common.oversampling import OversamplingConfig
+from common.waveform import WaveformCaptureConfig
 from common.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -61,6 +65,16 @@ def load_sensors_from_config(config_path: str | Path | None = None) -> list:
     return sensors
 
 
+def _apply_sampling_options(sensor, sensor_def: dict) -> None:
+    """Apply the optional sampling fields shared by every sensor type."""
+    if sensor_def.get('deadline') is not None:
+        sensor.deadline = float(sensor_def['deadline'])
+    if sensor_def.get('interval') is not None:
+        sensor.interval = float(sensor_def['interval'])
+    if sensor_def.get('deadband') is not None:
+        sensor.deadband = DeadbandConfig.from_dict(sensor_def['deadband'])
+
+
 def _load_io_sensors(io_config: dict, FloatSensorClass) -> list:
     """Load IO-based sensors from config."""
     sensors = []
@@ -73,8 +87,12 @@ def _load_io_sensors(io_config: dict, FloatSensorClass) -> list:
                     id=sensor_def['id'],
                     description=sensor_def['description'],
                     pin=sensor_def['pin'],
-                    inverted=sensor_def.get('inverted', False)
+                    inverted=sensor_def.get('inverted', False),
+                    edge_triggered=sensor_def.get('edge_triggered', False),
+                    debounce=float(sensor_def.get('debounce', 0.0)),
+                    transition_capacity=int(sensor_def.get('transition_capacity', 256)),
                 )
+                _apply_sampling_options(sensor, sensor_def)
                 sensors.append(sensor)
                 logger.info(f"Initialized live FloatSensor '{sensor_def['id']}' on pin {sensor_def['pin']}")
             except KeyError as e:
@@ -85,6 +103,15 @@ def _load_io_sensors(io_config: dict, FloatSensorClass) -> list:
     return sensors
 
 
+def _synthetic_source(sensor_def: dict):
+    """Build a synthetic waveform source for analog sensors configured with a 'synthetic' block."""
+    if not sensor_def.get('synthetic'):
+        return None
+    from sensors.test.synthetic_waveform import SyntheticWaveform
+
+    return SyntheticWaveform.from_dict(sensor_def['synthetic'])
+
+
 def _load_analog_sensors(analog_config: dict, PressureSensorClass) -> list:
     """Load analog sensors from config."""
     sensors = []
@@ -100,7 +127,23 @@ def _load_analog_sensors(analog_config: dict, PressureSensorClass) -> list:
                     min_pressure=sensor_def.get('min_pressure', 0.0),
                     max_pressure=sensor_def.get('max_pressure', 30.0),
                     unit=sensor_def.get('unit', 'psi'),
+                    address=sensor_def.get('address', 0x48),
+                    bus=sensor_def.get('bus', 1),
+                    oversampling=(
+                        OversamplingConfig.from_dict(sensor_def['oversampling'])
+                        if sensor_def.get('oversampling') else None
+                    ),
+                    capture=(
+                        WaveformCaptureConfig.from_dict(sensor_def['capture'])
+                        if sensor_def.get('capture') else None
+                    ),
+                    source=_synthetic_source(sensor_def),
+                    calibration=(
+                        curve_from_dict(sensor_def['calibration'])
+                        if sensor_def.get('calibration') else None
+                    ),
                 )
+                _apply_sampling_options(sensor, sensor_def)
                 sensors.append(sensor)
                 logger.info(
                     f"Initialized live PressureSensor '{sensor_def['id']}' on channel A{sensor_def.get('channel', 0)}"
@@ -0,0 +1,46 @@
+"""
+Sensor Metadata Publisher - Registers sensor descriptors with the collector.
+
+In compact metric format readings only carry id, value and timestamp. The
+descriptors (id, class, description, unit, pin/channel) are sent once at
+startup and again whenever they change.
+"""
+import hashlib
+import json
+import logging
+
+from common.metric_type import MetricType
+
+logger = logging.getLogger(__name__)
+
+
+class SensorMetadataPublisher:
+    """Publishes sensor descriptors when their content changes."""
+
+    def __init__(self, exporter):
+        """
+        Initialize the publisher.
+
+        Args:
+            exporter: Exporter called as exporter(payload, MetricType.SENSOR_METADATA)
+        """
+        self._exporter = exporter
+        self._fingerprint = None
+
+    def publish_if_changed(self, sensors: list) -> bool:
+        """
+        Send the sensor descriptors if they differ from the last ones published.
+
+        Returns:
+            True if descriptors were sent
+        """
+        descriptors = [sensor.descriptor() for sensor in sensors]
+        encoded = json.dumps(descriptors, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        fingerprint = hashlib.sha256(encoded).hexdigest()
+        if fingerprint == self._fingerprint:
+            return False
+
+        self._exporter(descriptors, MetricType.SENSOR_METADATA)
+        self._fingerprint = fingerprint
+        logger.info(f"Published metadata for {len(descriptors)} sensor(s)")
+        return True
@@ -9,6 +9,12 @@ class Settings(BaseSettings):
     device_id: str = "test-device-001"
     description: str = "A test device located in test location"
     
+    # Token refresh: registration attempts per refresh, how long other threads wait
+    # for an in-flight refresh, and when to refresh proactively (fraction of the server TTL)
+    token_refresh_max_attempts: int = 3
+    token_refresh_wait_seconds: float = 30.0
+    token_refresh_ahead_ratio: float = 0.8
+    
     # Device type for GPIO pin configuration
     # Options: raspberry_pi_5, raspberry_pi_4 (more to be added)
     device_type: str = "raspberry_pi_5"
@@ -16,6 +22,126 @@ class Settings(BaseSettings):
     # Enable live GPIO sensors (set to True on Raspberry Pi, False on dev machines)
     live_sensors_enabled: bool = False
     
+    # Sensor sampling engine: sensors are read concurrently, each with its own deadline.
+    # Sensors that keep failing are quarantined with exponential backoff.
+    sampling_max_workers: int = 8
+    sampling_deadline_seconds: float = 1.0
+    sampling_quarantine_threshold: int = 3
+    sampling_quarantine_backoff_seconds: float = 5.0
+    sampling_quarantine_max_backoff_seconds: float = 300.0
+    
+    # Analog sensors: channels of an ADS1115 are converted in one pass, and the values are reused
+    # by the other sensors on that chip for this long (each sensor reads a pass at most once)
+    adc_scan_max_age_seconds: float = 0.1
+    
+    # Reading format: verbose (description and unit in every reading) or compact
+    # (id, value, timestamp only; sensor descriptors are registered separately)
+    metric_format: str = "verbose"
+    
+    # Scheduler intervals. Sensors can override sensor_interval_seconds with 'interval' in sensor_config.yaml
+    sensor_interval_seconds: float = 5.0
+    device_status_interval_seconds: float = 5.0
+    stats_report_interval_seconds: float = 60.0
+    
+    # Collector API request timeouts
+    api_connect_timeout_seconds: float = 3.05
+    api_read_timeout_seconds: float = 10.0
+    
+    # Request body compression: none, gzip or zstd (zstd needs the optional zstandard package).
+    # Bodies smaller than api_compression_min_bytes are sent uncompressed.
+    api_compression: str = "none"
+    api_compression_min_bytes: int = 1024
+    
+    # Circuit breaker for the collector API: opens after consecutive failures and
+    # backs off exponentially (with jitter) before letting a probe request through
+    circuit_breaker_failure_threshold: int = 3
+    circuit_breaker_base_backoff_seconds: float = 5.0
+    circuit_breaker_max_backoff_seconds: float = 300.0
+    
+    # Backlog drain: records read per LMDB read transaction (and deleted per write transaction)
+    retry_chunk_size: int = 100
+    # Bulk replay: merge consecutive stored sensor batches of a chunk into uploads of up to this many bytes
+    retry_bulk_enabled: bool = True
+    retry_bulk_max_bytes: int = 256 * 1024
+    # Parallel drain: worker threads, and the most chunks of each metric type replayed at once.
+    # Adaptive concurrency starts at one per type, grows while responses stay under the latency
+    # target and halves on 429/5xx or slow responses.
+    retry_drain_workers: int = 4
+    retry_sensor_concurrency: int = 4
+    retry_device_status_concurrency: int = 2
+    retry_sensor_metadata_concurrency: int = 1
+    retry_waveform_concurrency: int = 1
+    retry_adaptive_concurrency: bool = False
+    retry_latency_target_seconds: float = 2.0
+    # Drain this metric type (sensor-batch, device-status, sensor-metadata, waveform) before the others; empty for none
+    retry_priority_metric_type: str = ""
+    # Drain order: fifo, newest_first (fresh data first, history backfills after), interleaved
+    # (one chunk per metric type in turn) or weighted (retry_drain_weights chunks per type in turn; 0 skips a type)
+    retry_drain_policy: str = "fifo"
+    retry_drain_weights: dict[str, int] = {"sensor-batch": 3, "device-status": 1, "sensor-metadata": 1, "waveform": 1}
+    # Only replay the newest stored device status; older ones are superseded and deleted
+    retry_latest_device_status_only: bool = False
+    
+    # LMDB environment directory
+    lmdb_path: str = "data.lmdb"
+    
+    # LMDB capacity: the map starts at lmdb_map_size and grows by lmdb_map_growth_bytes once it is
+    # lmdb_high_water_ratio full, up to lmdb_map_max_bytes while leaving lmdb_disk_reserve_bytes of disk free.
+    # At that cap the retention policy frees space: drop_oldest, device_status_first or downsample_sensor
+    # (lmdb_eviction_batch records per step).
+    lmdb_map_size: int = 256 * 1024 * 1024
+    lmdb_map_max_bytes: int = 2 * 1024 * 1024 * 1024
+    lmdb_map_growth_bytes: int = 64 * 1024 * 1024
+    lmdb_disk_reserve_bytes: int = 512 * 1024 * 1024
+    lmdb_high_water_ratio: float = 0.9
+    lmdb_retention_policy: str = "drop_oldest"
+    lmdb_eviction_batch: int = 100
+    lmdb_max_evictions_per_write: int = 10
+    # Stored sensor readings older than this are purged by the retry worker (0 keeps them until sent)
+    lmdb_sensor_retention_seconds: float = 0.0
+    
+    # LMDB group commit: writes queued by all threads while a commit runs (up to lmdb_group_commit_max_ops)
+    # are committed together in one transaction; lmdb_group_commit_window_seconds bounds the wait for them.
+    # Durability: sync (fsync every commit), metasync (no metadata fsync; a crash may lose the last
+    # commit) or periodic (no fsync on commit; flushed every lmdb_sync_interval_seconds).
+    lmdb_group_commit_enabled: bool = True
+    lmdb_group_commit_window_seconds: float = 0.05
+    lmdb_group_commit_max_ops: int = 64
+    lmdb_durability: str = "sync"
+    lmdb_sync_interval_seconds: float = 5.0
+    # LMDB reader slots: concurrent read transactions (the drain dispatcher, backfill checks) plus two reserved
+    lmdb_max_readers: int = 16
+    
+    # LMDB record compression: none, zlib or zstd (zstd needs the optional zstandard package).
+    # With lmdb_compression_dictionary a dictionary is trained from the first lmdb_dictionary_samples records.
+    lmdb_compression: str = "zlib"
+    lmdb_compression_dictionary: bool = True
+    lmdb_dictionary_samples: int = 200
+    lmdb_dictionary_size: int = 16 * 1024
+    
+    # Shared keep-alive connection pool: number of host pools cached and connections kept per host
+    http_pool_connections: int = 2
+    http_pool_maxsize: int = 4
+    http_pool_block: bool = False
+    
+    # Export buffer between sampling and the background sender thread.
+    # Above the high-water mark the oldest payloads are spilled to LMDB.
+    # Overflow policy when full: spill_oldest (to LMDB), drop_oldest, drop_newest
+    export_buffer_capacity: int = 1000
+    export_buffer_high_water_mark: int = 800
+    export_buffer_overflow_policy: str = "spill_oldest"
+    
+    # Micro-batching: merge several payloads per request, flushing on whichever
+    # limit (bytes, records, latency) is hit first. The collector must accept a
+    # JSON array of statuses on /devices/status when device status batching merges records.
+    batching_enabled: bool = False
+    sensor_batch_max_bytes: int = 64 * 1024
+    sensor_batch_max_records: int = 500
+    sensor_batch_max_latency_seconds: float = 60.0
+    device_status_batch_max_bytes: int = 16 * 1024
+    device_status_batch_max_records: int = 12
+    device_status_batch_max_latency_seconds: float = 60.0
+    
     # Repo Refresher settings
     # Dont enable refresher on development. Otherwise your git directory may get corrupted.
     repo_refresher_enabled: bool = False
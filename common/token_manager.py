@@ -0,0 +1,100 @@
+"""
+Token Manager - Singleton holding the collector API token.
+
+Token refreshes are single-flight: the first caller to see an expired token
+re-registers the device while concurrent callers wait for its result instead
+of registering again. When the server returns a token TTL, a refresh is
+started in the background before the token expires.
+"""
+import logging
+import threading
+import time
+
+from common.device_registerer import DeviceRegisterer
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """Singleton, thread-safe owner of the current API token."""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._init_manager()
+        return cls._instance
+
+    def _init_manager(self) -> None:
+        self.settings = Settings()
+        self._token = self.settings.token
+        self._refresh_at: float | None = None
+        self._refreshing = False
+        self._refreshes = 0
+        self._waits = 0
+        self._condition = threading.Condition()
+
+    @property
+    def token(self) -> str:
+        """The current token, starting a proactive refresh in the background if it is about to expire."""
+        with self._condition:
+            if self._refresh_at is not None and time.monotonic() >= self._refresh_at and not self._refreshing:
+                self._refresh_at = None
+                threading.Thread(
+                    target=self.refresh,
+                    kwargs={"stale_token": self._token},
+                    name="token-refresh",
+                    daemon=True,
+                ).start()
+            return self._token
+
+    def _set_token(self, token: str, ttl: float | None) -> None:
+        self._token = token
+        self._refresh_at = None
+        if ttl:
+            self._refresh_at = time.monotonic() + ttl * self.settings.token_refresh_ahead_ratio
+            logger.info(f"Token valid for {ttl}s, refreshing in {ttl * self.settings.token_refresh_ahead_ratio:.0f}s")
+
+    def refresh(self, stale_token: str | None = None, shutdown_check=None, persistent: bool = False) -> str:
+        """
+        Re-register the device to obtain a new token, unless another caller already did.
+
+        Args:
+            stale_token: The token the caller found invalid. If the current token differs,
+                another caller already refreshed it and it is returned immediately.
+            shutdown_check: Optional callable that returns True if shutdown was requested.
+            persistent: Keep retrying until registered (as done at startup) instead of giving
+                up after token_refresh_max_attempts. Ignored for callers that only wait.
+
+        Returns:
+            The current token (unchanged if the refresh failed or timed out)
+        """
+        with self._condition:
+            if stale_token is not None and self._token != stale_token:
+                return self._token
+            if self._refreshing:
+                self._waits += 1
+                self._condition.wait_for(lambda: not self._refreshing, self.settings.token_refresh_wait_seconds)
+                return self._token
+            self._refreshing = True
+
+        result = None
+        try:
+            result = DeviceRegisterer().register(
+                shutdown_check=shutdown_check,
+                max_attempts=None if persistent else self.settings.token_refresh_max_attempts,
+            )
+        finally:
+            with self._condition:
+                if result is not None:
+                    self._set_token(*result)
+                    self._refreshes += 1
+                self._refreshing = False
+                self._condition.notify_all()
+        return self._token
+
+    def stats(self) -> dict:
+        """Return refresh counters."""
+        return {"refreshes": self._refreshes, "waited_on_refresh": self._waits}
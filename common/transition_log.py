@@ -0,0 +1,64 @@
+"""
+Transition Log - Lock-free ring of timestamped digital transitions.
+
+One producer (the GPIO callback thread) records transitions and one consumer
+(the sampling thread) drains them. Timestamps and states live in preallocated
+arrays. The producer fills a slot before advancing its write counter, and
+each counter is only written by its own side, so neither side takes a lock
+and an edge callback never waits for a reading in progress. If the producer
+laps the consumer, the overwritten transitions are reported as lost.
+"""
+from array import array
+
+
+class TransitionLog:
+    """Single-producer, single-consumer ring of (monotonic timestamp, state) transitions."""
+
+    def __init__(self, capacity: int = 256):
+        """
+        Initialize the log.
+
+        Args:
+            capacity: Transitions held between two drains
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity <= 0:
+            raise ValueError(f"Invalid capacity {capacity}. Must be positive.")
+        self._capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._states = array('b', bytes(capacity))
+        self._written = 0  # Advanced by the producer only
+        self._read = 0  # Advanced by the consumer only
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def record(self, timestamp: float, state: bool) -> None:
+        """Append a transition (producer side)."""
+        slot = self._written % self._capacity
+        self._timestamps[slot] = timestamp
+        self._states[slot] = state
+        # Publish only once the slot is filled
+        self._written += 1
+
+    def drain(self) -> tuple[list[tuple[float, bool]], int]:
+        """
+        Take the transitions recorded since the last drain (consumer side).
+
+        Returns:
+            The transitions oldest first, and the number lost to overwrites
+        """
+        written = self._written
+        start = max(self._read, written - self._capacity)
+        entries = [
+            (self._timestamps[i % self._capacity], bool(self._states[i % self._capacity])) for i in range(start, written)
+        ]
+        # Slots the producer reused while we were copying may be torn; drop them
+        first_valid = min(written, max(start, self._written - self._capacity))
+        entries = entries[first_valid - start:]
+        lost = first_valid - self._read
+        self._read = written
+        return entries, lost
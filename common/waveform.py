@@ -0,0 +1,165 @@
+"""
+Waveform - Burst capture settings and the spectral features computed from a capture.
+
+A capture records a power-of-two number of samples at the ADS1115's fastest
+continuous rate into a preallocated array. Its features (AC RMS, peak-to-peak,
+dominant frequency and the power in configured frequency bands) come from a
+Hann-windowed radix-2 FFT. Captures are configured per sensor in
+sensor_config.yaml:
+
+    capture:
+      samples: 256
+      interval: 60
+      bands: [[0, 10], [10, 50], [50, 200]]
+      trigger:
+        feature: peak_to_peak
+        above: 2.0
+
+The raw waveform is only uploaded when the trigger trips or when it was
+requested (SIGUSR1 requests one from every capturing sensor).
+"""
+import cmath
+import math
+
+from common.oversampling import ADS1115_DATA_RATES
+
+# Continuous-mode capture runs the ADS1115 at its fastest conversion rate
+CAPTURE_DATA_RATE = ADS1115_DATA_RATES[-1]
+
+TRIGGER_FEATURES = ("rms", "peak_to_peak", "dominant_frequency_hz")
+
+
+def fft(samples) -> list[complex]:
+    """
+    Iterative radix-2 decimation-in-time FFT.
+
+    Raises:
+        ValueError: If the number of samples is not a power of two
+    """
+    n = len(samples)
+    if n < 1 or n & (n - 1):
+        raise ValueError(f"FFT size {n} is not a power of two.")
+    # Bit-reversal permutation
+    spectrum = [complex(sample) for sample in samples]
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            spectrum[i], spectrum[j] = spectrum[j], spectrum[i]
+    # Butterflies
+    size = 2
+    while size <= n:
+        half = size // 2
+        twiddles = [cmath.exp(-2j * math.pi * k / size) for k in range(half)]
+        for start in range(0, n, size):
+            for k in range(half):
+                even = spectrum[start + k]
+                odd = spectrum[start + k + half] * twiddles[k]
+                spectrum[start + k] = even + odd
+                spectrum[start + k + half] = even - odd
+        size *= 2
+    return spectrum
+
+
+def _band_name(low: float, high: float) -> str:
+    return f"{low:g}-{high:g}hz"
+
+
+def waveform_features(samples, sample_rate: float, bands: list[tuple[float, float]]) -> dict:
+    """
+    Compute the features of a captured waveform.
+
+    Band powers are one-sided, Hann-window corrected power spectral sums, so over
+    all bands they add up to the mean square of the AC component (rms ** 2).
+
+    Args:
+        samples: The waveform, a power-of-two number of samples
+        sample_rate: Samples per second the waveform was captured at
+        bands: (low, high) frequency bands in Hz, low inclusive and high exclusive
+    """
+    n = len(samples)
+    mean = math.fsum(samples) / n
+    ac = [sample - mean for sample in samples]
+    window = [0.5 - 0.5 * math.cos(2 * math.pi * i / n) for i in range(n)]
+    spectrum = fft([value * weight for value, weight in zip(ac, window)])
+
+    scale = n * math.fsum(weight * weight for weight in window)
+    resolution = sample_rate / n
+    powers = [abs(spectrum[k]) ** 2 * (1 if k == 0 or k == n // 2 else 2) / scale for k in range(n // 2 + 1)]
+    dominant = max(range(1, n // 2 + 1), key=powers.__getitem__) if n > 1 else 0
+
+    return {
+        "sample_rate_hz": round(sample_rate, 1),
+        "rms": math.sqrt(math.fsum(value * value for value in ac) / n),
+        "peak_to_peak": max(samples) - min(samples),
+        "dominant_frequency_hz": round(dominant * resolution, 2),
+        "band_power": {
+            _band_name(low, high): math.fsum(
+                power for k, power in enumerate(powers) if low <= k * resolution < high
+            )
+            for low, high in bands
+        },
+    }
+
+
+class WaveformCaptureConfig:
+    """Per-sensor capture size, cadence, spectral bands and upload trigger."""
+
+    def __init__(
+        self,
+        samples: int = 256,
+        interval: float = 60.0,
+        bands: list[tuple[float, float]] | None = None,
+        trigger_feature: str | None = None,
+        trigger_above: float | None = None,
+    ):
+        """
+        Initialize the capture configuration.
+
+        Args:
+            samples: Samples per capture, a power of two
+            interval: Seconds between captures (a requested capture is taken on the next reading)
+            bands: (low, high) frequency bands in Hz to report the power of
+            trigger_feature: Upload the raw waveform when this feature goes above trigger_above
+            trigger_above: Threshold for trigger_feature
+
+        Raises:
+            ValueError: If samples is not a power of two of at least 2, the interval is not
+                positive, a band is empty, or the trigger feature is unknown
+        """
+        if samples < 2 or samples & (samples - 1):
+            raise ValueError(f"Invalid capture size {samples}. Must be a power of two of at least 2.")
+        if interval <= 0:
+            raise ValueError(f"Invalid capture interval {interval}. Must be positive.")
+        bands = [(float(low), float(high)) for low, high in bands or []]
+        if any(high <= low for low, high in bands):
+            raise ValueError(f"Invalid frequency bands {bands}. Each band must have low < high.")
+        if trigger_feature is not None and trigger_feature not in TRIGGER_FEATURES:
+            raise ValueError(f"Invalid trigger feature '{trigger_feature}'. Must be one of {TRIGGER_FEATURES}.")
+        self.samples = samples
+        self.interval = interval
+        self.bands = bands
+        self.trigger_feature = trigger_feature
+        self.trigger_above = trigger_above
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "WaveformCaptureConfig":
+        """Build a configuration from a sensor_config.yaml 'capture' block."""
+        trigger = config.get('trigger') or {}
+        return cls(
+            samples=int(config.get('samples', 256)),
+            interval=float(config.get('interval', 60.0)),
+            bands=config.get('bands'),
+            trigger_feature=trigger.get('feature'),
+            trigger_above=trigger.get('above'),
+        )
+
+    def tripped(self, features: dict) -> bool:
+        """True if the trigger feature of a capture is above its threshold."""
+        if self.trigger_feature is None or self.trigger_above is None:
+            return False
+        return features[self.trigger_feature] > self.trigger_above
@@ -0,0 +1,67 @@
+"""
+Waveform Publisher - Uploads raw waveforms captured by analog sensors.
+
+Sensors keep the raw samples of a capture only when its trigger tripped or a
+waveform was requested. The publisher collects those after each sampling
+cycle and exports them as their own metric type, so regular readings never
+carry the raw samples.
+"""
+import logging
+
+from common.metric_type import MetricType
+
+logger = logging.getLogger(__name__)
+
+
+class WaveformPublisher:
+    """Collects pending waveforms from sensors and forwards them to the exporter."""
+
+    def __init__(self, exporter):
+        """
+        Initialize the publisher.
+
+        Args:
+            exporter: Exporter called as exporter(payload, MetricType.WAVEFORM)
+        """
+        self._exporter = exporter
+        self._published = 0
+        self._requested = 0
+
+    def request(self, sensors: list) -> int:
+        """
+        Ask every capturing sensor to capture and upload a waveform on its next reading.
+
+        Returns:
+            The number of sensors asked
+        """
+        requested = 0
+        for sensor in sensors:
+            request_waveform = getattr(sensor, "request_waveform", None)
+            if request_waveform is not None and request_waveform():
+                requested += 1
+        self._requested += requested
+        logger.info(f"Requested a waveform from {requested} sensor(s)")
+        return requested
+
+    def publish(self, sensors: list) -> int:
+        """
+        Export the waveforms the sensors have pending.
+
+        Returns:
+            The number of waveforms exported
+        """
+        published = 0
+        for sensor in sensors:
+            take_waveform = getattr(sensor, "take_waveform", None)
+            waveform = take_waveform() if take_waveform is not None else None
+            if waveform is None:
+                continue
+            self._exporter(waveform, MetricType.WAVEFORM)
+            published += 1
+            logger.info(f"Uploading {waveform['trigger']} waveform of '{sensor.id}' ({len(waveform['samples'])} samples)")
+        self._published += published
+        return published
+
+    def stats(self) -> dict:
+        """Return the number of waveforms requested and published."""
+        return {"requested": self._requested, "published": self._published}
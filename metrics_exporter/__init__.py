@@ -1,5 +1,6 @@
 from .api_exporter import APIExporter
 from .log_exporter import LogExporter
 from .lmdb_exporter import LMDBExporter
+from .buffered_exporter import BufferedExporter
 
-__all__ = ["APIExporter", "LogExporter", "LMDBExporter"]
+__all__ = ["APIExporter", "LogExporter", "LMDBExporter", "BufferedExporter"]
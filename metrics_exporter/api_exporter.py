@@ -1,9 +1,13 @@
+import json
 import logging
 import requests
+from .compression import BodyCompressor
 from .exporter_interface import ExporterInterface
 from common.settings import Settings
-from common.device_registerer import DeviceRegisterer
+from common.circuit_breaker import CircuitBreaker
+from common.http_session import HTTPSession
 from common.metric_type import MetricType
+from common.token_manager import TokenManager
 
 logger = logging.getLogger(__name__)
 
@@ -11,37 +15,64 @@ logger = logging.getLogger(__name__)
 METRIC_TYPE_ENDPOINTS = {
     MetricType.SENSOR: "/metrics",
     MetricType.DEVICE_STATUS: "/devices/status",
+    MetricType.SENSOR_METADATA: "/sensors/metadata",
+    MetricType.WAVEFORM: "/sensors/waveforms",
 }
 
+# Status returned without a network call while the circuit breaker is open
+CIRCUIT_OPEN_STATUS = 503
+
+
+def _is_collector_failure(status_code: int) -> bool:
+    """True for responses that mean the collector is unhealthy (as opposed to rejecting the payload)."""
+    return status_code == 429 or status_code >= 500
+
 
 class APIExporter(ExporterInterface):
     def __init__(self):
         self.settings = Settings()
-        self.device_registerer = DeviceRegisterer()
+        self.token_manager = TokenManager()
+        self.http_session = HTTPSession()
+        self.circuit_breaker = CircuitBreaker()
+        if not hasattr(self, "compressor"):
+            self.compressor = BodyCompressor(
+                self.settings.api_compression,
+                self.settings.api_compression_min_bytes,
+            )
 
     def _get_endpoint(self, metric_type: MetricType) -> str:
         """Get the API endpoint for the given metric type."""
         return METRIC_TYPE_ENDPOINTS[metric_type]
 
-    def _send_request(self, endpoint: str, payload):
-        """Send a POST request to the specified endpoint."""
-        return requests.post(
-            f"{self.settings.collector_host}{endpoint}",
-            headers={"X-API-KEY": self.settings.token},
-            json=payload
-        )
+    def _send_request(self, endpoint: str, payload, token: str):
+        """Send a POST request to the specified endpoint, compressing the body when enabled."""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        body, content_encoding = self.compressor.compress(body)
+        headers = {"X-API-KEY": token, "Content-Type": "application/json"}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+
+        response = self.http_session.post(f"{self.settings.collector_host}{endpoint}", headers=headers, data=body)
+        if response.status_code == 415 and content_encoding:
+            # Collector doesn't accept this encoding; fall back to plain JSON for good
+            self.compressor.disable()
+            return self._send_request(endpoint, payload, token)
+        return response
 
     def __call__(self, payload, metric_type: MetricType = MetricType.SENSOR):
+        if not self.circuit_breaker.allow_request():
+            logger.debug(f"Circuit breaker open, not sending {metric_type.value}")
+            return CIRCUIT_OPEN_STATUS
         try:
-            self.settings = Settings()
             endpoint = self._get_endpoint(metric_type)
-            response = self._send_request(endpoint, payload)
+            token = self.token_manager.token
+            response = self._send_request(endpoint, payload, token)
             
             if response.status_code == 401:
-                logger.warning("Token expired or invalid, re-registering device...")
-                self.device_registerer.register()
-                self.settings = Settings()
-                response = self._send_request(endpoint, payload)
+                logger.warning("Token expired or invalid, refreshing token...")
+                refreshed_token = self.token_manager.refresh(stale_token=token)
+                if refreshed_token != token:
+                    response = self._send_request(endpoint, payload, refreshed_token)
             
             if response.status_code != 201:
                 try:
@@ -51,7 +82,17 @@ class APIExporter(ExporterInterface):
                 except:
                     logger.error(f"API returned status {response.status_code}: {response.text}")
             
+            if _is_collector_failure(response.status_code):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
             return response.status_code
         except requests.RequestException as e:
             logger.error(f"Error sending metric to API: {e}")
+            self.circuit_breaker.record_failure()
             return 500
+        except Exception:
+            # Not the collector's fault (e.g. a bad token response or an encoding error):
+            # record no outcome, but don't leave a half-open probe claimed forever
+            self.circuit_breaker.release_probe()
+            raise
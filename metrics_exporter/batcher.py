@@ -0,0 +1,156 @@
+"""
+Metric Batcher - Merges several export payloads into one request.
+
+Payloads are accumulated per MetricType and flushed when the pending batch
+reaches its byte size, record count or latency limit, whichever comes first.
+Sensor payloads (lists of readings) are concatenated; device status payloads
+are sent as a list of status objects when more than one is merged.
+"""
+import json
+import logging
+import time
+from typing import Callable
+
+from common.metric_type import MetricType
+from common.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Metric types merged by the batcher; anything else is sent as-is
+BATCHED_METRIC_TYPES = (MetricType.SENSOR, MetricType.DEVICE_STATUS)
+
+
+class FlushPolicy:
+    """Limits that trigger a flush of a pending batch."""
+
+    def __init__(self, max_bytes: int, max_records: int, max_latency: float):
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.max_latency = max_latency
+
+    @classmethod
+    def for_metric_type(cls, settings: Settings, metric_type: MetricType) -> "FlushPolicy":
+        """Build the flush policy configured in Settings for a metric type."""
+        if metric_type == MetricType.DEVICE_STATUS:
+            return cls(
+                settings.device_status_batch_max_bytes,
+                settings.device_status_batch_max_records,
+                settings.device_status_batch_max_latency_seconds,
+            )
+        return cls(
+            settings.sensor_batch_max_bytes,
+            settings.sensor_batch_max_records,
+            settings.sensor_batch_max_latency_seconds,
+        )
+
+
+class _PendingBatch:
+    def __init__(self):
+        self.payloads: list = []
+        self.size_bytes = 0
+        self.records = 0
+        self.opened_at = 0.0
+
+    def merged_payload(self, metric_type: MetricType):
+        if metric_type == MetricType.SENSOR:
+            return [reading for payload in self.payloads for reading in payload]
+        return self.payloads[0] if len(self.payloads) == 1 else list(self.payloads)
+
+
+class MetricBatcher:
+    """Accumulates payloads per metric type and hands merged batches to `flush`."""
+
+    def __init__(self, flush: Callable[..., None], spill: Callable[..., None]):
+        """
+        Initialize the batcher.
+
+        Args:
+            flush: Callable invoked as flush(payload, metric_type) with each merged batch
+            spill: Callable invoked as spill(payload, metric_type) with a merged batch whose flush raised
+        """
+        settings = Settings()
+        self._flush = flush
+        self._spill = spill
+        self._policies = {
+            metric_type: FlushPolicy.for_metric_type(settings, metric_type) for metric_type in BATCHED_METRIC_TYPES
+        }
+        self._pending = {metric_type: _PendingBatch() for metric_type in BATCHED_METRIC_TYPES}
+        self._counters = {"payloads": 0, "flushes": 0}
+
+    def add(self, payload, metric_type: MetricType) -> None:
+        """Add a payload to the pending batch, flushing if a size or count limit is reached."""
+        policy = self._policies[metric_type]
+        pending = self._pending[metric_type]
+        size_bytes = len(json.dumps(payload, separators=(",", ":")))
+        records = len(payload) if isinstance(payload, list) else 1
+
+        if pending.payloads and pending.size_bytes + size_bytes > policy.max_bytes:
+            self._flush_type(metric_type, "size")
+            pending = self._pending[metric_type]
+
+        if not pending.payloads:
+            pending.opened_at = time.monotonic()
+        pending.payloads.append(payload)
+        pending.size_bytes += size_bytes
+        pending.records += records
+        self._counters["payloads"] += 1
+
+        if pending.size_bytes >= policy.max_bytes:
+            self._flush_type(metric_type, "size")
+        elif pending.records >= policy.max_records:
+            self._flush_type(metric_type, "count")
+
+    def flush_due(self) -> float | None:
+        """
+        Flush batches that have reached their latency limit.
+
+        Returns:
+            Seconds until the next pending batch is due, or None if nothing is pending
+        """
+        now = time.monotonic()
+        next_due = None
+        for metric_type, pending in self._pending.items():
+            if not pending.payloads:
+                continue
+            due_in = pending.opened_at + self._policies[metric_type].max_latency - now
+            if due_in <= 0:
+                self._flush_type(metric_type, "latency")
+            else:
+                next_due = due_in if next_due is None else min(next_due, due_in)
+        return next_due
+
+    def drain(self) -> list[tuple]:
+        """Remove every pending batch without flushing it, returning (payload, metric_type) pairs."""
+        batches = []
+        for metric_type, pending in self._pending.items():
+            if pending.payloads:
+                batches.append((pending.merged_payload(metric_type), metric_type))
+                self._pending[metric_type] = _PendingBatch()
+        return batches
+
+    def _flush_type(self, metric_type: MetricType, reason: str) -> None:
+        pending = self._pending[metric_type]
+        self._counters["flushes"] += 1
+        logger.debug(
+            f"Flushing {metric_type.value} batch ({reason}): "
+            f"{len(pending.payloads)} payload(s), {pending.records} record(s), {pending.size_bytes} bytes"
+        )
+        merged = pending.merged_payload(metric_type)
+        try:
+            self._flush(merged, metric_type)
+        except Exception as e:
+            # The batch holds every payload merged so far; hand it to the spill path rather than lose it
+            logger.error(f"Unexpected error flushing {metric_type.value} batch, spilling it: {e}")
+            try:
+                self._spill(merged, metric_type)
+            except Exception as spill_error:
+                logger.error(f"Could not spill {metric_type.value} batch, keeping it for the next flush: {spill_error}")
+                return
+        self._pending[metric_type] = _PendingBatch()
+
+    def stats(self) -> dict:
+        """Return batching counters."""
+        return {
+            **self._counters,
+            "pending_records": {metric_type.value: pending.records for metric_type, pending in self._pending.items()},
+        }
@@ -0,0 +1,140 @@
+"""
+Buffered Exporter - Decouples metric collection from network delivery.
+
+Sampling pushes payloads into a bounded ring buffer and returns immediately.
+A background sender thread drains the buffer to the collector API and spills
+payloads to LMDB when the send fails, when the buffer overflows, or when the
+buffer is above its high-water mark. When batching is enabled the sender merges
+payloads through a MetricBatcher before sending.
+"""
+import logging
+import threading
+
+from common.metric_type import MetricType
+from common.ring_buffer import RingBuffer
+from common.settings import Settings
+from .api_exporter import APIExporter
+from .batcher import BATCHED_METRIC_TYPES, MetricBatcher
+from .exporter_interface import ExporterInterface
+from .lmdb_exporter import LMDBExporter
+
+logger = logging.getLogger(__name__)
+
+# What to do with a payload when the buffer is full
+OVERFLOW_POLICIES = ("spill_oldest", "drop_oldest", "drop_newest")
+
+
+class BufferedExporter(ExporterInterface):
+    def __init__(self):
+        if hasattr(self, "_buffer"):
+            return  # Singleton already initialized
+
+        self.settings = Settings()
+        policy = self.settings.export_buffer_overflow_policy
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid export buffer overflow policy '{policy}'. Must be one of {OVERFLOW_POLICIES}.")
+
+        self._overflow_policy = policy
+        self._buffer = RingBuffer(
+            capacity=self.settings.export_buffer_capacity,
+            high_water_mark=self.settings.export_buffer_high_water_mark,
+            drop_oldest=policy != "drop_newest",
+        )
+        self._api_exporter = APIExporter()
+        self._lmdb_exporter = LMDBExporter()
+        self._batcher = MetricBatcher(self._deliver, self._spill_batch) if self.settings.batching_enabled else None
+        self._counters = {"buffered": 0, "sent": 0, "spilled": 0, "dropped": 0, "high_water_spills": 0}
+        self._stop = threading.Event()
+        self._sender_thread = threading.Thread(target=self._send_loop, name="metrics-sender", daemon=True)
+        self._sender_thread.start()
+
+    def __call__(self, payload, metric_type: MetricType = MetricType.SENSOR):
+        """Queue a payload for delivery without blocking on the network."""
+        self._counters["buffered"] += 1
+        dropped = self._buffer.push((payload, metric_type))
+        if dropped is not None:
+            if self._overflow_policy == "spill_oldest":
+                self._spill(*dropped, status_code=None)
+            else:
+                self._counters["dropped"] += 1
+                logger.warning(f"Export buffer full, dropped a {dropped[1].value} payload ({self._overflow_policy})")
+        return True
+
+    def _spill(self, payload, metric_type: MetricType, status_code) -> None:
+        self._counters["spilled"] += 1
+        self._lmdb_exporter(payload, status_code, metric_type)
+
+    def _spill_batch(self, payload, metric_type: MetricType) -> None:
+        self._spill(payload, metric_type, status_code=None)
+
+    def _deliver(self, payload, metric_type: MetricType) -> None:
+        status_code = self._api_exporter(payload, metric_type)
+        if status_code == 201:
+            self._counters["sent"] += 1
+            logger.info(f"Sent {metric_type.value} to API successfully")
+        else:
+            self._spill(payload, metric_type, status_code)
+
+    def _spill_from_sender(self, payload, metric_type: MetricType, status_code) -> None:
+        """Spill on the sender thread; a payload LMDB can't take is dropped rather than ending the thread."""
+        try:
+            self._spill(payload, metric_type, status_code)
+        except Exception as e:
+            self._counters["dropped"] += 1
+            logger.error(f"Could not spill {metric_type.value} payload to LMDB, dropped it: {e}")
+
+    def _send_loop(self):
+        logger.info("Starting metrics sender thread")
+        while not self._stop.is_set():
+            if self._buffer.above_high_water():
+                excess = self._buffer.pop_excess()
+                logger.warning(f"Export buffer above high-water mark, spilling {len(excess)} payload(s) to LMDB")
+                for payload, metric_type in excess:
+                    self._counters["high_water_spills"] += 1
+                    self._spill_from_sender(payload, metric_type, status_code=None)
+
+            timeout = 0.5
+            if self._batcher is not None:
+                try:
+                    next_due = self._batcher.flush_due()
+                except Exception as e:
+                    logger.error(f"Unexpected error flushing due batches: {e}")
+                    next_due = None
+                if next_due is not None:
+                    timeout = min(timeout, next_due)
+
+            item = self._buffer.pop(timeout=timeout)
+            if item is None:
+                continue
+            try:
+                if self._batcher is not None and item[1] in BATCHED_METRIC_TYPES:
+                    self._batcher.add(*item)
+                else:
+                    self._deliver(*item)
+            except Exception as e:
+                logger.error(f"Unexpected error delivering {item[1].value} payload: {e}")
+                self._spill_from_sender(*item, status_code=None)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the sender thread and persist anything still buffered to LMDB."""
+        self._stop.set()
+        self._sender_thread.join(timeout)
+        remaining = self._buffer.drain()
+        if self._batcher is not None:
+            remaining = self._batcher.drain() + remaining
+        if remaining:
+            logger.info(f"Persisting {len(remaining)} buffered payload(s) to LMDB before shutdown")
+        for payload, metric_type in remaining:
+            self._spill(payload, metric_type, status_code=None)
+
+    def stats(self) -> dict:
+        """Return buffer occupancy and delivery counters."""
+        stats = {
+            **self._counters,
+            "occupancy": len(self._buffer),
+            "capacity": self._buffer.capacity,
+            "high_water_mark": self._buffer.high_water_mark,
+        }
+        if self._batcher is not None:
+            stats["batching"] = self._batcher.stats()
+        return stats
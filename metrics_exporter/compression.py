@@ -0,0 +1,87 @@
+"""
+Request body compression for the collector API.
+
+Bodies below a minimum size are sent uncompressed. zstd needs the optional
+`zstandard` package; when it isn't installed gzip is used instead.
+"""
+import gzip
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_CODECS = ("none", "gzip", "zstd")
+
+
+class BodyCompressor:
+    """Compresses request bodies and tracks bytes saved."""
+
+    def __init__(self, codec: str = "none", min_bytes: int = 1024):
+        """
+        Initialize the compressor.
+
+        Args:
+            codec: Content-Encoding to use: none, gzip or zstd
+            min_bytes: Bodies smaller than this are sent uncompressed
+
+        Raises:
+            ValueError: If the codec is not supported
+        """
+        if codec not in SUPPORTED_CODECS:
+            raise ValueError(f"Invalid compression codec '{codec}'. Must be one of {SUPPORTED_CODECS}.")
+
+        self._zstd_compressor = None
+        if codec == "zstd":
+            try:
+                import zstandard
+                self._zstd_compressor = zstandard.ZstdCompressor(level=3)
+            except ImportError:
+                logger.warning("zstandard is not installed, falling back to gzip request compression")
+                codec = "gzip"
+
+        self._codec = codec
+        self._min_bytes = min_bytes
+        self._enabled = codec != "none"
+        self._lock = threading.Lock()
+        self._counters = {"compressed_requests": 0, "bytes_in": 0, "bytes_out": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def disable(self) -> None:
+        """Stop compressing, e.g. after the collector rejected an encoding with 415."""
+        if self._enabled:
+            logger.warning(f"Collector rejected {self._codec} request bodies, sending plain JSON from now on")
+        self._enabled = False
+
+    def compress(self, body: bytes) -> tuple[bytes, str | None]:
+        """
+        Compress a body if compression is enabled and the body is large enough.
+
+        Returns:
+            The (possibly compressed) body and its Content-Encoding, or None if sent as-is
+        """
+        if not self._enabled or len(body) < self._min_bytes:
+            return body, None
+
+        with self._lock:
+            # ZstdCompressor instances must not be used from several threads at once
+            if self._zstd_compressor is not None:
+                compressed = self._zstd_compressor.compress(body)
+            else:
+                compressed = gzip.compress(body, compresslevel=6)
+            self._counters["compressed_requests"] += 1
+            self._counters["bytes_in"] += len(body)
+            self._counters["bytes_out"] += len(compressed)
+        return compressed, self._codec
+
+    def stats(self) -> dict:
+        """Return compression counters, including total bytes saved."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "codec": self._codec if self._enabled else "none",
+            **counters,
+            "bytes_saved": counters["bytes_in"] - counters["bytes_out"],
+        }
@@ -1,28 +1,35 @@
 import logging
 import json
-import time
 
-from common.lmdb_clients import lmdb_write_client
+from common.lmdb_clients import storage_manager
+from common.lmdb_codec import RecordCodec
+from common.lmdb_index import index_batch
+from common.lmdb_sequence import append_record, decode_key
 from common.metric_type import MetricType
 from .exporter_interface import ExporterInterface
 
 
 class LMDBExporter(ExporterInterface):
     def __call__(self, payload, status_code=None, metric_type: MetricType = MetricType.SENSOR):
-        with lmdb_write_client.begin(write=True) as txn:
-            batch_data = {
-                "payload": payload,
-                "status_code": status_code,
-                "metric_type": metric_type.value
-            }
-            data = json.dumps(batch_data, separators=(",", ":")).encode("utf-8")
-            # Use metric_type.value as key prefix for clear segregation
-            key = f"{metric_type.value}-{int(time.time())}".encode()
-            txn.put(key, data)
-            
-            # Log appropriate message based on metric type
+        batch_data = {
+            "payload": payload,
+            "status_code": status_code,
+            "metric_type": metric_type.value
+        }
+        # Compressed with a codec header byte; legacy plain-JSON records still decode
+        data = RecordCodec().encode(json.dumps(batch_data, separators=(",", ":")).encode("utf-8"))
+        def store(txn) -> bytes:
+            # Each metric type has its own sub-database keyed by a monotonic sequence number
+            key = append_record(txn, metric_type, data)
             if metric_type == MetricType.SENSOR:
-                logging.info(f"Stored {len(payload)} sensor metrics in LMDB with key: {key}, status: {status_code}")
-            else:
-                logging.info(f"Stored device status in LMDB with key: {key}, status: {status_code}")
+                index_batch(txn, key, payload)
+            return key
+
+        key = storage_manager.write(store)
+        
+        # Log appropriate message based on metric type
+        if metric_type == MetricType.SENSOR:
+            logging.info(f"Stored {len(payload)} sensor metrics in LMDB with key: {metric_type.value}#{decode_key(key)}, status: {status_code}")
+        else:
+            logging.info(f"Stored {metric_type.value} in LMDB with key: {metric_type.value}#{decode_key(key)}, status: {status_code}")
         return True
@@ -1,10 +1,16 @@
 """
 Base class for analog sensors that use the ADS1115 ADC via I2C.
 
-Extends SensorInterface with ADC initialization and voltage reading capabilities.
+Extends SensorInterface with voltage reading from a channel of an ADS1115
+shared through the ADCManager, and optional burst waveform capture.
 """
 import logging
+import threading
+import time
+from array import array
 
+from common.adc_manager import DEFAULT_I2C_BUS, ADCChannel, ADCManager
+from common.waveform import CAPTURE_DATA_RATE, WaveformCaptureConfig, waveform_features
 from sensors.sensor_interface import SensorInterface
 
 logger = logging.getLogger(__name__)
@@ -14,11 +20,25 @@ class AnalogSensorBase(SensorInterface):
     """
     Base class for sensors that use the ADS1115 ADC.
     
-    Initializes I2C communication and provides voltage reading from
-    a specified ADC channel (0-3 corresponding to A0-A3).
+    Provides voltage reading from a specified ADC channel (0-3 corresponding
+    to A0-A3). Sensors on the same chip share its driver and bus lock.
+
+    With a capture configuration, a reading is occasionally accompanied by a
+    burst capture of the channel; its features are reported under "waveform"
+    and the raw samples are kept for upload when the trigger trips or a
+    waveform was requested.
     """
 
-    def __init__(self, id: str, description: str, channel: int = 0, address: int = 0x48):
+    def __init__(
+        self,
+        id: str,
+        description: str,
+        channel: int = 0,
+        address: int = 0x48,
+        bus: int = DEFAULT_I2C_BUS,
+        capture: WaveformCaptureConfig | None = None,
+        source=None,
+    ):
         """
         Initialize the analog sensor.
         
@@ -27,6 +47,9 @@ class AnalogSensorBase(SensorInterface):
             description: Human-readable description
             channel: ADC channel (0-3 for A0-A3), default 0
             address: I2C address of the ADS1115, default 0x48
+            bus: I2C bus number, default 1 (board SCL/SDA)
+            capture: Burst waveform capture configuration, default None (no captures)
+            source: Stand-in for the ADC channel (e.g. a SyntheticWaveform), default None (the ADS1115)
             
         Raises:
             ValueError: If channel is not 0-3
@@ -38,33 +61,28 @@ class AnalogSensorBase(SensorInterface):
         
         self._channel = channel
         self._address = address
+        self._bus = bus
+        self._analog_in = source if source is not None else ADCManager().acquire(channel, address=address, bus=bus)
+
+        self._capture = capture
+        # Preallocated so a capture doesn't allocate per sample
+        self._waveform = array('d', bytes(8 * capture.samples)) if capture is not None else None
+        self._last_capture: float | None = None
+        self._waveform_lock = threading.Lock()
+        self._waveform_requested = False
+        self._pending_waveform: dict | None = None
         
-        # Import hardware libraries here to avoid loading on dev machines
-        import board
-        import busio
-        import adafruit_ads1x15.ads1115 as ADS
-        from adafruit_ads1x15.analog_in import AnalogIn
-        
-        # Channel mapping: channel number to ADS1115 pin constant
-        channel_map = {
-            0: ADS.P0,  # A0
-            1: ADS.P1,  # A1
-            2: ADS.P2,  # A2
-            3: ADS.P3,  # A3
-        }
-        
-        # Initialize I2C and ADC
-        self._i2c = busio.I2C(board.SCL, board.SDA)
-        self._ads = ADS.ADS1115(self._i2c, address=address)
-        self._analog_in = AnalogIn(self._ads, channel_map[channel])
-        
-        logger.info(f"AnalogSensorBase '{id}' initialized on channel A{channel} (address=0x{address:02x})")
+        logger.info(f"AnalogSensorBase '{id}' initialized on channel A{channel} (bus={bus}, address=0x{address:02x})")
 
     @property
     def channel(self) -> int:
         """The ADC channel this sensor is using (0-3)."""
         return self._channel
 
+    def descriptor(self) -> dict:
+        """Sensor metadata including the ADC channel and address."""
+        return {**super().descriptor(), "channel": self._channel, "address": self._address}
+
     @property
     def voltage(self) -> float:
         """Read the current voltage from the ADC channel."""
@@ -75,13 +93,82 @@ class AnalogSensorBase(SensorInterface):
         """Read the raw ADC value (16-bit)."""
         return self._analog_in.value
 
+    def _convert_code(self, code: int) -> float:
+        """Convert a raw ADC code to the sensor's unit (volts here); subclasses override this."""
+        return code * self._analog_in.volts_per_code
+
+    def _sample_fields(self) -> dict:
+        """Fields of a regular reading."""
+        return super()._read_fields()
+
+    def _read_fields(self) -> dict:
+        fields = self._sample_fields()
+        features = self._capture_if_due()
+        if features is not None:
+            fields["waveform"] = features
+        return fields
+
+    def _capture_if_due(self) -> dict | None:
+        """Capture a waveform if the capture interval has passed or one was requested, and return its features."""
+        if self._capture is None:
+            return None
+        now = time.monotonic()
+        with self._waveform_lock:
+            requested = self._waveform_requested
+            if not requested and self._last_capture is not None and now - self._last_capture < self._capture.interval:
+                return None
+            self._waveform_requested = False
+        self._last_capture = now
+
+        waveform = self._waveform
+        sample_rate = self._analog_in.capture_raw(waveform, CAPTURE_DATA_RATE)
+        for i, code in enumerate(waveform):
+            waveform[i] = self._convert_code(int(code))
+        features = waveform_features(waveform, sample_rate, self._capture.bands)
+        features = {
+            **features,
+            "rms": round(features["rms"], 4),
+            "peak_to_peak": round(features["peak_to_peak"], 4),
+            "band_power": {band: round(power, 6) for band, power in features["band_power"].items()},
+        }
+
+        tripped = self._capture.tripped(features)
+        if requested or tripped:
+            with self._waveform_lock:
+                self._pending_waveform = {
+                    "id": self.id,
+                    "timestamp": self._timestamp(),
+                    "trigger": "threshold" if tripped else "request",
+                    "unit": self.unit,
+                    "features": features,
+                    "samples": [round(value, 4) for value in waveform],
+                }
+        return features
+
+    def request_waveform(self) -> bool:
+        """
+        Capture a waveform on the next reading and keep its raw samples for upload.
+
+        Returns:
+            False if the sensor has no capture configuration
+        """
+        if self._capture is None:
+            return False
+        with self._waveform_lock:
+            self._waveform_requested = True
+        return True
+
+    def take_waveform(self) -> dict | None:
+        """Return the raw waveform waiting for upload, if any, and clear it."""
+        with self._waveform_lock:
+            waveform, self._pending_waveform = self._pending_waveform, None
+        return waveform
+
     def cleanup(self) -> None:
-        """Release I2C resources. Call this when the sensor is no longer needed."""
-        if hasattr(self, '_i2c') and self._i2c:
-            try:
-                self._i2c.deinit()
-            except Exception:
-                pass  # Ignore errors during cleanup
+        """Release the ADC channel; the shared driver and bus close with their last user."""
+        if isinstance(getattr(self, '_analog_in', None), ADCChannel):
+            ADCManager().release(self._analog_in)
+        self._analog_in = None
 
     def __del__(self):
         """Attempt to cleanup when the sensor is garbage collected."""
@@ -15,6 +15,10 @@ Example voltage divider (10kΩ / 33kΩ):
 """
 import logging
 
+from common.adc_manager import DEFAULT_I2C_BUS
+from common.calibration import CalibrationTable, PiecewiseLinearCurve
+from common.oversampling import OversamplingConfig, summarize
+from common.waveform import WaveformCaptureConfig
 from .analog_sensor_base import AnalogSensorBase
 
 logger = logging.getLogger(__name__)
@@ -31,8 +35,9 @@ class PressureSensor(AnalogSensorBase):
     """
     Pressure sensor that reads analog voltage and converts to pressure units.
     
-    Uses linear interpolation to convert the sensor's voltage output
-    to pressure values. Accounts for voltage divider if present.
+    Converts raw ADC codes to pressure through a lookup table built once from
+    the calibration curve (linear interpolation by default), accounting for
+    the voltage divider if present.
     """
 
     def __init__(
@@ -47,6 +52,11 @@ class PressureSensor(AnalogSensorBase):
         min_voltage: float = DEFAULT_MIN_VOLTAGE,
         max_voltage: float = DEFAULT_MAX_VOLTAGE,
         address: int = 0x48,
+        bus: int = DEFAULT_I2C_BUS,
+        oversampling: OversamplingConfig | None = None,
+        capture: WaveformCaptureConfig | None = None,
+        source=None,
+        calibration=None,
     ):
         """
         Initialize the pressure sensor.
@@ -62,54 +72,33 @@ class PressureSensor(AnalogSensorBase):
             min_voltage: Sensor output voltage at minimum pressure, default 0.5V
             max_voltage: Sensor output voltage at maximum pressure, default 4.5V
             address: I2C address of the ADS1115, default 0x48
+            bus: I2C bus number, default 1 (board SCL/SDA)
+            oversampling: Take a filtered burst of samples per reading, default None (one sample)
+            capture: Burst waveform capture configuration, default None (no captures)
+            source: Stand-in for the ADC channel (e.g. a SyntheticWaveform), default None (the ADS1115)
+            calibration: Curve from sensor voltage to pressure (see common.calibration),
+                default None (linear from min_voltage/min_pressure to max_voltage/max_pressure)
         """
-        super().__init__(id, description, channel, address)
+        super().__init__(id, description, channel, address, bus, capture=capture, source=source)
         
-        self._min_pressure = min_pressure
-        self._max_pressure = max_pressure
         self._unit = unit
         self._voltage_divider_ratio = voltage_divider_ratio
-        self._min_voltage = min_voltage
-        self._max_voltage = max_voltage
+        self._oversampling = oversampling
         
-        # Pre-calculate the voltage range for efficiency
-        self._voltage_range = max_voltage - min_voltage
-        self._pressure_range = max_pressure - min_pressure
+        # Without a calibration curve, interpolate linearly between the voltage and pressure ranges
+        self._curve = calibration or PiecewiseLinearCurve([(min_voltage, min_pressure), (max_voltage, max_pressure)])
+        self._table = CalibrationTable(self._curve, self._analog_in.volts_per_code, voltage_divider_ratio)
         
         logger.info(
             f"PressureSensor '{id}' initialized: "
             f"channel=A{channel}, range={min_pressure}-{max_pressure} {unit}, "
-            f"voltage_divider_ratio={voltage_divider_ratio:.4f}"
+            f"voltage_divider_ratio={voltage_divider_ratio:.4f}, "
+            f"calibration={type(self._curve).__name__}"
         )
 
-    def _get_original_voltage(self) -> float:
-        """
-        Get the original sensor voltage before the voltage divider.
-        
-        Returns:
-            The calculated original sensor voltage
-        """
-        adc_voltage = self.voltage
-        return adc_voltage / self._voltage_divider_ratio
-
-    def _voltage_to_pressure(self, voltage: float) -> float:
-        """
-        Convert sensor voltage to pressure.
-        
-        Args:
-            voltage: The original sensor voltage (before voltage divider)
-            
-        Returns:
-            The calculated pressure value
-        """
-        # Clamp voltage to valid range
-        voltage = max(self._min_voltage, min(self._max_voltage, voltage))
-        
-        # Linear interpolation
-        normalized = (voltage - self._min_voltage) / self._voltage_range
-        pressure = self._min_pressure + (normalized * self._pressure_range)
-        
-        return round(pressure, 2)
+    def _convert_code(self, code: int) -> float:
+        """Look up the unrounded pressure of a raw ADC code."""
+        return self._table[code]
 
     def _read_value(self) -> float:
         """
@@ -118,25 +107,30 @@ class PressureSensor(AnalogSensorBase):
         Returns:
             The pressure value in the configured unit
         """
-        original_voltage = self._get_original_voltage()
-        return self._voltage_to_pressure(original_voltage)
+        return round(self._table[self.raw_value], 2)
 
-    @property
-    def unit(self) -> str:
-        """The pressure unit (e.g., 'psi', 'bar')."""
-        return self._unit
-
-    def current_metric(self):
+    def _sample_fields(self) -> dict:
         """
-        Get the current metric with pressure-specific fields.
-        
-        Returns:
-            Dict containing id, description, value, unit, and timestamp
+        Read the pressure, oversampled and filtered if configured.
+
+        An oversampled reading also reports the mean, min, max, standard deviation
+        and size of its raw sample window.
         """
+        if self._oversampling is None:
+            return super()._sample_fields()
+        config = self._oversampling
+        window = self._table.convert(self._analog_in.raw_samples(config.samples, config.data_rate))
+        summary = summarize(window)
         return {
-            "id": self.id,
-            "description": self.description,
-            "value": self._read_value(),
-            "unit": self._unit,
-            "timestamp": self._timestamp()
+            "value": round(config.apply(window), 2),
+            "mean": round(summary["mean"], 2),
+            "min": round(summary["min"], 2),
+            "max": round(summary["max"], 2),
+            "stddev": round(summary["stddev"], 3),
+            "samples": summary["samples"],
         }
+
+    @property
+    def unit(self) -> str:
+        """The pressure unit (e.g., 'psi', 'bar')."""
+        return self._unit
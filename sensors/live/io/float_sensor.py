@@ -7,11 +7,20 @@ Float sensors are typically connected:
 
 Supports both Normally Open (NO) and Normally Closed (NC) float sensors
 via the `inverted` parameter.
+
+In edge-triggered mode the sensor is not polled: gpiozero's when_pressed and
+when_released callbacks record every edge with a monotonic timestamp, and each
+reading reports the transitions and the fraction of time the float was up
+since the previous reading (e.g. the duty cycle of a pump). The callback only
+appends to the transition log; the debounce is applied by the reading, which
+has every edge and can tell a bounce from a short pulse.
 """
 import logging
+import time
 
 from gpiozero import Button
 
+from common.transition_log import TransitionLog
 from .io_sensor_base import IOSensorBase
 
 logger = logging.getLogger(__name__)
@@ -30,9 +39,22 @@ class FloatSensor(IOSensorBase):
     For Normally Closed (NC) sensors: inverted=True
       - Float UP (floating) → switch opens → returns 1.0
       - Float DOWN → switch closes → returns 0.0
+
+    Edge-triggered readings also carry "rises", "falls" and "high_ratio" for the
+    window since the previous reading, plus "bounces" for edges ignored by the
+    debounce and "lost" if the transition log overflowed.
     """
 
-    def __init__(self, id: str, description: str, pin: int, inverted: bool = False):
+    def __init__(
+        self,
+        id: str,
+        description: str,
+        pin: int,
+        inverted: bool = False,
+        edge_triggered: bool = False,
+        debounce: float = 0.0,
+        transition_capacity: int = 256,
+    ):
         """
         Initialize the float sensor.
         
@@ -41,12 +63,98 @@ class FloatSensor(IOSensorBase):
             description: Human-readable description
             pin: GPIO pin number (BCM numbering)
             inverted: Set True for Normally Closed (NC) sensors
+            edge_triggered: Record transitions from GPIO callbacks instead of polling the pin
+            debounce: Seconds a level must hold to count as a transition
+            transition_capacity: Transitions kept between two readings in edge-triggered mode
         """
         super().__init__(id, description, pin)
+        if debounce < 0:
+            raise ValueError(f"Invalid debounce {debounce}. Must not be negative.")
         self._inverted = inverted
         # Use Button with pull_up=True: pin is HIGH when open, LOW when grounded
         self._button = Button(pin, pull_up=True)
-        logger.info(f"FloatSensor '{id}' initialized on pin {pin} (inverted={inverted})")
+        self._edge_triggered = edge_triggered
+        if edge_triggered:
+            self._debounce = debounce
+            self._transitions = TransitionLog(transition_capacity)
+            # Consumer state: the window since the previous reading, and the newest edge,
+            # which can't be accepted until it has held for the debounce
+            self._window_start = time.monotonic()
+            self._window_state = self._is_up()
+            self._pending_edge: tuple[float, bool] | None = None
+            self._button.when_pressed = lambda: self._on_edge(True)
+            self._button.when_released = lambda: self._on_edge(False)
+        logger.info(
+            f"FloatSensor '{id}' initialized on pin {pin} (inverted={inverted}, edge_triggered={edge_triggered})"
+        )
+
+    def _is_up(self, pressed: bool | None = None) -> bool:
+        """Whether the float is up, given the switch state (read from the pin if not given)."""
+        if pressed is None:
+            pressed = self._button.is_pressed
+        return pressed != self._inverted
+
+    def _on_edge(self, pressed: bool) -> None:
+        """GPIO callback: record the edge. Never blocks; the debounce is applied by the reading."""
+        self._transitions.record(time.monotonic(), self._is_up(pressed))
+
+    def _read_fields(self) -> dict:
+        """
+        Report the current state, and in edge-triggered mode the transitions and time-up
+        ratio since the previous reading, from the transition log without polling the pin.
+
+        An edge counts once its level has held for the debounce; edges followed by
+        another one sooner are bounces. The newest edge may not have held long enough
+        yet, so it is kept and settled by the next reading.
+        """
+        if not self._edge_triggered:
+            return super()._read_fields()
+        now = time.monotonic()
+        edges, lost = self._transitions.drain()
+        if self._pending_edge is not None and not lost:
+            edges.insert(0, self._pending_edge)
+        self._pending_edge = None
+        state, since = self._window_state, self._window_start
+        high = 0.0
+        rises = 0
+        falls = 0
+        bounces = 0
+        for i, (timestamp, new_state) in enumerate(edges):
+            held_until = edges[i + 1][0] if i + 1 < len(edges) else now
+            if held_until - timestamp < self._debounce:
+                if i + 1 < len(edges):
+                    bounces += 1
+                else:
+                    self._pending_edge = (timestamp, new_state)
+                continue
+            if new_state == state:
+                continue
+            # An edge settled from the previous window changes the state from this window's start
+            timestamp = max(timestamp, self._window_start)
+            if state:
+                high += timestamp - since
+            rises += new_state
+            falls += not new_state
+            state, since = new_state, timestamp
+        if lost:
+            # Edges were overwritten, so the tracked state may be wrong; trust the pin
+            state = self._is_up()
+        if state:
+            high += now - since
+        elapsed = now - self._window_start
+        self._window_start, self._window_state = now, state
+
+        fields = {
+            "value": 1.0 if state else 0.0,
+            "rises": rises,
+            "falls": falls,
+            "high_ratio": round(high / elapsed, 4) if elapsed > 0 else float(state),
+        }
+        if bounces:
+            fields["bounces"] = bounces
+        if lost:
+            fields["lost"] = lost
+        return fields
 
     def _read_value(self) -> float:
         """
@@ -61,8 +169,18 @@ class FloatSensor(IOSensorBase):
             pressed = not pressed
         return 1.0 if pressed else 0.0
 
+    def descriptor(self) -> dict:
+        """Sensor metadata including whether the sensor is edge-triggered."""
+        descriptor = super().descriptor()
+        if self._edge_triggered:
+            descriptor["edge_triggered"] = True
+            descriptor["debounce"] = self._debounce
+        return descriptor
+
     def cleanup(self) -> None:
         """Release the GPIO pin and close the button device."""
         if hasattr(self, '_button') and self._button:
+            self._button.when_pressed = None
+            self._button.when_released = None
             self._button.close()
         super().cleanup()
@@ -38,6 +38,10 @@ class IOSensorBase(SensorInterface):
         """The GPIO pin number this sensor is using."""
         return self._pin
 
+    def descriptor(self) -> dict:
+        """Sensor metadata including the GPIO pin."""
+        return {**super().descriptor(), "pin": self._pin}
+
     def cleanup(self) -> None:
         """Release the GPIO pin. Call this when the sensor is no longer needed."""
         self._registry.release(self._pin)
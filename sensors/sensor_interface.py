@@ -1,6 +1,14 @@
 import time
 
 class SensorInterface:
+    # Per-sensor read deadline in seconds (None uses the sampling engine default)
+    deadline: float | None = None
+    # Per-sensor sampling interval in seconds (None uses the scheduler default)
+    interval: float | None = None
+    # Report-by-exception configuration (a DeadbandConfig, None exports every reading)
+    deadband = None
+    # Measurement unit, reported with verbose readings and in the sensor descriptor
+    unit: str | None = None
 
     def __init__(self, id: str, description: str):
         self.id = id
@@ -12,10 +20,40 @@ class SensorInterface:
     def _read_value(self):
         raise NotImplementedError("_read_value must be implemented by subclasses")
 
-    def current_metric(self):
-        return {
+    def _read_fields(self) -> dict:
+        """Fields a reading contributes to the metric; sensors may add more than the value."""
+        return {"value": self._read_value()}
+
+    def descriptor(self) -> dict:
+        """Static sensor metadata, registered once instead of being repeated in every reading."""
+        descriptor = {
+            "id": self.id,
+            "class": self.__class__.__name__,
+            "description": self.description,
+        }
+        if self.unit is not None:
+            descriptor["unit"] = self.unit
+        return descriptor
+
+    def current_metric(self, compact: bool = False):
+        """
+        Read the sensor and build a metric.
+
+        Args:
+            compact: Only include id, value and timestamp (metadata is sent separately)
+        """
+        if compact:
+            return {
+                "id": self.id,
+                **self._read_fields(),
+                "timestamp": self._timestamp()
+            }
+        metric = {
             "id": self.id,
             "description": self.description,
-            "value": self._read_value(),
-            "timestamp": self._timestamp()
+            **self._read_fields(),
         }
+        if self.unit is not None:
+            metric["unit"] = self.unit
+        metric["timestamp"] = self._timestamp()
+        return metric
@@ -24,11 +24,3 @@ class EnergyConsumptionSensor(SensorInterface):
             self._value = value
             #print(f"EnergyConsumptionSensor {self.id} updated value to {self._value}")
             sleep(0.2)
-
-    def current_metric(self):
-        return {
-            "id": self.id,
-            "description": self.description,
-            "value": self._read_value(),
-            "timestamp": self._timestamp()
-        }
@@ -67,18 +67,3 @@ class PressureSensor(SensorInterface):
     def unit(self) -> str:
         """The pressure unit (e.g., 'psi', 'bar')."""
         return self._unit
-
-    def current_metric(self):
-        """
-        Get the current metric with pressure-specific fields.
-        
-        Returns:
-            Dict containing id, description, value, unit, and timestamp
-        """
-        return {
-            "id": self.id,
-            "description": self.description,
-            "value": self._read_value(),
-            "unit": self._unit,
-            "timestamp": self._timestamp()
-        }
@@ -0,0 +1,97 @@
+"""
+Synthetic Waveform - Simulated ADC channel for developing analog sensors without hardware.
+
+Stands in for the ADC channel handle an analog sensor gets from the ADCManager:
+it produces a DC offset plus sine components and Gaussian noise, so waveform
+capture, oversampling and filtering can be exercised on a development machine.
+"""
+import math
+import random
+import time
+
+from common.adc_manager import MAX_CODE, PGA_FULL_SCALE
+from common.waveform import CAPTURE_DATA_RATE
+
+# ADS1115 full-scale range at the default gain (±4.096V over 16-bit signed values)
+FULL_SCALE_VOLTAGE = PGA_FULL_SCALE[1]
+
+
+class SyntheticWaveform:
+    """
+    Simulated ADC channel: offset + sum of amplitude * sin(2 * pi * frequency * t) + noise.
+    """
+
+    def __init__(
+        self,
+        offset: float = 1.5,
+        components: list[tuple[float, float]] | None = None,
+        noise: float = 0.005,
+        seed: int | None = None,
+    ):
+        """
+        Initialize the synthetic source.
+
+        Args:
+            offset: DC voltage, default 1.5V
+            components: (frequency in Hz, amplitude in volts) sine components,
+                default a 25 Hz pump ripple of 0.05V
+            noise: Standard deviation of the Gaussian noise in volts
+            seed: Seed for the noise, for reproducible waveforms
+        """
+        self._offset = offset
+        self._components = components if components is not None else [(25.0, 0.05)]
+        self._noise = noise
+        self._random = random.Random(seed)
+        self._started = time.monotonic()
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "SyntheticWaveform":
+        """Build a source from a sensor_config.yaml 'synthetic' block."""
+        components = config.get('components')
+        return cls(
+            offset=config.get('offset', 1.5),
+            components=(
+                [(component['frequency'], component['amplitude']) for component in components]
+                if components is not None else None
+            ),
+            noise=config.get('noise', 0.005),
+            seed=config.get('seed'),
+        )
+
+    def _voltage_at(self, t: float) -> float:
+        voltage = self._offset
+        if self._noise:
+            voltage += self._random.gauss(0.0, self._noise)
+        for frequency, amplitude in self._components:
+            voltage += amplitude * math.sin(2 * math.pi * frequency * t)
+        return voltage
+
+    @property
+    def voltage(self) -> float:
+        """The simulated voltage now."""
+        return self._voltage_at(time.monotonic() - self._started)
+
+    @property
+    def value(self) -> int:
+        """The simulated raw ADC code (signed 16-bit)."""
+        return self._code(self.voltage)
+
+    @property
+    def volts_per_code(self) -> float:
+        return FULL_SCALE_VOLTAGE / MAX_CODE
+
+    def _code(self, voltage: float) -> int:
+        return int(max(-MAX_CODE - 1, min(MAX_CODE, round(voltage / FULL_SCALE_VOLTAGE * MAX_CODE))))
+
+    def raw_samples(self, count: int, data_rate: int | None = None) -> list[int]:
+        """Simulate `count` back-to-back conversions as raw codes."""
+        started = time.monotonic() - self._started
+        rate = data_rate or CAPTURE_DATA_RATE
+        return [self._code(self._voltage_at(started + i / rate)) for i in range(count)]
+
+    def capture_raw(self, buffer, data_rate: int = CAPTURE_DATA_RATE) -> float:
+        """Fill `buffer` with raw codes of a burst at `data_rate`, without waiting in real time, and return the rate."""
+        started = time.monotonic() - self._started
+        for i in range(len(buffer)):
+            buffer[i] = self._code(self._voltage_at(started + i / data_rate))
+        return float(data_rate)
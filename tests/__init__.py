@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# common.lmdb_clients opens its environment at import; keep the tests' database out of the working tree
+os.environ.setdefault("SENSOR_READER_LMDB_PATH", os.path.join(tempfile.mkdtemp(prefix="sensor-reader-tests-"), "data.lmdb"))
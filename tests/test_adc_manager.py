@@ -0,0 +1,76 @@
+import sys
+import unittest
+from unittest import mock
+
+from common.adc_manager import ADCManager
+
+
+class _AnalogIn:
+    """Stands in for adafruit's AnalogIn: each read is a new conversion."""
+
+    def __init__(self, ads, pin):
+        self.pin = pin
+        self.conversions = 0
+
+    @property
+    def value(self) -> int:
+        self.conversions += 1
+        return 1000 * self.pin + self.conversions
+
+
+def _hardware_modules() -> dict:
+    ads1115 = mock.MagicMock(P0=0, P1=1, P2=2, P3=3)
+    ads1115.ADS1115.return_value.gain = 1
+    analog_in = mock.MagicMock(AnalogIn=_AnalogIn)
+    return {
+        "board": mock.MagicMock(),
+        "busio": mock.MagicMock(),
+        "adafruit_ads1x15": mock.MagicMock(ads1115=ads1115, analog_in=analog_in),
+        "adafruit_ads1x15.ads1115": ads1115,
+        "adafruit_ads1x15.analog_in": analog_in,
+    }
+
+
+class ADCManagerTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _hardware_modules())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = ADCManager()
+        self.handles = [self.manager.acquire(0, address=0x49), self.manager.acquire(1, address=0x49)]
+        self.addCleanup(lambda: [self.manager.release(handle) for handle in self.handles])
+
+    def test_one_pass_serves_every_channel_of_the_chip_once(self):
+        first, second = self.handles
+        scans = self.manager.stats()["scans"]
+
+        self.assertEqual(first.value, 1)
+        self.assertEqual(second.value, 1001)
+        self.assertEqual(self.manager.stats()["scans"], scans + 1)
+
+        # A channel read again gets a new conversion rather than the code it already had
+        self.assertEqual(first.value, 2)
+        self.assertEqual(self.manager.stats()["scans"], scans + 2)
+
+    def test_stale_pass_is_not_reused(self):
+        first, second = self.handles
+        first.value
+        with mock.patch.object(self.manager.settings, "adc_scan_max_age_seconds", 0.0):
+            self.assertEqual(second.value, 1002)
+
+    def test_volts_per_code_follows_the_gain(self):
+        self.assertAlmostEqual(self.handles[0].volts_per_code, 4.096 / 32767)
+
+    def test_bus_is_released_with_its_last_channel(self):
+        i2c = self.manager._buses[1].i2c
+        handles, self.handles = self.handles, []
+        self.manager.release(handles[0])
+        self.assertIn("1:0x49", self.manager.stats()["chips"])
+
+        self.manager.release(handles[1])
+        self.assertEqual(self.manager.stats()["chips"], {})
+        i2c.deinit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
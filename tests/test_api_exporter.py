@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+
+from common.circuit_breaker import BreakerState, CircuitBreaker
+from metrics_exporter.api_exporter import APIExporter
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker()
+        self.breaker._init_breaker()
+        # Put the breaker in half-open state, ready for a probe
+        with self.breaker._lock:
+            self.breaker._state = BreakerState.HALF_OPEN
+
+    def tearDown(self):
+        self.breaker._init_breaker()
+
+    def test_unexpected_exception_releases_probe(self):
+        exporter = APIExporter()
+        with mock.patch.object(exporter.token_manager.__class__, "token", new_callable=mock.PropertyMock, return_value="t"), \
+                mock.patch.object(exporter, "_send_request", side_effect=ValueError("bad ttl")):
+            with self.assertRaises(ValueError):
+                exporter({"metrics": []})
+
+        self.assertEqual(self.breaker.state, BreakerState.HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+from common.metric_type import MetricType
+from metrics_exporter import batcher as batcher_module
+from metrics_exporter.batcher import MetricBatcher
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _readings(count: int, start: int = 0) -> list[dict]:
+    return [{"id": "s1", "value": float(i), "timestamp": 1700000000 + i} for i in range(start, start + count)]
+
+
+class MetricBatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(batcher_module, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.flushed = []
+        self.spilled = []
+        self.batcher = MetricBatcher(
+            lambda payload, metric_type: self.flushed.append((payload, metric_type)),
+            lambda payload, metric_type: self.spilled.append((payload, metric_type)),
+        )
+        self.policy = self.batcher._policies[MetricType.SENSOR]
+
+    def test_merges_sensor_payloads_until_the_record_limit(self):
+        self.policy.max_records = 5
+        self.batcher.add(_readings(3), MetricType.SENSOR)
+        self.assertEqual(self.flushed, [])
+
+        self.batcher.add(_readings(2, start=3), MetricType.SENSOR)
+        self.assertEqual(self.flushed, [(_readings(5), MetricType.SENSOR)])
+        self.assertEqual(self.batcher.stats()["pending_records"]["sensor-batch"], 0)
+
+    def test_flushes_before_a_payload_that_would_exceed_the_byte_limit(self):
+        first, second = _readings(2), _readings(2, start=2)
+        self.policy.max_bytes = len(str(first)) + 10
+        self.batcher.add(first, MetricType.SENSOR)
+        self.batcher.add(second, MetricType.SENSOR)
+
+        self.assertEqual(self.flushed, [(first, MetricType.SENSOR)])
+        self.assertEqual(self.batcher.drain(), [(second, MetricType.SENSOR)])
+
+    def test_flush_due_flushes_after_the_latency_limit(self):
+        self.policy.max_latency = 10.0
+        self.batcher.add(_readings(1), MetricType.SENSOR)
+
+        self.clock.now += 4.0
+        self.assertEqual(self.batcher.flush_due(), 6.0)
+        self.assertEqual(self.flushed, [])
+
+        self.clock.now += 6.0
+        self.assertIsNone(self.batcher.flush_due())
+        self.assertEqual(len(self.flushed), 1)
+
+    def test_device_statuses_merge_into_a_list(self):
+        self.batcher._policies[MetricType.DEVICE_STATUS].max_records = 2
+        self.batcher.add({"cpu": 1}, MetricType.DEVICE_STATUS)
+        self.batcher.add({"cpu": 2}, MetricType.DEVICE_STATUS)
+
+        self.assertEqual(self.flushed, [([{"cpu": 1}, {"cpu": 2}], MetricType.DEVICE_STATUS)])
+
+    def test_batch_whose_flush_raises_is_spilled(self):
+        self.batcher._flush = mock.Mock(side_effect=RuntimeError("exporter bug"))
+        self.policy.max_records = 2
+        self.batcher.add(_readings(2), MetricType.SENSOR)
+
+        self.assertEqual(self.spilled, [(_readings(2), MetricType.SENSOR)])
+        self.assertEqual(self.batcher.drain(), [])
+
+    def test_batch_stays_pending_when_spilling_raises_too(self):
+        self.batcher._flush = mock.Mock(side_effect=RuntimeError("exporter bug"))
+        self.batcher._spill = mock.Mock(side_effect=OSError("disk full"))
+        self.policy.max_records = 2
+        self.batcher.add(_readings(2), MetricType.SENSOR)
+
+        self.assertEqual(self.batcher.drain(), [(_readings(2), MetricType.SENSOR)])
+
+
+if __name__ == "__main__":
+    unittest.main()
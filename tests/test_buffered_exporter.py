@@ -0,0 +1,42 @@
+import time
+import unittest
+from unittest import mock
+
+from common.metric_type import MetricType
+from metrics_exporter.buffered_exporter import BufferedExporter
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class SenderThreadTest(unittest.TestCase):
+    def setUp(self):
+        self.exporter = BufferedExporter()
+        self.addCleanup(self.exporter._stop.set)
+
+    def test_sender_survives_failures_to_send_and_spill(self):
+        exporter = self.exporter
+        api_exporter = mock.Mock(side_effect=[RuntimeError("exporter bug"), 201])
+        lmdb_exporter = mock.Mock(side_effect=OSError("disk full"))
+        dropped = exporter._counters["dropped"]
+        with mock.patch.object(exporter, "_api_exporter", api_exporter), \
+                mock.patch.object(exporter, "_lmdb_exporter", lmdb_exporter), \
+                mock.patch.object(exporter, "_batcher", mock.Mock(flush_due=mock.Mock(side_effect=OSError("disk full")))):
+            exporter([{"id": "s1"}], MetricType.SENSOR_METADATA)
+            self.assertTrue(_wait_for(lambda: exporter._counters["dropped"] > dropped))
+
+            sent = exporter._counters["sent"]
+            exporter([{"id": "s2"}], MetricType.SENSOR_METADATA)
+            self.assertTrue(_wait_for(lambda: exporter._counters["sent"] > sent))
+
+        self.assertTrue(exporter._sender_thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from common.calibration import CalibrationTable, PiecewiseLinearCurve, PolynomialCurve, curve_from_dict
+
+# ADS1115 at gain 1 (+/-4.096 V full scale)
+VOLTS_PER_CODE = 4.096 / 32768
+DIVIDER_RATIO = 33.0 / (10.0 + 33.0)
+
+
+def linear_pressure(adc_voltage: float, min_voltage=0.5, max_voltage=4.5, min_pressure=0.0, max_pressure=30.0) -> float:
+    """The conversion PressureSensor used before calibration tables."""
+    voltage = max(min_voltage, min(max_voltage, adc_voltage / DIVIDER_RATIO))
+    normalized = (voltage - min_voltage) / (max_voltage - min_voltage)
+    return min_pressure + normalized * (max_pressure - min_pressure)
+
+
+class CalibrationTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = CalibrationTable(PiecewiseLinearCurve([(0.5, 0.0), (4.5, 30.0)]), VOLTS_PER_CODE, DIVIDER_RATIO)
+
+    def test_two_point_table_matches_the_linear_conversion(self):
+        for code in range(-32768, 32768, 97):
+            with self.subTest(code=code):
+                self.assertAlmostEqual(self.table[code], linear_pressure(code * VOLTS_PER_CODE), places=9)
+
+    def test_negative_codes_and_raw_bit_patterns_share_an_entry(self):
+        self.assertEqual(self.table[-1], self.table[0xFFFF])
+        self.assertEqual(self.table[-32768], 0.0)
+        self.assertEqual(self.table[32767], 30.0)
+
+    def test_convert_matches_indexing(self):
+        codes = [-200, 0, 5000, 12000, 32767]
+        self.assertEqual(self.table.convert(codes), [self.table[code] for code in codes])
+
+
+class CurveTest(unittest.TestCase):
+    def test_piecewise_interpolates_between_points_and_clamps_at_the_ends(self):
+        curve = PiecewiseLinearCurve([(3.0, 18.5), (0.5, 0.0), (1.5, 7.2)])
+        self.assertEqual(curve(0.0), 0.0)
+        self.assertAlmostEqual(curve(1.0), 3.6)
+        self.assertAlmostEqual(curve(2.25), 7.2 + 0.5 * (18.5 - 7.2))
+        self.assertEqual(curve(5.0), 18.5)
+
+    def test_polynomial_is_clamped_to_its_range(self):
+        curve = PolynomialCurve([-3.75, 7.5], minimum=0.0, maximum=30.0)
+        self.assertEqual(curve(0.0), 0.0)
+        self.assertAlmostEqual(curve(2.0), 11.25)
+        self.assertEqual(curve(10.0), 30.0)
+
+    def test_invalid_calibrations_raise_value_error(self):
+        for config in (
+            {"type": "piecewise", "points": [[0.5, 0.0]]},
+            {"type": "piecewise", "points": [[0.5, 0.0], [0.5, 1.0]]},
+            {"type": "polynomial", "coefficients": []},
+            {"type": "polynomial", "coefficients": [1.0], "min": 2.0, "max": 1.0},
+            {"type": "spline"},
+        ):
+            with self.subTest(config=config), self.assertRaises(ValueError):
+                curve_from_dict(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
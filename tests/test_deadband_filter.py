@@ -0,0 +1,75 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from common import deadband_filter as deadband_module
+from common.deadband_filter import DeadbandConfig, DeadbandFilter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _reading(value, **fields) -> dict:
+    return {"id": "tank", "value": value, **fields}
+
+
+class DeadbandFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(deadband_module, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _filter(self, **config) -> DeadbandFilter:
+        return DeadbandFilter([
+            SimpleNamespace(id="tank", deadband=DeadbandConfig(**config)),
+            SimpleNamespace(id="pump", deadband=None),
+        ])
+
+    def test_suppresses_readings_inside_the_deadband(self):
+        deadband = self._filter(absolute=0.5)
+        self.assertEqual(len(deadband.filter([_reading(10.0)])), 1)
+        self.assertEqual(deadband.filter([_reading(10.4)]), [])
+        self.assertEqual(deadband.filter([_reading(9.6)]), [])
+
+        # The band is around the last exported value, and the export counts what was suppressed
+        self.assertEqual(deadband.filter([_reading(10.6)]), [_reading(10.6, suppressed=2)])
+        self.assertEqual(deadband.stats()["suppressed_by_sensor"], {"tank": 2})
+
+    def test_percent_deadband(self):
+        deadband = self._filter(percent=10)
+        deadband.filter([_reading(50.0)])
+        self.assertEqual(deadband.filter([_reading(54.0)]), [])
+        self.assertEqual(len(deadband.filter([_reading(56.0)])), 1)
+
+    def test_heartbeat_exports_an_unchanged_value(self):
+        deadband = self._filter(absolute=1.0, heartbeat=60)
+        deadband.filter([_reading(10.0)])
+        self.clock.now = 59.0
+        self.assertEqual(deadband.filter([_reading(10.0)]), [])
+        self.clock.now = 60.0
+        self.assertEqual(len(deadband.filter([_reading(10.0)])), 1)
+
+    def test_readings_carrying_a_window_are_never_suppressed(self):
+        deadband = self._filter(absolute=1.0)
+        deadband.filter([_reading(1.0)])
+
+        transitions = _reading(1.0, rises=1, falls=1, high_ratio=0.4)
+        waveform = _reading(1.0, waveform={"rms": 0.1})
+        self.assertEqual(deadband.filter([transitions]), [transitions])
+        self.assertEqual(deadband.filter([waveform]), [waveform])
+        self.assertEqual(deadband.filter([_reading(1.0, rises=0, falls=0)]), [])
+
+    def test_sensors_without_a_deadband_pass_through(self):
+        deadband = self._filter(absolute=1.0)
+        pump = {"id": "pump", "value": 1.0}
+        self.assertEqual(deadband.filter([pump, pump]), [pump, pump])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import unittest
+from unittest import mock
+
+# gpiozero is only installed on the Raspberry Pi
+with mock.patch.dict(sys.modules, {"gpiozero": mock.MagicMock()}):
+    from sensors.live.io import float_sensor
+    from sensors.live.io.float_sensor import FloatSensor
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+class EdgeTriggeredFloatSensorTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(float_sensor, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        button = mock.patch.object(float_sensor, "Button")
+        button.start().return_value.is_pressed = False
+        self.addCleanup(button.stop)
+
+    def _sensor(self, debounce=0.0, capacity=256):
+        sensor = FloatSensor("float-1", "Tank float", 17, edge_triggered=True, debounce=debounce, transition_capacity=capacity)
+        self.addCleanup(sensor.cleanup)
+        return sensor
+
+    def _edge(self, sensor, at, pressed):
+        self.clock.now = at
+        sensor._on_edge(pressed)
+
+    def test_reports_transitions_and_time_up_ratio(self):
+        sensor = self._sensor()
+        self._edge(sensor, 101.0, True)
+        self._edge(sensor, 103.0, False)
+        self._edge(sensor, 104.0, True)
+        self.clock.now = 110.0
+
+        fields = sensor._read_fields()
+        self.assertEqual(fields["value"], 1.0)
+        self.assertEqual((fields["rises"], fields["falls"]), (2, 1))
+        self.assertEqual(fields["high_ratio"], 0.8)
+        self.assertNotIn("bounces", fields)
+
+    def test_debounce_drops_bounces_and_keeps_short_pulses(self):
+        sensor = self._sensor(debounce=0.01)
+        # Contact bounce: the level settles up after the last edge
+        self._edge(sensor, 101.000, True)
+        self._edge(sensor, 101.002, False)
+        self._edge(sensor, 101.004, True)
+        # A real 50 ms drop, longer than the debounce
+        self._edge(sensor, 102.000, False)
+        self._edge(sensor, 102.050, True)
+        self.clock.now = 103.0
+
+        fields = sensor._read_fields()
+        self.assertEqual((fields["rises"], fields["falls"]), (2, 1))
+        self.assertEqual(fields["bounces"], 2)
+        self.assertEqual(fields["value"], 1.0)
+
+    def test_edge_still_settling_is_decided_by_the_next_reading(self):
+        sensor = self._sensor(debounce=0.01)
+        self._edge(sensor, 101.0, True)
+        self.clock.now = 101.005
+
+        fields = sensor._read_fields()
+        self.assertEqual((fields["value"], fields["rises"]), (0.0, 0))
+
+        self.clock.now = 102.0
+        fields = sensor._read_fields()
+        self.assertEqual((fields["value"], fields["rises"], fields["falls"]), (1.0, 1, 0))
+        self.assertEqual(fields["high_ratio"], 1.0)
+
+    def test_overflow_reports_lost_transitions_and_trusts_the_pin(self):
+        sensor = self._sensor(capacity=4)
+        for i in range(10):
+            self._edge(sensor, 101.0 + i, i % 2 == 0)
+        sensor._button.is_pressed = True
+        self.clock.now = 120.0
+
+        fields = sensor._read_fields()
+        self.assertEqual(fields["lost"], 6)
+        self.assertEqual(fields["value"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
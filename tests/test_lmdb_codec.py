@@ -0,0 +1,51 @@
+import json
+import unittest
+from unittest import mock
+
+from common.lmdb_codec import LEGACY_JSON, RAW, ZLIB, RecordCodec
+
+RECORD = json.dumps({"payload": [{"id": "tank", "value": 1.5, "timestamp": 1700000000}], "status_code": None}).encode()
+
+
+class RecordCodecTest(unittest.TestCase):
+    def setUp(self):
+        self.codec = RecordCodec()
+
+    def test_round_trip_with_codec_header(self):
+        encoded = self.codec.encode(RECORD, train=False)
+
+        self.assertEqual(encoded[0], ZLIB)
+        self.assertEqual(self.codec.decode(encoded), RECORD)
+
+    def test_legacy_json_records_decode_as_is(self):
+        self.assertEqual(RECORD[0], LEGACY_JSON)
+        self.assertEqual(self.codec.decode(RECORD), RECORD)
+
+    def test_uncompressed_records_decode(self):
+        self.assertEqual(self.codec.decode(bytes([RAW]) + RECORD), RECORD)
+
+    def test_unknown_header_and_corrupt_data_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            self.codec.decode(b"\x7fdata")
+        with self.assertRaises(ValueError):
+            self.codec.decode(b"")
+        with self.assertRaises(ValueError):
+            self.codec.decode(bytes([ZLIB, 0, 0]) + b"not zlib")
+
+    def test_missing_dictionary_raises_lookup_error(self):
+        with self.assertRaises(LookupError):
+            self.codec.decode(bytes([ZLIB]) + (65000).to_bytes(2, "big") + b"data")
+
+    def test_records_stay_decodable_across_dictionary_training(self):
+        before = self.codec.encode(RECORD, train=False)
+        with mock.patch.object(self.codec.settings, "lmdb_dictionary_samples", 3):
+            encoded = [self.codec.encode(RECORD) for _ in range(4)]
+
+        self.assertTrue(self.codec.stats()["dictionary"])
+        self.assertEqual(int.from_bytes(encoded[-1][1:3], "big"), self.codec.stats()["dictionary"])
+        for data in [before, *encoded]:
+            self.assertEqual(self.codec.decode(data), RECORD)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import unittest
+from unittest import mock
+
+from common import lmdb_index
+from common.lmdb_clients import lmdb_env, meta_db, metric_dbs, sensor_index_batches_db, sensor_index_db, storage_manager
+from common.lmdb_codec import RecordCodec
+from common.lmdb_index import BACKFILL_DONE_KEY, _indexed_sensors, _scan, backfill_index, index_batch, purge_before
+from common.lmdb_sequence import append_record
+from common.metric_type import MetricType
+
+SENSOR_DB = metric_dbs[MetricType.SENSOR]
+
+
+def _batch(*readings) -> bytes:
+    payload = [{"id": sensor_id, "value": 1.0, "timestamp": timestamp} for sensor_id, timestamp in readings]
+    return RecordCodec().encode(json.dumps({"payload": payload, "status_code": None}).encode(), train=False)
+
+
+def _store(*batches, indexed: bool = True) -> list[bytes]:
+    def store(txn):
+        keys = []
+        for data in batches:
+            key = append_record(txn, MetricType.SENSOR, data)
+            if indexed:
+                index_batch(txn, key, json.loads(RecordCodec().decode(data))["payload"])
+            keys.append(key)
+        return keys
+
+    return storage_manager.write(store)
+
+
+def _payload(key: bytes) -> list[dict] | None:
+    with lmdb_env.begin(db=SENSOR_DB) as txn:
+        data = txn.get(key)
+        return json.loads(RecordCodec().decode(data))["payload"] if data is not None else None
+
+
+class SensorIndexTest(unittest.TestCase):
+    def setUp(self):
+        def clear(txn):
+            for db in (SENSOR_DB, sensor_index_db, sensor_index_batches_db):
+                txn.drop(db, delete=False)
+            txn.delete(BACKFILL_DONE_KEY, db=meta_db)
+
+        storage_manager.write(clear)
+
+    def test_scan_finds_the_batches_of_a_sensor_in_a_time_range(self):
+        keys = _store(_batch(("tank", 100), ("pump", 100)), _batch(("tank", 200)), _batch(("tank", 300)))
+
+        with lmdb_env.begin() as txn:
+            self.assertEqual(_scan(txn, "tank", 150, 300), [keys[1]])
+            self.assertEqual(_scan(txn, "pump", 0, 1000), [keys[0]])
+            self.assertEqual(_indexed_sensors(txn), ["pump", "tank"])
+
+    def test_backfill_indexes_unindexed_batches_in_chunks_and_runs_once(self):
+        indexed = _store(_batch(("tank", 100)))
+        unindexed = _store(*[_batch(("tank", 200 + i)) for i in range(5)], indexed=False)
+
+        with mock.patch.object(lmdb_index, "BACKFILL_CHUNK", 2):
+            self.assertEqual(backfill_index(), 5)
+        with lmdb_env.begin() as txn:
+            self.assertEqual(_scan(txn, "tank", 0, 1000), indexed + unindexed)
+            self.assertIsNotNone(txn.get(BACKFILL_DONE_KEY, db=meta_db))
+
+        _store(_batch(("tank", 900)), indexed=False)
+        self.assertEqual(backfill_index(), 0)
+
+    def test_purge_before_deletes_old_readings_and_rewrites_partial_batches(self):
+        old, mixed, new = _store(
+            _batch(("tank", 100), ("pump", 100)),
+            _batch(("tank", 150), ("pump", 250)),
+            _batch(("tank", 300)),
+        )
+
+        self.assertEqual(purge_before(200), 3)
+
+        self.assertIsNone(_payload(old))
+        self.assertEqual([reading["timestamp"] for reading in _payload(mixed)], [250])
+        self.assertEqual(len(_payload(new)), 1)
+        with lmdb_env.begin() as txn:
+            self.assertEqual(_scan(txn, "tank", 0, 1000), [new])
+            self.assertEqual(_scan(txn, "pump", 0, 1000), [mixed])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from common.lmdb_clients import lmdb_env, meta_db, metric_dbs, storage_manager
+from common.lmdb_sequence import append_record, decode_key, encode_key, next_sequence_key
+from common.metric_type import MetricType
+
+COUNTER_KEY = f"seq:{MetricType.WAVEFORM.value}".encode()
+
+
+class SequenceKeyTest(unittest.TestCase):
+    def setUp(self):
+        def clear(txn):
+            txn.drop(metric_dbs[MetricType.WAVEFORM], delete=False)
+            txn.delete(COUNTER_KEY, db=meta_db)
+
+        storage_manager.write(clear)
+
+    def test_byte_order_is_numeric_order(self):
+        sequences = [1, 2, 255, 256, 65535, 65536, 2 ** 40]
+        keys = [encode_key(sequence) for sequence in sequences]
+
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual([decode_key(key) for key in keys], sequences)
+
+    def test_appended_records_get_increasing_keys_in_storage_order(self):
+        keys = storage_manager.write(lambda txn: [append_record(txn, MetricType.WAVEFORM, b"x") for _ in range(300)])
+
+        self.assertEqual([decode_key(key) for key in keys], list(range(1, 301)))
+        with lmdb_env.begin(db=metric_dbs[MetricType.WAVEFORM]) as txn:
+            self.assertEqual([key for key, _ in txn.cursor()], keys)
+
+    def test_counter_never_falls_behind_the_newest_stored_key(self):
+        # A record stored without its counter, e.g. the meta database was lost
+        storage_manager.write(lambda txn: txn.put(encode_key(41), b"x", db=metric_dbs[MetricType.WAVEFORM]))
+
+        key = storage_manager.write(lambda txn: next_sequence_key(txn, MetricType.WAVEFORM))
+        self.assertEqual(decode_key(key), 42)
+
+    def test_counter_survives_deleting_the_newest_record(self):
+        keys = storage_manager.write(lambda txn: [append_record(txn, MetricType.WAVEFORM, b"x") for _ in range(3)])
+        storage_manager.write(lambda txn: txn.delete(keys[-1], db=metric_dbs[MetricType.WAVEFORM]))
+
+        key = storage_manager.write(lambda txn: append_record(txn, MetricType.WAVEFORM, b"x"))
+        self.assertEqual(decode_key(key), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
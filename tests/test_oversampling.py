@@ -0,0 +1,70 @@
+import unittest
+
+from common.oversampling import (
+    EMAFilter, MedianFilter, OutlierFilter, OversamplingConfig, TrimmedMeanFilter, summarize,
+)
+
+
+class FilterTest(unittest.TestCase):
+    def test_median_of_odd_and_even_windows(self):
+        self.assertEqual(MedianFilter().apply([5.0, 1.0, 3.0]), [3.0])
+        self.assertEqual(MedianFilter().apply([4.0, 1.0, 3.0, 2.0]), [2.5])
+
+    def test_trimmed_mean_drops_both_ends(self):
+        window = [100.0] + [2.0] * 8 + [-100.0]
+        self.assertEqual(TrimmedMeanFilter(0.1).apply(window), [2.0])
+
+    def test_outlier_filter_drops_spikes(self):
+        window = [1.0, 1.1, 0.9, 1.05, 0.95, 50.0]
+        self.assertNotIn(50.0, OutlierFilter(3.5).apply(window))
+
+    def test_outlier_filter_keeps_a_quiet_window(self):
+        window = [2.0, 2.0, 2.0, 2.0, 9.0]
+        self.assertEqual(OutlierFilter().apply(window), window)
+
+    def test_ema_carries_over_between_readings(self):
+        ema = EMAFilter(alpha=0.5)
+        self.assertEqual(ema.apply([0.0, 2.0]), [1.0])
+        self.assertEqual(ema.apply([3.0]), [2.0])
+
+    def test_invalid_options_raise_value_error(self):
+        for make in (lambda: TrimmedMeanFilter(0.5), lambda: OutlierFilter(0), lambda: EMAFilter(0)):
+            with self.assertRaises(ValueError):
+                make()
+
+
+class OversamplingConfigTest(unittest.TestCase):
+    def test_from_dict_builds_the_filter_chain_in_order(self):
+        config = OversamplingConfig.from_dict({
+            "samples": 32,
+            "data_rate": 860,
+            "filters": [{"type": "outlier", "threshold": 3.0}, {"type": "trimmed_mean", "proportion": 0.2}],
+        })
+        self.assertEqual((config.samples, config.data_rate), (32, 860))
+        self.assertEqual([type(f) for f in config.filters], [OutlierFilter, TrimmedMeanFilter])
+        self.assertAlmostEqual(config.apply([1.0, 1.1, 0.9, 1.0, 40.0]), 1.0)
+
+    def test_invalid_configuration_raises_value_error(self):
+        for block in ({"filters": [{"type": "kalman"}]}, {"samples": 0}, {"data_rate": 100}):
+            with self.subTest(block=block), self.assertRaises(ValueError):
+                OversamplingConfig.from_dict(block)
+
+    def test_a_filter_returning_nothing_keeps_the_window(self):
+        class Empty:
+            def apply(self, window):
+                return []
+
+        self.assertEqual(OversamplingConfig(filters=[Empty()]).apply([1.0, 3.0]), 2.0)
+
+    def test_empty_windows_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            OversamplingConfig().apply([])
+        with self.assertRaises(ValueError):
+            summarize([])
+
+    def test_summarize(self):
+        self.assertEqual(summarize([1.0, 3.0]), {"mean": 2.0, "min": 1.0, "max": 3.0, "stddev": 1.0, "samples": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+from common.lmdb_clients import ReaderLimiter, lmdb_env
+
+
+class ReaderLimiterTest(unittest.TestCase):
+    def test_read_waits_for_a_free_slot(self):
+        limiter = ReaderLimiter(lmdb_env, 1)
+        second_started = threading.Event()
+
+        def second_read():
+            with limiter.read():
+                second_started.set()
+
+        with limiter.read():
+            thread = threading.Thread(target=second_read, daemon=True)
+            thread.start()
+            self.assertFalse(second_started.wait(0.1))
+        thread.join(5)
+
+        self.assertTrue(second_started.is_set())
+        self.assertEqual(limiter.stats(), {"slots": 1, "active": 0, "reads": 2, "waited": 1})
+
+    def test_exclusive_waits_for_open_reads_and_holds_off_new_ones(self):
+        limiter = ReaderLimiter(lmdb_env, 4)
+        exclusive = threading.Event()
+        release = threading.Event()
+
+        def resize():
+            with limiter.exclusive():
+                exclusive.set()
+                release.wait(5)
+
+        with limiter.read():
+            thread = threading.Thread(target=resize, daemon=True)
+            thread.start()
+            self.assertFalse(exclusive.wait(0.1))
+        self.assertTrue(exclusive.wait(5))
+
+        read_started = threading.Event()
+
+        def read():
+            with limiter.read():
+                read_started.set()
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        self.assertFalse(read_started.wait(0.1))
+        release.set()
+        self.assertTrue(read_started.wait(5))
+        thread.join(5)
+        reader.join(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
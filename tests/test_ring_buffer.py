@@ -0,0 +1,59 @@
+import threading
+import unittest
+
+from common.ring_buffer import RingBuffer
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_fifo_across_wraparound(self):
+        buffer = RingBuffer(3)
+        for item in (1, 2, 3):
+            buffer.push(item)
+        self.assertEqual(buffer.pop(), 1)
+        buffer.push(4)
+
+        self.assertEqual([buffer.pop(), buffer.pop(), buffer.pop()], [2, 3, 4])
+        self.assertIsNone(buffer.pop(timeout=0))
+
+    def test_overflow_evicts_the_oldest_item(self):
+        buffer = RingBuffer(2)
+        buffer.push(1)
+        buffer.push(2)
+
+        self.assertEqual(buffer.push(3), 1)
+        self.assertEqual(buffer.drain(), [2, 3])
+
+    def test_overflow_rejects_the_new_item_without_drop_oldest(self):
+        buffer = RingBuffer(2, drop_oldest=False)
+        buffer.push(1)
+        buffer.push(2)
+
+        self.assertEqual(buffer.push(3), 3)
+        self.assertEqual(buffer.drain(), [1, 2])
+
+    def test_pop_excess_trims_to_the_high_water_mark(self):
+        buffer = RingBuffer(5, high_water_mark=3)
+        for item in range(5):
+            buffer.push(item)
+
+        self.assertTrue(buffer.above_high_water())
+        self.assertEqual(buffer.pop_excess(), [0, 1])
+        self.assertFalse(buffer.above_high_water())
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.pop(), 2)
+
+    def test_pop_wakes_up_on_push(self):
+        buffer = RingBuffer(2)
+        threading.Timer(0.05, buffer.push, args=("late",)).start()
+
+        self.assertEqual(buffer.pop(timeout=5), "late")
+
+    def test_rejects_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+        with self.assertRaises(ValueError):
+            RingBuffer(2, high_water_mark=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+from common import scheduler as scheduler_module
+from common.scheduler import Scheduler
+
+
+class _Clock:
+    """Monotonic clock that only moves when told to (or when the scheduler waits)."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _StopEvent:
+    """Stop event whose wait() advances the fake clock instead of sleeping."""
+
+    def __init__(self, clock: _Clock):
+        self._clock = clock
+        self._set = False
+
+    def is_set(self) -> bool:
+        return self._set
+
+    def set(self) -> None:
+        self._set = True
+
+    def wait(self, timeout: float) -> bool:
+        self._clock.now += timeout
+        return self._set
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(scheduler_module, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stop = _StopEvent(self.clock)
+        self.scheduler = Scheduler(self.stop)
+        self.runs = []
+
+    def _task(self, duration: float, stop_after: int):
+        def run():
+            self.runs.append(self.clock.now)
+            self.clock.now += duration
+            if len(self.runs) >= stop_after:
+                self.stop.set()
+
+        return run
+
+    def test_deadlines_do_not_drift_with_task_run_time(self):
+        self.scheduler.add("sample", 5.0, self._task(duration=1.5, stop_after=4))
+        self.scheduler.run()
+
+        self.assertEqual(self.runs, [0.0, 5.0, 10.0, 15.0])
+        stats = self.scheduler.stats()["sample"]
+        self.assertEqual((stats["runs"], stats["overruns"], stats["skipped"]), (4, 0, 0))
+
+    def test_overrun_skips_missed_periods_instead_of_bursting(self):
+        durations = iter([12.0, 1.0, 1.0])
+
+        def run():
+            self.runs.append(self.clock.now)
+            self.clock.now += next(durations)
+            if len(self.runs) == 3:
+                self.stop.set()
+
+        self.scheduler.add("sample", 5.0, run)
+        self.scheduler.run()
+
+        # The first run ends at 12s: the 5s and 10s deadlines are skipped
+        self.assertEqual(self.runs, [0.0, 15.0, 20.0])
+        stats = self.scheduler.stats()["sample"]
+        self.assertEqual((stats["overruns"], stats["skipped"]), (1, 2))
+
+    def test_failing_task_keeps_its_schedule(self):
+        calls = []
+
+        def fail():
+            calls.append(self.clock.now)
+            if len(calls) == 2:
+                self.stop.set()
+            raise RuntimeError("sensor gone")
+
+        self.scheduler.add("flaky", 2.0, fail, start_delay=1.0)
+        self.scheduler.run()
+
+        self.assertEqual(calls, [1.0, 3.0])
+
+    def test_rejects_non_positive_interval(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.add("bad", 0, lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
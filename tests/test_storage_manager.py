@@ -0,0 +1,183 @@
+import threading
+import time
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+import lmdb
+
+from common import lmdb_clients
+from common.lmdb_clients import HIGH_WATER_CHECK_COMMITS, lmdb_write_lock, meta_db, metric_dbs, storage_manager
+from common.lmdb_sequence import append_record
+from common.metric_type import MetricType
+
+MIB = 1024 * 1024
+DiskUsage = namedtuple("DiskUsage", "total used free")
+
+
+def _put(key: bytes, value: bytes = b"1"):
+    return lambda txn: txn.put(key, value)
+
+
+def _get(txn, key: bytes):
+    value = txn.get(key, db=meta_db)
+    return bytes(value) if value is not None else None
+
+
+class GroupCommitTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(storage_manager.settings, "lmdb_group_commit_window_seconds", 1.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write_in_threads(self, operations):
+        results = [None] * len(operations)
+        errors = [None] * len(operations)
+        self._entered = threading.Semaphore(0)
+
+        def write(i, operation):
+            self._entered.release()
+            try:
+                results[i] = storage_manager.write(operation, db=meta_db)
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=write, args=(i, op), daemon=True) for i, op in enumerate(operations)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def _wait_until_enqueued(self, count: int) -> None:
+        """Wait until `count` writers are in write() and each write is queued or taken by the writer thread."""
+        for _ in range(count):
+            self._entered.acquire(timeout=5)
+        deadline = time.monotonic() + 5
+        while storage_manager._waiting != storage_manager._queue.qsize() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_writes_queued_during_a_commit_share_one_transaction(self):
+        before = dict(storage_manager._counters)
+        # Hold the write lock so the writer thread blocks in its first commit while the others queue up
+        with lmdb_write_lock:
+            threads, results, errors = self._write_in_threads([_put(f"group-{i}".encode()) for i in range(6)])
+            self._wait_until_enqueued(6)
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(errors, [None] * 6)
+        self.assertEqual(results, [True] * 6)
+        self.assertEqual(storage_manager._counters["writes"] - before["writes"], 6)
+        self.assertLessEqual(storage_manager._counters["commits"] - before["commits"], 2)
+        with lmdb_clients.lmdb_env.begin() as txn:
+            self.assertEqual([_get(txn, f"group-{i}".encode()) for i in range(6)], [b"1"] * 6)
+
+    def test_failing_write_does_not_abort_its_group(self):
+        def fail(txn):
+            txn.put(b"nested-failure", b"1")
+            raise ValueError("bad record")
+
+        with lmdb_write_lock:
+            threads, results, errors = self._write_in_threads([_put(b"nested-ok"), fail])
+            self._wait_until_enqueued(2)
+        for thread in threads:
+            thread.join(5)
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], ValueError)
+        with lmdb_clients.lmdb_env.begin() as txn:
+            self.assertEqual(_get(txn, b"nested-ok"), b"1")
+            self.assertIsNone(_get(txn, b"nested-failure"))
+
+    def test_unexpected_error_making_room_releases_writers(self):
+        storage_manager._commits_since_check = HIGH_WATER_CHECK_COMMITS
+        with mock.patch.object(storage_manager, "_above_high_water", side_effect=OSError("disk gone")):
+            threads, results, errors = self._write_in_threads([_put(b"high-water-error")])
+            threads[0].join(5)
+        self.assertFalse(threads[0].is_alive())
+        # Making room ahead of a write is only a precaution; the write itself goes through
+        self.assertEqual(errors, [None])
+
+        def full(txn):
+            raise lmdb.MapFullError("full")
+
+        with mock.patch.object(storage_manager, "_make_room", side_effect=OSError("disk gone")):
+            threads, results, errors = self._write_in_threads([full])
+            threads[0].join(5)
+        self.assertFalse(threads[0].is_alive())
+        self.assertIsInstance(errors[0], OSError)
+
+        # The writer thread survived and still commits
+        self.assertTrue(storage_manager._writer_thread.is_alive())
+        storage_manager.write(_put(b"after-error"), db=meta_db)
+
+
+class MapGrowthTest(unittest.TestCase):
+    def setUp(self):
+        settings = storage_manager.settings
+        for name, value in (
+            ("lmdb_map_growth_bytes", MIB),
+            ("lmdb_map_max_bytes", storage_manager.map_size + MIB),
+            ("lmdb_disk_reserve_bytes", 0),
+            ("lmdb_eviction_batch", 2),
+        ):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_grows_by_the_growth_step_up_to_the_max(self):
+        size = storage_manager.map_size
+        grows = storage_manager._counters["grows"]
+
+        self.assertTrue(storage_manager._make_room())
+        self.assertEqual(storage_manager.map_size, size + MIB)
+        self.assertFalse(storage_manager._grow())
+        self.assertEqual(storage_manager._counters["grows"], grows + 1)
+
+    def test_never_grows_past_the_free_disk_space(self):
+        size = storage_manager.map_size
+        with mock.patch.object(lmdb_clients.shutil, "disk_usage", return_value=DiskUsage(0, 0, 0)):
+            self.assertFalse(storage_manager._grow())
+        self.assertEqual(storage_manager.map_size, size)
+
+    def test_evicts_the_oldest_records_once_the_map_cannot_grow(self):
+        db = metric_dbs[MetricType.DEVICE_STATUS]
+
+        def store(txn):
+            txn.drop(db, delete=False)
+            return [append_record(txn, MetricType.DEVICE_STATUS, f"status-{i}".encode()) for i in range(5)]
+
+        keys = storage_manager.write(store)
+        with mock.patch.object(storage_manager.settings, "lmdb_map_max_bytes", storage_manager.map_size), \
+                mock.patch.object(storage_manager, "_policy", "device_status_first"):
+            self.assertTrue(storage_manager._make_room())
+
+        with lmdb_clients.lmdb_env.begin(db=db) as txn:
+            self.assertEqual([key for key, _ in txn.cursor()], keys[2:])
+
+    def test_map_full_error_makes_room_and_retries_the_group(self):
+        calls = []
+
+        def put_once_room_is_made(txn):
+            calls.append(1)
+            if len(calls) == 1:
+                raise lmdb.MapFullError("full")
+            return txn.put(b"after-map-full", b"1")
+
+        errors = storage_manager._counters["map_full_errors"]
+        with mock.patch.object(storage_manager, "_make_room", return_value=True) as make_room:
+            self.assertTrue(storage_manager.write(put_once_room_is_made, db=meta_db))
+        make_room.assert_called_once()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(storage_manager._counters["map_full_errors"], errors + 1)
+
+    def test_write_fails_with_map_full_once_nothing_can_be_freed(self):
+        def full(txn):
+            raise lmdb.MapFullError("full")
+
+        with mock.patch.object(storage_manager, "_make_room", return_value=False):
+            with self.assertRaises(lmdb.MapFullError):
+                storage_manager.write(full, db=meta_db)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from common.transition_log import TransitionLog
+
+
+class TransitionLogTest(unittest.TestCase):
+    def test_drain_returns_transitions_oldest_first(self):
+        log = TransitionLog(4)
+        log.record(1.0, True)
+        log.record(2.0, False)
+
+        self.assertEqual(log.drain(), ([(1.0, True), (2.0, False)], 0))
+        self.assertEqual(log.drain(), ([], 0))
+
+    def test_wraps_around_the_ring(self):
+        log = TransitionLog(4)
+        for i in range(3):
+            log.record(float(i), bool(i % 2))
+        log.drain()
+        for i in range(3, 7):
+            log.record(float(i), bool(i % 2))
+
+        self.assertEqual(log.drain(), ([(3.0, True), (4.0, False), (5.0, True), (6.0, False)], 0))
+
+    def test_counts_transitions_overwritten_before_a_drain(self):
+        log = TransitionLog(4)
+        for i in range(10):
+            log.record(float(i), bool(i % 2))
+
+        entries, lost = log.drain()
+        self.assertEqual(lost, 6)
+        self.assertEqual([timestamp for timestamp, _ in entries], [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(log.drain(), ([], 0))
+
+    def test_rejects_non_positive_capacity(self):
+        with self.assertRaises(ValueError):
+            TransitionLog(0)
+
+
+if __name__ == "__main__":
+    unittest.main()